@@ -0,0 +1,173 @@
+"""
+Benchmarks for the core gapy operations, parameterised over algebra and batch size.
+
+    python bench_gapy.py --output baseline.json                        # record a baseline
+    python bench_gapy.py --compare baseline.json --tolerance 0.25      # exit non-zero if anything got >25% slower
+
+A batch size of 1 benchmarks the single Multivector (scalar) API, larger sizes benchmark Multivector.Array.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import numpy as np
+
+from typing import Callable, Dict, List, Tuple
+
+from gapy.core import algebra
+from gapy.ga2d import Multivector2D
+from gapy.ga3d import Multivector3D
+
+
+ALGEBRAS = {
+    "2d": lambda: Multivector2D,
+    "3d": lambda: Multivector3D,
+    "pga": lambda: algebra(3, 0, 1),
+    "cga": lambda: algebra(4, 1),
+}
+
+
+def _random(M, size: int, rng: np.random.Generator, grades: List[int] = None):
+    """
+    A random multivector (size == 1) or array of them, only non-zero in the given grades (all by default).
+    """
+    g = M.cayley.grade_mask
+    shape = (len(g),) if size == 1 else (size, len(g))
+    mask = np.ones(len(g)) if grades is None else np.isin(g, grades)
+    a = M(*(rng.normal(size=len(g)) * mask)) if size == 1 else M.Array(rng.normal(size=shape) * mask)
+    return a.project(grades[0]) if grades is not None and len(grades) == 1 else a
+
+
+def _cases(M, size: int, rng: np.random.Generator) -> Dict[str, Callable[[], object]]:
+    """
+    The operations to time for one algebra and batch size.
+    """
+    ndims = int(np.sum(M.cayley.grade_mask == 1))
+    a = _random(M, size, rng)
+    b = _random(M, size, rng)
+    v = _random(M, size, rng, [1])
+    B = _random(M, size, rng, [2])
+    plane = _random(M, 1, rng, [2])
+    R = (0.1 * B).exp()
+    angles = rng.uniform(0, np.pi, size) if size > 1 else 0.3
+    coords = [rng.normal(size=size) if size > 1 else 1.0 for _ in range(ndims)]
+
+    return {
+        "mul": lambda: a * b,
+        "mul_rotor_vector": lambda: R * v,
+        "outer_vectors": lambda: v ^ v,
+        "left_contraction": lambda: v << B,
+        "apply": lambda: R.apply(v),
+        "rotate_rad": lambda: v.rotate_rad(angles, plane),
+        "exp": lambda: B.exp(),
+        "project": lambda: a.project(2),
+        "grade": lambda: a.grade,
+        "make_vector": lambda: M.make.vector(*coords),
+        "make_rotor": lambda: M.make.rotor(angles, plane),
+    }
+
+
+def _gravity(size: int) -> Callable[[], object]:
+    """
+    The analytic Kepler trajectory from gapy/examples/gravity.py, evaluated at `size` samples.
+    """
+    from gapy import sweep
+    from gapy.ga3d import vec, I
+
+    b = vec(1, 1, 0)
+    a = vec(0.25, 1, -0.5)
+    L = (a ^ b).unit
+    e = a.unit
+    s = np.linspace(0, 2*np.pi, max(size, 2))
+
+    def trajectory():
+        U = 1*sweep.exp(L, s) + 2*sweep.exp(L, -s)
+        x = U*U*e + np.linspace(0, 1, len(s))*(I*L)
+        return x.vector
+
+    return trajectory
+
+
+def _time(fn: Callable[[], object], repeat: int, min_time: float) -> float:
+    """
+    The best time per call, in seconds, over `repeat` runs of enough calls to take at least min_time.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(algebras: List[str], sizes: List[int], repeat: int, min_time: float, only: List[str]) -> List[Dict]:
+    rng = np.random.default_rng(0)
+    results = []
+    for name in algebras:
+        M = ALGEBRAS[name]()
+        for size in sizes:
+            cases = _cases(M, size, rng)
+            if name == "3d":
+                cases["gravity"] = _gravity(size)
+            for (case, fn) in cases.items():
+                if only and case not in only:
+                    continue
+                seconds = _time(fn, repeat, min_time)
+                results.append({"name": case, "algebra": name, "size": size, "seconds": seconds, "per_element_ns": 1e9 * seconds / size})
+                print(f"{name:>4} {case:>18} {size:>9} {1e6 * seconds:12.2f} us {1e9 * seconds / size:12.2f} ns/element", file=sys.stderr)
+    return results
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Tuple[Dict, float]]:
+    """
+    The results which are slower than the matching baseline result by more than the tolerance, with their slowdown.
+    """
+    previous = {(r["name"], r["algebra"], r["size"]): r["seconds"] for r in baseline}
+    regressions = []
+    for r in results:
+        key = (r["name"], r["algebra"], r["size"])
+        if key not in previous:
+            continue
+        ratio = r["seconds"] / previous[key]
+        print(f"{r['algebra']:>4} {r['name']:>18} {r['size']:>9} {ratio:8.2f}x", file=sys.stderr)
+        if ratio > 1 + tolerance:
+            regressions.append((r, ratio))
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algebras", default="2d,3d,pga,cga", help="comma separated, from: " + ", ".join(ALGEBRAS))
+    parser.add_argument("--sizes", default="1,1000,100000", help="comma separated batch sizes")
+    parser.add_argument("--only", default="", help="comma separated benchmark names to run (default all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per timing run")
+    parser.add_argument("--output", help="write the results as JSON to this file (default stdout)")
+    parser.add_argument("--compare", help="JSON results from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed fractional slowdown before failing --compare")
+    args = parser.parse_args(argv)
+
+    results = run(args.algebras.split(","), [int(s) for s in args.sizes.split(",")], args.repeat, args.min_time,
+                  [o for o in args.only.split(",") if o])
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(), "platform": platform.platform()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for (r, ratio) in regressions:
+            print(f"REGRESSION: {r['algebra']} {r['name']} size={r['size']} is {ratio:.2f}x slower", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
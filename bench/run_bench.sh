@@ -0,0 +1,5 @@
+#!/usr/bin/env bash
+
+export PYTHONPATH=../python/:$PYTHONPATH
+
+python bench_gapy.py "$@"
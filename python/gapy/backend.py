@@ -0,0 +1,136 @@
+"""
+Backends which turn the generated product and sandwich functions (see gapy.codegen) into something callable.
+
+    "numpy"  the generated Python source is executed as is, unpacking blades into Python floats for single
+             multivectors and into arrays for batches. Always available.
+    "numba"  the same arithmetic is rewritten as a function of one coefficient row and JIT compiled twice: as a
+             plain function for single multivectors and as a generalised ufunc, "(n),(n)->(n)", for batches,
+             which broadcasts like the numpy path. Available when numba is installed.
+
+The backend applies to every kernel, including those already generated, so exp, log, sqrt and inverse (which are
+built from products) use it too. Kernels it cannot handle, such as the fused kernels of gapy.lazy, use numpy.
+The default is numba when it is installed, unless the GAPY_BACKEND environment variable says otherwise. numba itself
+is only imported when the first kernel is compiled, so choosing it does not slow down importing gapy.
+"""
+
+import importlib.util
+import os
+import re
+import warnings
+import numpy as np
+
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+from gapy import codegen
+
+
+__all__ = ("available_backends", "get_backend", "set_backend",)
+
+
+@lru_cache(maxsize=None)
+def _numba():
+    try:
+        import numba
+        return numba
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def available_backends() -> Tuple[str, ...]:
+    return ("numpy", "numba") if importlib.util.find_spec("numba") is not None else ("numpy",)
+
+
+_ROW_SPLIT = re.compile(r"    (.*), = _split\((\w+), \[(.*)\]\)$")
+_ROW_RETURN = re.compile(r"    return _assemble\(\((.*),\), \[(.*)\], \((.*)\), out\)$")
+
+
+def _row_source(kernel: codegen.Kernel) -> Optional[str]:
+    """
+    The kernel's source rewritten as `fname_row(a, b, r)`, computing one row of the result into r, or None if the
+    kernel is not a product of two coefficient arrays. All the values are computed before r is written, so r may alias a or b.
+    """
+    lines = kernel.source.splitlines()
+    if lines[0] != f"def {kernel.fname}(a, b, out=None):":
+        return None
+    row = [f"def {kernel.fname}_row(a, b, r):"]
+    for line in lines[2:]:
+        split = _ROW_SPLIT.match(line)
+        ret = _ROW_RETURN.match(line)
+        if split:
+            names, arg, blades = split.groups()
+            row.append(f"    {names}, = {''.join(f'{arg}[{i}], ' for i in blades.split(', '))}")
+        elif ret:
+            row.append("    r[:] = 0")
+            blades = [b for b in ret.group(2).split(", ") if b]
+            row.extend(f"    r[{k}] = r{k}" for k in blades)
+        else:
+            row.append(line)
+    return "\n".join(row) + "\n"
+
+
+def _row_function(kernel: codegen.Kernel) -> Optional[Callable]:
+    source = _row_source(kernel)
+    if source is None:
+        return None
+    return codegen._compile(source, f"{kernel.fname}_row")
+
+
+def _numba_compiler(kernel: codegen.Kernel) -> Callable:
+    row = _row_function(kernel)
+    if row is None:
+        return codegen._default_compiler(kernel)
+    numba = _numba()
+    if numba is None:  # installed, but broken
+        return codegen._default_compiler(kernel)
+    single = numba.njit(row)
+    batched = numba.guvectorize("(n),(n)->(n)", nopython=True)(row)
+
+    def fn(a: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(np.broadcast_shapes(a.shape, b.shape), dtype=np.result_type(a, b))
+        if a.ndim == 1 and b.ndim == 1:
+            single(a, b, out)
+        else:
+            batched(a, b, out)
+        return out
+
+    return fn
+
+
+_compilers: Dict[str, Callable[[codegen.Kernel], Callable]] = {
+    "numpy": codegen._default_compiler,
+    "numba": _numba_compiler,
+}
+
+_active = "numpy"
+
+
+def get_backend() -> str:
+    """
+    The name of the active backend.
+    """
+    return _active
+
+
+def set_backend(name: str):
+    """
+    Make the named backend ("numpy" or "numba") active, recompiling every kernel generated so far.
+    """
+    global _active
+    if name not in _compilers:
+        raise ValueError(f"Unknown backend. [name={name!r}, available={available_backends()!r}]")
+    if name not in available_backends():
+        raise ImportError(f"The {name} backend is not installed. [available={available_backends()!r}]")
+    _active = name
+    codegen._compiler = _compilers[name]
+    for kernel in list(codegen._live):
+        kernel.compile()
+
+
+_requested = os.environ.get("GAPY_BACKEND", available_backends()[-1])
+if _requested in available_backends():
+    set_backend(_requested)
+else:
+    warnings.warn(f"GAPY_BACKEND is not an available backend, using numpy. [GAPY_BACKEND={_requested!r}, available={available_backends()!r}]")
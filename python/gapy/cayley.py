@@ -0,0 +1,217 @@
+import numpy as np
+
+from functools import cached_property
+from typing import Dict, Iterable, Tuple
+
+
+__all__ = ("CayleyTable", "grade_bits",)
+
+
+def grade_bits(grades: Iterable[int]) -> int:
+    """
+    The bitmask with bit g set for each of the grades g, which may repeat.
+    """
+    if isinstance(grades, np.ndarray):
+        grades = np.flatnonzero(np.bincount(grades.ravel()))  # the distinct grades, cheaper than np.unique
+    bits = 0
+    for g in grades:
+        bits |= 1 << int(g)
+    return bits
+
+
+class CayleyTable:
+    """
+    The multiplication table of an algebra, stored as the list of its non-zero terms
+
+        (a*b)[k] = sum_t a[left[t]] * b[right[t]] * sign[t]   over all t with out[t] == k
+
+    along with the equivalent dense tensor T[i, j, k], so that (a*b)[k] = sum_ij a[i] * b[j] * T[i, j, k].
+    The products themselves are evaluated by the functions gapy.codegen generates from the terms.
+
+    Tables restricted to operands of known grades (see `restrict`) only store, and only touch, the blades which
+    can contribute, and know which grades their output can have (`grades`) without looking at any coefficients.
+    """
+
+    def __init__(self, left: np.ndarray, right: np.ndarray, out: np.ndarray, sign: np.ndarray, grade_mask: np.ndarray):
+        keep = sign != 0
+        order = np.lexsort((right[keep], left[keep], out[keep]))
+        self.left = left[keep][order]
+        self.right = right[keep][order]
+        self.out = out[keep][order]
+        self.sign = sign[keep][order]
+        self.grade_mask = grade_mask
+        self.nblades = len(grade_mask)
+        self.grades = grade_bits(grade_mask[self.out])
+        self._restricted: Dict[Tuple[int, int], CayleyTable] = {}
+        self._dense: Dict[np.dtype, np.ndarray] = {}
+
+        # The blades which appear in some term.
+        self.left_blades = np.unique(self.left)
+        self.right_blades = np.unique(self.right)
+        self.out_blades = np.unique(self.out)
+
+    @staticmethod
+    def from_basis(basis_idx: np.ndarray, basis_sign: np.ndarray, grade_mask: np.ndarray) -> "CayleyTable":
+        """
+        Build the table from the basis_idx and basis_sign arrays given to `multivector_type`,
+        where row r of the product matrix is `b[basis_idx[r, :]] * basis_sign[r, :]`.
+        """
+        n = basis_idx.shape[0]
+        out, left = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+        return CayleyTable(left.ravel(), basis_idx.ravel(), out.ravel(), basis_sign.ravel(), grade_mask)
+
+    @property
+    def nterms(self) -> int:
+        return len(self.sign)
+
+    @property
+    def tensor(self) -> np.ndarray:
+        """
+        The full dense (nblades, nblades, nblades) tensor.
+        """
+        tensor = np.zeros((self.nblades,) * 3, dtype=self.sign.dtype)
+        tensor[self.left, self.right, self.out] = self.sign
+        return tensor
+
+    def dense(self, dtype: np.dtype) -> np.ndarray:
+        """
+        The full dense tensor with entries of the given dtype, built once per dtype.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in self._dense:
+            self._dense[dtype] = self.tensor.astype(dtype)
+        return self._dense[dtype]
+
+    def select(self, keep: np.ndarray) -> "CayleyTable":
+        """
+        The table with only the terms where keep is True.
+        """
+        return CayleyTable(self.left[keep], self.right[keep], self.out[keep], self.sign[keep], self.grade_mask)
+
+    @cached_property
+    def outer(self) -> "CayleyTable":
+        """
+        The table of the outer (exterior) product, the terms where the grades of the operands add.
+        """
+        g = self.grade_mask
+        return self.select(g[self.out] == g[self.left] + g[self.right])
+
+    @cached_property
+    def inner(self) -> "CayleyTable":
+        """
+        The table of the inner product, the terms whose grade is the difference of the grades of the operands.
+        """
+        g = self.grade_mask
+        return self.select(g[self.out] == np.abs(g[self.left] - g[self.right]))
+
+    @cached_property
+    def left_contraction(self) -> "CayleyTable":
+        """
+        The table of the left contraction a _| b, the terms of grade g(b) - g(a).
+        """
+        g = self.grade_mask
+        return self.select(g[self.out] == g[self.right] - g[self.left])
+
+    @cached_property
+    def right_contraction(self) -> "CayleyTable":
+        """
+        The table of the right contraction a |_ b, the terms of grade g(a) - g(b).
+        """
+        g = self.grade_mask
+        return self.select(g[self.out] == g[self.left] - g[self.right])
+
+    @cached_property
+    def scalar_product(self) -> "CayleyTable":
+        """
+        The table of the scalar product, the scalar terms of the geometric product.
+        """
+        return self.select(self.grade_mask[self.out] == 0)
+
+    @cached_property
+    def commutator(self) -> "CayleyTable":
+        """
+        The table of the commutator product (a*b - b*a) / 2, the terms whose blades anticommute.
+        """
+        swapped = self.tensor[self.right, self.left, self.out]
+        return self.select(swapped == -self.sign)
+
+    @cached_property
+    def complement(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The right complement as (blades, signs), complement(e_i) = signs[i] * e_blades[i], where e_i ^ complement(e_i)
+        is the pseudoscalar for every basis blade e_i. It does not depend on the metric, so it is defined for degenerate
+        algebras (such as PGA) too.
+        """
+        o = self.outer
+        top = o.out == self.nblades - 1
+        blades = np.empty(self.nblades, dtype=int)
+        signs = np.empty(self.nblades, dtype=np.int8)
+        blades[o.left[top]] = o.right[top]
+        signs[o.left[top]] = o.sign[top]
+        return blades, signs
+
+    @cached_property
+    def regressive(self) -> "CayleyTable":
+        """
+        The table of the regressive product a v b = complement^-1(complement(a) ^ complement(b)), the dual of the outer
+        product, e.g. the meet of two planes or the join of two points in PGA.
+        """
+        blades, signs = self.complement
+        inverse = np.argsort(blades)  # complement^-1(e_k) = signs[inverse[k]] e_inverse[k]
+        o = self.outer
+        i, j, m = inverse[o.left], inverse[o.right], inverse[o.out]
+        return CayleyTable(i, j, m, signs[i] * signs[j] * o.sign * signs[m], self.grade_mask)
+
+    def _right_multiple(self, blade: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Multiplication on the right by a basis blade as (blades, signs), e_i * e_blade = signs[i] * e_blades[i], where
+        signs[i] is zero if the product vanishes.
+        """
+        keep = self.right == blade
+        blades, signs = self.complement[0].copy(), np.zeros(self.nblades, dtype=np.int8)
+        blades[self.left[keep]] = self.out[keep]
+        signs[self.left[keep]] = self.sign[keep]
+        return blades, signs
+
+    @cached_property
+    def hodge(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The Hodge star reverse(a) * I as (blades, signs), see complement. The signs are zero for the blades which
+        square to zero.
+        """
+        blades, signs = self._right_multiple(self.nblades - 1)
+        reverse_sign = np.where((self.grade_mask // 2) % 2 == 0, 1, -1)
+        return blades, (signs * reverse_sign).astype(np.int8)
+
+    @cached_property
+    def pseudoscalar_square(self) -> int:
+        """
+        The scalar I*I, -1, 1 or (for degenerate algebras) 0.
+        """
+        top = self.nblades - 1
+        return int(np.sum(self.sign[(self.left == top) & (self.right == top)]))
+
+    @cached_property
+    def dual(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The dual a * I^-1 as (blades, signs), see complement. Raises ValueError if the pseudoscalar squares to zero.
+        """
+        top = self.nblades - 1
+        square = self.pseudoscalar_square
+        if square == 0:
+            raise ValueError("The pseudoscalar squares to zero, so there is no dual. Use the complement instead.")
+        blades, signs = self._right_multiple(top)
+        return blades, (signs * square).astype(np.int8)  # I^-1 = I / I^2 = I * I^2
+
+    def restrict(self, grades_a: int, grades_b: int) -> "CayleyTable":
+        """
+        The table for products of multivectors which are only non-zero in the grades set in the bitmasks grades_a and grades_b.
+        """
+        key = (grades_a, grades_b)
+        if key not in self._restricted:
+            keep = ((grades_a >> self.grade_mask[self.left]) & (grades_b >> self.grade_mask[self.right]) & 1) == 1
+            if np.all(keep):
+                self._restricted[key] = self
+            else:
+                self._restricted[key] = self.select(keep)
+        return self._restricted[key]
@@ -0,0 +1,73 @@
+"""
+Checks over whole batches of multivectors, each a single vectorised pass over the coefficients, for validating large
+numbers of results:
+
+    bits = a.present_grades(atol=1e-9)          # the bitmask of the grades present in each multivector
+    ok = a.isclose(expected, rtol=1e-6)         # which multivectors match, with np.isclose's tolerances
+    counts = classify.count_grades(a)           # {grade bitmask: number of multivectors}
+    vectors = classify.filter_grades(a, grade_bits([1]))
+    distinct = classify.dedupe(a, atol=1e-9)
+"""
+
+import numpy as np
+
+from typing import Dict
+
+from gapy.core import GenericMultivector
+
+
+__all__ = ("count_grades", "where_grades", "filter_grades", "dedupe",)
+
+
+def count_grades(a: GenericMultivector, atol: float = 1e-8, rtol: float = 0.0) -> Dict[int, int]:
+    """
+    The number of multivectors with each combination of grades present, keyed by the bitmask of grades.
+    """
+    counts = np.bincount(np.ravel(a.present_grades(atol, rtol)))
+    return {int(bits): int(counts[bits]) for bits in np.flatnonzero(counts)}
+
+
+def where_grades(a: GenericMultivector, grades: int, exact: bool = True, atol: float = 1e-8, rtol: float = 0.0) -> np.ndarray:
+    """
+    Which multivectors of the batch have exactly the grades in the bitmask `grades` present, or if exact is False, only
+    (some of) those grades present.
+    """
+    bits = a.present_grades(atol, rtol)
+    return bits == grades if exact else (bits & ~grades) == 0
+
+
+def filter_grades(a: GenericMultivector, grades: int, exact: bool = True, atol: float = 1e-8, rtol: float = 0.0) -> GenericMultivector:
+    """
+    The (N,) Multivector.Array of the multivectors of the batch selected by where_grades.
+    """
+    keep = where_grades(a, grades, exact, atol, rtol)
+    return type(a)._new(a._coefficients[keep], a.grades & grades)
+
+
+def dedupe(a: GenericMultivector, atol: float = 1e-8, rtol: float = 0.0, return_index: bool = False):
+    """
+    The (N,) Multivector.Array of the distinct multivectors of the batch, in order, where multivectors are the same
+    when np.isclose holds for every coefficient. With return_index, also return the flat indices of the multivectors
+    kept.
+
+    The rows are sorted by their coefficients rounded to the tolerance, and each is compared with the one before it,
+    so a run of rows each close to the one before is merged into its earliest row. Rows close to each other but
+    either side of a rounding boundary are usually, though not always, next to each other in that order.
+    """
+    c = a._coefficients.reshape(-1, a._coefficients.shape[-1])
+    values = np.concatenate([c.real, c.imag], -1) if np.iscomplexobj(c) else c
+    n = len(values)
+    if n == 0:
+        return (type(a)._new(c, a.grades), np.arange(0)) if return_index else type(a)._new(c, a.grades)
+
+    width = atol + rtol * np.max(np.abs(values), initial=0, where=np.isfinite(values))
+    keys = np.floor(values / width) if width > 0 else values
+    order = np.lexsort(keys.T[::-1])
+    ordered = values[order]
+    close = np.all(np.abs(ordered[1:] - ordered[:-1]) <= atol + rtol * np.abs(ordered[:-1]), -1)
+
+    # label the runs of close rows and keep the earliest row of each
+    starts = np.flatnonzero(np.concatenate([[True], ~close]))
+    index = np.sort(np.minimum.reduceat(order, starts))
+    result = type(a)._new(c[index], a.grades)
+    return (result, index) if return_index else result
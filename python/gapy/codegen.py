@@ -0,0 +1,325 @@
+"""
+Generates straight-line Python source for the products of an algebra from its CayleyTable.
+
+Each generated function unpacks only the blades its table uses, computes each output blade as an explicit sum of
+products (with all the zero terms dropped, and like terms collected, symbolically) and packs the result back into a
+coefficient array. The functions work for single (n_blades,) coefficient arrays and for broadcast (..., n_blades)
+batches alike, and take an optional `out` array to write the result into (which may be one of the operands).
+"""
+
+import hashlib
+import linecache
+import os
+import tempfile
+import weakref
+import numpy as np
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from gapy.cayley import CayleyTable, grade_bits
+
+
+__all__ = ("Kernel", "Kernels", "product_source", "sandwich_source", "set_cache_dir",)
+
+
+# Directory in which generated source is cached, None disables caching. Defaults to the GAPY_CODEGEN_CACHE environment variable.
+_cache_dir = os.environ.get("GAPY_CODEGEN_CACHE")
+
+# Bump this whenever the form of the generated source changes, so stale cached source is not used.
+_SOURCE_VERSION = 2
+
+
+def set_cache_dir(path: Optional[str]):
+    """
+    Cache generated source in the directory `path`, or disable caching if it is None.
+    """
+    global _cache_dir
+    _cache_dir = path
+
+
+# A polynomial is a map from monomials (sorted tuples of variable names) to their integer coefficients,
+# a symbolic multivector is a map from blade index to polynomial.
+Polynomial = Dict[Tuple[str, ...], int]
+Symbolic = Dict[int, Polynomial]
+
+
+def _symbols(prefix: str, blades: np.ndarray) -> Symbolic:
+    return {int(i): {(f"{prefix}{i}",): 1} for i in blades}
+
+
+def _symbolic_product(table: CayleyTable, a: Symbolic, b: Symbolic) -> Symbolic:
+    result: Symbolic = defaultdict(lambda: defaultdict(int))
+    for (i, j, k, s) in zip(table.left, table.right, table.out, table.sign):
+        if i not in a or j not in b:
+            continue
+        for (ma, ca) in a[i].items():
+            for (mb, cb) in b[j].items():
+                result[int(k)][tuple(sorted(ma + mb))] += int(s) * ca * cb
+    return _prune(result)
+
+
+def _prune(a: Symbolic) -> Symbolic:
+    """
+    Drop the terms which cancelled and any blades left with no terms.
+    """
+    pruned = {k: {m: c for (m, c) in p.items() if c != 0} for (k, p) in a.items()}
+    return {k: p for (k, p) in sorted(pruned.items()) if p}
+
+
+def _expression(p: Polynomial) -> str:
+    expr = ""
+    for (monomial, c) in sorted(p.items()):
+        term = "*".join(monomial)
+        if not term:
+            term = f"{abs(c)!r}"
+        elif abs(c) != 1:
+            term = f"{abs(c)!r}*{term}"
+        if not expr:
+            expr = f"-{term}" if c < 0 else term
+        else:
+            expr += f" - {term}" if c < 0 else f" + {term}"
+    return expr
+
+
+def _source(fname: str, doc: str, args: Dict[str, List[int]], result: Symbolic) -> str:
+    lines = [f"def {fname}({', '.join(args)}, out=None):", f'    """{doc}"""']
+    for (arg, blades) in args.items():
+        if blades:
+            names = ", ".join(f"{arg}{i}" for i in blades)
+            lines.append(f"    {names}, = _split({arg}, {list(blades)!r})")
+    for (k, p) in result.items():
+        lines.append(f"    r{k} = {_expression(p)}")
+    values = "".join(f"r{k}, " for k in result)
+    lines.append(f"    return _assemble(({', '.join(args)},), {list(result)!r}, ({values}), out)")
+    return "\n".join(lines) + "\n"
+
+
+def product_source(table: CayleyTable, fname: str) -> str:
+    """
+    Source for the bilinear product `fname(a, b)` described by the table.
+    """
+    result = _symbolic_product(table, _symbols("a", table.left_blades), _symbols("b", table.right_blades))
+    doc = f"Generated product with {table.nterms} terms."
+    return _source(fname, doc, {"a": [int(i) for i in table.left_blades], "b": [int(i) for i in table.right_blades]}, result)
+
+
+def sandwich_source(table: CayleyTable, grades_a: int, grades_b: int, reverse_sign: np.ndarray, fname: str) -> Tuple[str, int]:
+    """
+    Source for the sandwich product `fname(a, b) = a * b * reverse(a)`, and the bitmask of grades it can return.
+    Terms which cancel (for example the trivector part of a rotated vector) are removed symbolically.
+    """
+    left = table.restrict(grades_a, grades_b)
+    a_blades = np.flatnonzero((grades_a >> table.grade_mask) & 1)
+    a = _symbols("a", a_blades)
+    ab = _symbolic_product(left, a, _symbols("b", left.right_blades))
+    right = table.restrict(grade_bits(table.grade_mask[list(ab)]), grades_a)
+    a_reverse = {i: {m: c * int(reverse_sign[i]) for (m, c) in p.items()} for (i, p) in a.items()}
+    result = _symbolic_product(right, ab, a_reverse)
+    doc = "Generated sandwich product a * b * reverse(a)."
+    args = {"a": [int(i) for i in a_blades], "b": [int(i) for i in left.right_blades]}
+    return _source(fname, doc, args, result), grade_bits(table.grade_mask[list(result)])
+
+
+def _split(a: np.ndarray, blades: List[int]) -> List:
+    """
+    The given blades of a, as python scalars for single multivectors (which is much faster) or as contiguous arrays
+    for batches, so the arithmetic is not done on strided views.
+    """
+    if a.ndim == 1:
+        a = a.tolist()
+        return [a[i] for i in blades]
+    else:
+        return list(np.ascontiguousarray(np.moveaxis(a[..., blades], -1, 0)))
+
+
+def _assemble(args: Tuple[np.ndarray], blades: List[int], values: Tuple, out: Optional[np.ndarray], nblades: Optional[int] = None) -> np.ndarray:
+    """
+    Pack the computed values for the given blades into a zeroed coefficient array, or into out if it is given.
+    All the values have been computed by the time this is called, so out may share memory with the arguments.
+    The number of blades is taken from the first argument unless it is given.
+    """
+    if out is not None:
+        out[...] = 0
+        for (i, v) in zip(blades, values):
+            out[..., i] = v
+        return out
+    dtype = np.result_type(*args)
+    if all(a.ndim == 1 for a in args):
+        # the values are python scalars, so building a list is much cheaper than going through numpy indexing
+        out = [0] * (nblades or args[0].shape[0])
+        for (i, v) in zip(blades, values):
+            out[i] = v
+        return np.array(out, dtype=dtype)
+    out = np.zeros(np.broadcast_shapes(*(a.shape[:-1] for a in args)) + (nblades or args[0].shape[-1],), dtype=dtype)
+    for (i, v) in zip(blades, values):
+        out[..., i] = v
+    return out
+
+
+def _compile(source: str, fname: str) -> Callable:
+    filename = f"<gapy-generated {fname}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)  # so tracebacks show the source
+    namespace = {"np": np, "_split": _split, "_assemble": _assemble}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace[fname]
+
+
+def _default_compiler(kernel: "Kernel") -> Callable:
+    return _compile(kernel.source, kernel.fname)
+
+
+# Turns a Kernel's source into the function it calls, replaced by gapy.backend.set_backend.
+_compiler: Callable[["Kernel"], Callable] = _default_compiler
+
+# Every Kernel alive, so they can be recompiled when the backend changes.
+_live: "weakref.WeakSet[Kernel]" = weakref.WeakSet()
+
+
+class Kernel:
+    """
+    A generated function along with its source and the bitmask of grades it can return.
+    """
+
+    def __init__(self, source: str, fname: str, grades: int):
+        self.source = source
+        self.fname = fname
+        self.grades = grades
+        self.compile()
+        _live.add(self)
+
+    def compile(self):
+        """
+        (Re)compile the source with the active backend.
+        """
+        self.fn = _compiler(self)
+
+    def __call__(self, *args: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.fn(*args, out)
+
+    def __repr__(self) -> str:
+        return f"Kernel({self.fname})"
+
+
+def _read_cached(path: str) -> Optional[Tuple[str, int]]:
+    """
+    The source and grades cached in the file, or None if there is no such file or it cannot be parsed (e.g. it was
+    written by an older version), in which case it is generated again.
+    """
+    try:
+        with open(path) as f:
+            header, source = f.readline(), f.read()
+        if not header.startswith("# grades="):
+            return None
+        grades = int(header[len("# grades="):])
+        compile(source, path, "exec")
+    except (OSError, ValueError, SyntaxError):
+        return None
+    return source, grades
+
+
+class Kernels:
+    """
+    The generated product functions for one algebra, specialised to the grades of the operands and cached on first use.
+    """
+
+    # The names of the product methods.
+    kinds = ("gp", "outer", "inner", "left_contraction", "right_contraction", "scalar_product", "commutator", "regressive", "sandwich")
+
+    def __init__(self, name: str, table: CayleyTable, reverse_sign: np.ndarray):
+        self.name = name
+        self.table = table
+        self.reverse_sign = reverse_sign
+        self.all_grades = grade_bits(table.grade_mask)
+        self._kernels: Dict[Tuple[str, int, int], Kernel] = {}
+
+    def _fname(self, kind: str, grades_a: int, grades_b: int) -> str:
+        return f"{kind}_{grades_a}_{grades_b}"
+
+    def _cached_source(self, fname: str, generate: Callable[[], Tuple[str, int]]) -> Tuple[str, int]:
+        if _cache_dir is None:
+            return generate()
+        key = hashlib.sha1(str(_SOURCE_VERSION).encode())
+        for array in (self.table.left, self.table.right, self.table.out, self.table.sign, self.table.grade_mask, self.reverse_sign):
+            key.update(np.ascontiguousarray(array).tobytes())
+        path = os.path.join(_cache_dir, f"{self.name}_{key.hexdigest()[:16]}_{fname}.py")
+        cached = _read_cached(path)
+        if cached is not None:
+            return cached
+        source, grades = generate()
+        os.makedirs(_cache_dir, exist_ok=True)
+        # write a temporary file and rename it into place, so other processes never read a partly written one
+        fd, temporary = tempfile.mkstemp(suffix=".tmp", dir=_cache_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(f"# grades={grades}\n{source}")
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        return source, grades
+
+    def _kernel(self, kind: str, grades_a: int, grades_b: int) -> Kernel:
+        key = (kind, grades_a, grades_b)
+        if key not in self._kernels:
+            fname = self._fname(kind, grades_a, grades_b)
+            if kind == "sandwich":
+                generate = lambda: sandwich_source(self.table, grades_a, grades_b, self.reverse_sign, fname)
+            else:
+                table = (self.table if kind == "geometric" else getattr(self.table, kind)).restrict(grades_a, grades_b)
+                generate = lambda: (product_source(table, fname), table.grades)
+            source, grades = self._cached_source(fname, generate)
+            self._kernels[key] = Kernel(source, fname, grades)
+        return self._kernels[key]
+
+    def gp(self, grades_a: int, grades_b: int) -> Kernel:
+        """
+        The geometric product for operands with the given grade bitmasks.
+        """
+        return self._kernel("geometric", grades_a, grades_b)
+
+    def outer(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("outer", grades_a, grades_b)
+
+    def inner(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("inner", grades_a, grades_b)
+
+    def left_contraction(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("left_contraction", grades_a, grades_b)
+
+    def right_contraction(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("right_contraction", grades_a, grades_b)
+
+    def scalar_product(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("scalar_product", grades_a, grades_b)
+
+    def commutator(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("commutator", grades_a, grades_b)
+
+    def regressive(self, grades_a: int, grades_b: int) -> Kernel:
+        return self._kernel("regressive", grades_a, grades_b)
+
+    def sandwich(self, grades_a: int, grades_b: int) -> Kernel:
+        """
+        The sandwich product a * b * reverse(a) for operands with the given grade bitmasks.
+        """
+        return self._kernel("sandwich", grades_a, grades_b)
+
+    def source(self, kind: str = "gp", grades_a: Optional[int] = None, grades_b: Optional[int] = None) -> str:
+        """
+        The generated source of one of the products (the name of one of the methods, e.g. "gp", "outer" or "sandwich"),
+        by default for general operands.
+        """
+        grades_a = self.all_grades if grades_a is None else grades_a
+        grades_b = self.all_grades if grades_b is None else grades_b
+        return getattr(self, kind)(grades_a, grades_b).source
+
+    def dump(self, f: TextIO):
+        """
+        Write the source of the general products, and of every specialisation generated so far, to the file f.
+        """
+        for kind in self.kinds:
+            getattr(self, kind)(self.all_grades, self.all_grades)
+        f.write(f"# Generated products for {self.name}\n")
+        for kernel in self._kernels.values():
+            f.write(f"\n\n# grades={kernel.grades}\n{kernel.source}")
@@ -1,22 +1,106 @@
+import operator
 import numpy as np
 
-from typing import Tuple, Type, Dict, TextIO, Callable
+from functools import lru_cache
+from typing import Tuple, Type, Dict, TextIO, Callable, Union
 
+from gapy.cayley import CayleyTable, grade_bits
+from gapy.codegen import Kernels
+from gapy import elementary, lazy
+from gapy import backend  # noqa: F401, imported for its side effect of selecting the backend from GAPY_BACKEND
 
-__all__ = ("GenericMultivector", "multivector_type",)
+
+__all__ = ("GenericMultivector", "multivector_type", "algebra", "algebra_tables",
+           "gp", "sandwich", "add", "sub", "neg", "scale",
+           "outer", "inner", "left_contraction", "right_contraction", "scalar_product", "commutator", "regressive",)
 
 
 class GenericMultivector:
     """
-    Base class for all Multivector types. 
+    Base class for all Multivector types.
     Does not do anything currently, make it ABC and put methods on it to help completion.
     """
-    pass
+    __slots__ = ()
+
+
+def _named(type_name: str) -> Callable:
+    """
+    Returns a metaclass which names the constructed type `type_name`, regardless of the name used in the class statement.
+    """
+
+    def _meta(_: str, supers: Tuple[Type], attrs: Dict[str, Callable]):
+        return type(type_name, supers, attrs)
+
+    return _meta
 
 
-def multivector_type(name: str, basis_idx: np.ndarray, basis_sign: np.ndarray, grade_mask: np.ndarray) -> Type[GenericMultivector]:
+def _as_slice(blades: np.ndarray):
+    """
+    A slice equivalent to indexing with the (sorted) blades if they are contiguous, so indexing gives a view not a copy.
+    """
+    if len(blades) > 0 and blades[-1] - blades[0] == len(blades) - 1:
+        return slice(int(blades[0]), int(blades[-1]) + 1)
+    return blades
+
+
+# The numpy ufuncs Multivectors support, and the multivector operations they stand for.
+_ufuncs = {
+    np.add: operator.add,
+    np.subtract: operator.sub,
+    np.multiply: operator.mul,
+    np.true_divide: operator.truediv,
+    np.negative: operator.neg,
+    np.positive: operator.pos,
+    np.exp: elementary.exp,
+    np.log: elementary.log,
+    np.sqrt: elementary.sqrt,
+    np.reciprocal: elementary.inverse,
+    np.bitwise_xor: operator.xor,
+    np.bitwise_or: operator.or_,
+    np.bitwise_and: operator.and_,
+    np.left_shift: operator.lshift,
+    np.right_shift: operator.rshift,
+}
+
+
+def _coefficient_dtype(values: Tuple, default: np.dtype) -> np.dtype:
+    """
+    The dtype of coefficients built from the values: numpy floating point and complex values keep their precision,
+    integers and python numbers take the default dtype (made complex if any of them are complex).
+    """
+    inexact = []
+    is_complex = False
+    for v in values:
+        if isinstance(v, (int, float)):
+            continue
+        elif isinstance(v, complex):
+            is_complex = True
+            continue
+        dtype = v.dtype if isinstance(v, (np.ndarray, np.generic)) else np.asarray(v).dtype
+        if dtype.kind in "fc":
+            inexact.append(dtype)
+    dtype = np.result_type(*inexact) if inexact else np.dtype(default)
+    return np.result_type(dtype, np.complex64) if is_complex else dtype
+
+
+def _scalar_factor(other) -> Union[float, np.ndarray]:
+    """
+    The scalar (or batch of scalars) other, ready to multiply (..., nblades) coefficients. Python numbers are left
+    alone so, as in numpy, they do not change the dtype of the coefficients.
+    """
+    return other if isinstance(other, (int, float, complex)) else np.asarray(other)[..., np.newaxis]
+
+
+def multivector_type(name: str, basis_idx: np.ndarray, basis_sign: np.ndarray, grade_mask: np.ndarray,
+                     dtype: np.dtype = np.float64) -> Type[GenericMultivector]:
     """
     Construct a GenericMultivector type which uses the basis_idx, basis_sign and grade_mask, arrays given.
+    Multivectors constructed from python numbers or integers have coefficients of the given dtype (see the
+    `default_dtype` attribute of the returned type), those constructed from floating point or complex arrays keep
+    the precision of the arrays, so float32 batches stay float32 through every operation.
+    The batched companion type is available as the `Array` attribute of the returned type, the multiplication table as
+    the `cayley` attribute, the generated product functions as the `kernels` attribute and the arguments given here
+    as the `tables` attribute.
     """
 
     # First we perform some sanity checks on the basis:
@@ -25,8 +109,8 @@ def multivector_type(name: str, basis_idx: np.ndarray, basis_sign: np.ndarray, g
     assert grade_mask.ndim == 1
     assert basis_sign.ndim == 2
     assert basis_idx.ndim == 2
-    assert basis_idx.shape[0] == basis_idx.shape[1] 
-    assert basis_sign.shape[0] == basis_sign.shape[1] 
+    assert basis_idx.shape[0] == basis_idx.shape[1]
+    assert basis_sign.shape[0] == basis_sign.shape[1]
     assert basis_sign.shape == basis_idx.shape
     assert basis_idx.shape[0] == grade_mask.shape[0]
 
@@ -42,78 +126,302 @@ def multivector_type(name: str, basis_idx: np.ndarray, basis_sign: np.ndarray, g
     # Now we construct the type which will use basis_idx and basis_sign:
 
     ndims = np.sum(grade_mask == 1)
+    nblades = len(grade_mask)
+    max_grade = int(np.max(grade_mask))
+    all_grades = grade_bits(grade_mask)
+    grade_blades = [np.flatnonzero(grade_mask == g) for g in range(max_grade + 1)]
+    grade_selectors = [_as_slice(blades) for blades in grade_blades]
+    grade_projectors = [grade_mask == g for g in range(max_grade + 1)]
+    # The grades of the blades in each byte of a packed (little endian) bitmask of blades, and the grade of each bitmask
+    # of grades (0 for none and nan for mixed grades), so classifying a batch takes a single pass, see present_grades.
+    blade_bits = np.zeros(-(-nblades // 8) * 8, dtype=np.int64)
+    blade_bits[:nblades] = 1 << grade_mask
+    byte_bits = (np.arange(256)[:, np.newaxis] >> np.arange(8)) & 1
+    byte_grades = [np.bitwise_or.reduce(byte_bits * blade_bits[k:k + 8], axis=1) for k in range(0, len(blade_bits), 8)]
+    single_grade = np.full(2 << max_grade, np.nan)
+    single_grade[0] = 0
+    single_grade[1 << np.arange(max_grade + 1)] = np.arange(max_grade + 1)
+
+    # The signs are int8 so multiplying by them never promotes float32 (or complex64) coefficients.
+    reverse_sign = np.where((grade_mask // 2) % 2 == 0, 1, -1).astype(np.int8)  # (-1)^(g(g-1)/2)
+    involute_sign = np.where(grade_mask % 2 == 0, 1, -1).astype(np.int8)  # (-1)^g
+    conjugate_sign = reverse_sign * involute_sign  # (-1)^(g(g+1)/2)
+    cayley = CayleyTable.from_basis(basis_idx, basis_sign, grade_mask)
+    kernels = Kernels(name, cayley, reverse_sign)
+
+    def _permuted(blades_signs: Tuple[np.ndarray, np.ndarray], a: "Multivector") -> "Multivector":
+        """
+        A linear map taking each blade to a signed blade of the complementary grade, e_i -> signs[i] * e_blades[i].
+        """
+        blades, signs = blades_signs
+        coefficients = np.empty(a._coefficients.shape, dtype=np.result_type(a._coefficients, signs))
+        coefficients[..., blades] = a._coefficients * signs
+        return _new(coefficients, grade_bits(max_grade - g for g in range(max_grade + 1) if (a.grades >> g) & 1))
 
-    def _meta(_: str, supers: Tuple[Type], attrs: Dict[str, Callable]):
+    def _new(coefficients: np.ndarray, grades: int) -> "Multivector":
         """
-        Construct a type with the name coming from `multivector_type`. 
+        Wrap the coefficients in a Multivector, or a Multivector.Array if they have batch dimensions, without copying
+        or checking them. The grades bitmask records which grades may be non-zero, it is the caller's job to make sure it is right.
         """
-        return type(name, supers, attrs)
+        mv = object.__new__(Multivector if coefficients.ndim == 1 else MultivectorArray)
+        mv._coefficients = coefficients
+        mv.grades = grades
+        return mv
 
-    class Multivector(GenericMultivector, metaclass=_meta):
+    def _from_blades(blades: np.ndarray, grades: int, *values: float) -> "Multivector":
+        """
+        Construct a Multivector (or Multivector.Array) with the given blades set to the (broadcast) values and all others zero.
+        """
+        if all(isinstance(v, (int, float, complex, np.number)) for v in values):
+            coefficients = np.zeros(nblades, dtype=_coefficient_dtype(values, Multivector.default_dtype))
+            coefficients[blades] = values
+        else:
+            values = np.broadcast_arrays(*values)
+            coefficients = np.zeros(values[0].shape + (nblades,), dtype=_coefficient_dtype(values, Multivector.default_dtype))
+            coefficients[..., blades] = np.stack(values, -1)
+        return _new(coefficients, grades)
+
+    class Multivector(GenericMultivector, metaclass=_named(name)):
         """
         A class which wraps the numpy operations to give us operator overloading.
+        All operations broadcast over any leading (batch) dimensions of the coefficients, see the Array attribute.
+        Each object carries a bitmask, `grades`, of the grades which may be non-zero. This is tracked symbolically
+        through the operations so that products only do the work for blades which can be non-zero.
         TODO: some sanity checks that we're not mixing, say, Multivector3D with Multivector2D.
         """
 
+        __slots__ = ("_coefficients", "grades")
+
+        @property
+        def coefficients(self) -> np.ndarray:
+            """
+            The (..., nblades) array of coefficients. As anything may be written through it, self.grades becomes all
+            the grades when it is handed out (unless it is read-only), so later operations see every blade.
+            """
+            if self._coefficients.flags.writeable:
+                self.grades = all_grades
+            return self._coefficients
+
+        @coefficients.setter
+        def coefficients(self, coefficients: np.ndarray):
+            self._coefficients = coefficients
+            self.grades = all_grades
+
+        def __array__(self, dtype=None, copy=None) -> np.ndarray:
+            """
+            The coefficients, so np.asarray(a) is a view of a rather than a copy (unless a different dtype is asked for).
+            As anything may be written through the view, self.grades becomes all the grades when it is handed out.
+            """
+            if copy is False and dtype is not None and np.dtype(dtype) != self._coefficients.dtype:
+                raise ValueError(f"Cannot convert {name} coefficients to {dtype} without copying.")
+            if copy:
+                return np.array(self._coefficients, dtype=dtype)
+            coefficients = self._coefficients if dtype is None else self._coefficients.astype(dtype, copy=False)
+            return self.coefficients if coefficients is self._coefficients else coefficients
+
+        def __array_ufunc__(self, ufunc: np.ufunc, method: str, *inputs, out=None, **kwargs):
+            """
+            Numpy ufuncs act as multivector operations: the arithmetic ufuncs are the geometric algebra arithmetic, with
+            numbers and arrays of numbers acting as scalars, so `ndarray * Multivector` broadcasts the scalars over the
+            batch, np.exp, np.log, np.sqrt and np.reciprocal are exp, log, sqrt and inverse and the bitwise ufuncs are
+            the products of the bitwise operators (see Multivector.outer and friends). Other ufuncs are not supported,
+            apply them to the coefficients instead.
+            """
+            if method != "__call__" or kwargs or ufunc not in _ufuncs:
+                return NotImplemented
+            if ufunc is np.multiply and not isinstance(inputs[0], Multivector):
+                inputs = inputs[::-1]  # scalars commute with everything
+            elif ufunc is not np.multiply:
+                inputs = [x if isinstance(x, Multivector) or (ufunc is np.true_divide and i == 1) else Multivector.make.scalar(x)
+                          for (i, x) in enumerate(inputs)]
+            result = _ufuncs[ufunc](*inputs)
+            if out is None:
+                return result
+            out[0]._coefficients[...] = result._coefficients
+            out[0].grades = result.grades
+            return out[0]
+
         def __init__(self, *coefficients: Tuple[float]):
-            coefficients = np.squeeze(np.array(coefficients))
+            coefficients = np.squeeze(np.array(coefficients, dtype=_coefficient_dtype(coefficients, Multivector.default_dtype)))
             assert coefficients.shape == grade_mask.shape, f"[{coefficients.shape!r} != {grade_mask.shape!r}]"
-            self.coefficients = coefficients
+            self._coefficients = coefficients
+            self.grades = all_grades
 
         def __repr__(self) -> str:
-            return f"{name}({self.coefficients!r})"
+            return f"{name}({self._coefficients!r})"
 
         def __str__(self) -> str:
-            return f"[{self.coefficients}, grade={self.grade}]"
+            return f"[{self._coefficients}, grade={self.grade}]"
 
         def __eq__(self, other: "Multivector") -> bool:
             if not isinstance(other, Multivector):
                 return False
+            elif self._coefficients.shape != other._coefficients.shape:
+                return False
             else:
-                return np.allclose(self.coefficients, other.coefficients)
+                return np.allclose(self._coefficients, other._coefficients)
 
         def __mul__(self, other: "Multivector") -> "Multivector":
             if isinstance(other, Multivector):
-                a = self.coefficients
-                b = other.coefficients
-                B = b[basis_idx] * basis_sign
-                return Multivector(B@a)
+                kernel = kernels.gp(self.grades, other.grades)
+                return _new(kernel(self._coefficients, other._coefficients), kernel.grades)
+            elif isinstance(other, lazy.Expr):
+                return NotImplemented
             else:
-                return Multivector(self.coefficients * other)
-        
+                return _new(self._coefficients * _scalar_factor(other), self.grades)
+
         def __truediv__(self, other: "Multivector") -> "Multivector":
             if isinstance(other, Multivector):
-                mag2 = np.sum((other * other).coefficients[0])  # TODO: This is correct for pure vectors & bivectors but what about mixed?
-                return self * (other / mag2)
+                return self * other.inverse()
             else:
-                return Multivector(self.coefficients / other)
+                return _new(self._coefficients / _scalar_factor(other), self.grades)
+
+        def __rtruediv__(self, other: float) -> "Multivector":
+            return self.inverse() * other
 
         def __add__(self, other: "Multivector") -> "Multivector":
-            return Multivector(self.coefficients + other.coefficients)
+            try:
+                return _new(self._coefficients + other._coefficients, self.grades | other.grades)
+            except AttributeError:
+                return NotImplemented  # e.g. a lazy expression, which handles this in __radd__
 
         def __sub__(self, other: "Multivector") -> "Multivector":
-            return Multivector(self.coefficients - other.coefficients)
+            try:
+                return _new(self._coefficients - other._coefficients, self.grades | other.grades)
+            except AttributeError:
+                return NotImplemented
 
         def __neg__(self) -> "Multivector":
-            return Multivector(-self.coefficients)
+            return _new(-self._coefficients, self.grades)
+
+        def __pos__(self) -> "Multivector":
+            return _new(self._coefficients.copy(), self.grades)
+
+        def __iadd__(self, other: "Multivector") -> "Multivector":
+            return add(self, other, out=self) if isinstance(other, Multivector) and _can_write(self, other) else NotImplemented
+
+        def __isub__(self, other: "Multivector") -> "Multivector":
+            return sub(self, other, out=self) if isinstance(other, Multivector) and _can_write(self, other) else NotImplemented
+
+        def __imul__(self, other: "Multivector") -> "Multivector":
+            if isinstance(other, Multivector):
+                return gp(self, other, out=self) if _can_write(self, other) else NotImplemented
+            elif isinstance(other, (GenericMultivector, lazy.Expr)):  # other algebras and lazy expressions
+                return NotImplemented
+            else:
+                return scale(self, other, out=self) if _can_write(self, other) else NotImplemented
 
         def __rmul__(self, other: float) -> "Multivector":
-            return Multivector.make.scalar(other) * self
+            return self * other  # scalars commute with everything
 
         def __radd__(self, other: float) -> "Multivector":
-            return Multivector.make.scalar(other) + self
+            return Multivector.make.scalar(np.asarray(other, dtype=np.result_type(self._coefficients, other))) + self
 
         def __rsub__(self, other: float) -> "Multivector":
-            return Multivector.make.scalar(other) - self
+            return Multivector.make.scalar(np.asarray(other, dtype=np.result_type(self._coefficients, other))) - self
+
+        def outer(self, other: "Multivector") -> "Multivector":
+            """
+            The outer (exterior, wedge) product, also `self ^ other`.
+            """
+            return _product("outer", self, other)
+
+        def inner(self, other: "Multivector") -> "Multivector":
+            """
+            The inner product, the terms of grade |r - s| of the product of grades r and s, also `self | other`.
+            """
+            return _product("inner", self, other)
+
+        def left_contraction(self, other: "Multivector") -> "Multivector":
+            """
+            The left contraction, the terms of grade s - r of the product of grades r and s, also `self << other`.
+            """
+            return _product("left_contraction", self, other)
+
+        def right_contraction(self, other: "Multivector") -> "Multivector":
+            """
+            The right contraction, the terms of grade r - s of the product of grades r and s, also `self >> other`.
+            """
+            return _product("right_contraction", self, other)
+
+        def scalar_product(self, other: "Multivector") -> "Multivector":
+            """
+            The scalar part of the geometric product, as a multivector.
+            """
+            return _product("scalar_product", self, other)
+
+        def commutator(self, other: "Multivector") -> "Multivector":
+            """
+            The commutator product (self * other - other * self) / 2.
+            """
+            return _product("commutator", self, other)
+
+        def regressive(self, other: "Multivector") -> "Multivector":
+            """
+            The regressive (vee) product, the dual of the outer product, also `self & other`.
+            """
+            return _product("regressive", self, other)
+
+        def __xor__(self, other: "Multivector") -> "Multivector":
+            return NotImplemented if isinstance(other, lazy.Expr) else _product("outer", self, other)
+
+        def __or__(self, other: "Multivector") -> "Multivector":
+            return NotImplemented if isinstance(other, lazy.Expr) else _product("inner", self, other)
+
+        def __lshift__(self, other: "Multivector") -> "Multivector":
+            return NotImplemented if isinstance(other, lazy.Expr) else _product("left_contraction", self, other)
+
+        def __rshift__(self, other: "Multivector") -> "Multivector":
+            return NotImplemented if isinstance(other, lazy.Expr) else _product("right_contraction", self, other)
+
+        def __and__(self, other: "Multivector") -> "Multivector":
+            return NotImplemented if isinstance(other, lazy.Expr) else _product("regressive", self, other)
+
+        def __rxor__(self, other: float) -> "Multivector":
+            return _product("outer", Multivector.make.scalar(other), self)
+
+        def __ror__(self, other: float) -> "Multivector":
+            return _product("inner", Multivector.make.scalar(other), self)
+
+        def __rlshift__(self, other: float) -> "Multivector":
+            return _product("left_contraction", Multivector.make.scalar(other), self)
+
+        def __rrshift__(self, other: float) -> "Multivector":
+            return _product("right_contraction", Multivector.make.scalar(other), self)
+
+        def __rand__(self, other: float) -> "Multivector":
+            return _product("regressive", Multivector.make.scalar(other), self)
 
         def exp(self) -> "Multivector":
-            if self.grade == 0:
-                return Multivector.make.scalar(np.exp(self.scalar))
-            elif self.grade == 2:
-                theta = np.sqrt(np.sum(self.coefficients**2))
-                return np.cos(theta) + np.sin(theta)*self.unit
-            else:
-                raise ValueError(f"Only know how to exponentiate scalars and bivectors! [${B!r}]")
+            """
+            The exponential, e.g. the rotor generated by a bivector. See gapy.elementary for the methods used.
+            """
+            return elementary.exp(self)
+
+        def log(self) -> "Multivector":
+            """
+            The logarithm, e.g. the bivector generating a rotor.
+            """
+            return elementary.log(self)
+
+        def sqrt(self) -> "Multivector":
+            """
+            The principal square root, e.g. the rotor for half the rotation.
+            """
+            return elementary.sqrt(self)
+
+        def inverse(self) -> "Multivector":
+            """
+            The multiplicative inverse, so that self * self.inverse() == 1.
+            """
+            return elementary.inverse(self)
+
+        @property
+        def lazy(self) -> "lazy.Expr":
+            """
+            This multivector as the leaf of a lazily evaluated expression, see gapy.lazy.
+            """
+            return lazy.lift(self)
 
         @property
         def scalar(self) -> float:
@@ -121,15 +429,41 @@ def multivector_type(name: str, basis_idx: np.ndarray, basis_sign: np.ndarray, g
             Convenience function for projecting onto the zero (scalar) grade.
             :return: Unlike {name}.project, this returns a float, not a {name} object.
             """
-            return self.coefficients[0]
+            return self._coefficients[..., 0]
 
         @property
         def vector(self) -> np.ndarray:
             f"""
             Convenience function for projecting onto the vector grade.
-            :return: Unlike {name}.project, this returns a raw numpy array, not a {name} object.
+            :return: Unlike {name}.project, this returns a raw numpy array, not a {name} object. When it is a view of the
+            coefficients the vector grade is added to self.grades, as for grade_view, so writes to it are not lost.
+            """
+            if isinstance(grade_selectors[1], slice):
+                self.grades |= 1 << 1
+            return self._coefficients[..., grade_selectors[1]]
+
+        @property
+        def dtype(self) -> np.dtype:
+            return self._coefficients.dtype
+
+        def astype(self, dtype: np.dtype, copy: bool = True) -> "Multivector":
+            """
+            A copy with coefficients of the given dtype, or self if they already have it and copy is False.
+            """
+            if not copy and self._coefficients.dtype == dtype:
+                return self
+            return _new(self._coefficients.astype(dtype), self.grades)
+
+        def grade_view(self, grade: int) -> np.ndarray:
+            """
+            The (..., n) coefficients of the n blades of the grade, as a view which reads and writes self's coefficients.
+            The grade is added to self.grades, so whatever is written through the view is seen by later operations.
             """
-            return self.coefficients[grade_mask == 1]
+            selector = grade_selectors[grade]
+            if not isinstance(selector, slice):
+                raise ValueError(f"The blades of grade {grade} are not contiguous so cannot be viewed. [blades={selector!r}]")
+            self.grades |= 1 << grade
+            return self._coefficients[..., selector]
 
         @property
         def pseudoscalar(self) -> float:
@@ -137,76 +471,441 @@ def multivector_type(name: str, basis_idx: np.ndarray, basis_sign: np.ndarray, g
             Convenience function for projecting onto the pseudoscalar grade.
             :return: Unlike {name}.project, this returns a float, not a {name} object.
             """
-            return self.coefficients[-1]
+            return self._coefficients[..., -1]
 
         def project(self, grade: int) -> "Multivector":
             f"""
-            Project onto an arbitrary grade. 
-            :return: A {name} object, even if the grade is zero, for example. 
+            Project onto an arbitrary grade.
+            :return: A {name} object, even if the grade is zero, for example.
             """
-            c_ = [c if grade_mask[i] == grade else 0 for (i, c) in enumerate(self.coefficients)]
-            return Multivector(*c_)
+            if not 0 <= grade <= max_grade:
+                return _new(np.zeros_like(self._coefficients), 0)
+            return _new(self._coefficients * grade_projectors[grade], self.grades & (1 << grade))
 
-        def is_grade(self, i: int) -> bool:
-            return np.any(np.abs(self.coefficients[grade_mask == i]) > 1e-8)
+        def is_grade(self, i: int, atol: float = 1e-8) -> bool:
+            if not (self.grades >> i) & 1:
+                return np.zeros(self._coefficients.shape[:-1], dtype=bool)[()]
+            return np.any(np.abs(self._coefficients[..., grade_selectors[i]]) > atol, -1)
+
+        def present_grades(self, atol: float = 1e-8, rtol: float = 0.0) -> np.ndarray:
+            """
+            The bitmask of the grades present in each multivector of the batch, those with a coefficient larger than
+            atol + rtol * (the largest coefficient of the multivector). One pass over the coefficients classifies them all.
+            """
+            magnitude = np.abs(self._coefficients)
+            threshold = atol + rtol * np.max(magnitude, -1, keepdims=True) if rtol else atol
+            packed = np.packbits(magnitude > threshold, axis=-1, bitorder="little")
+            bits = byte_grades[0][packed[..., 0]]
+            for k in range(1, packed.shape[-1]):
+                bits |= byte_grades[k][packed[..., k]]
+            return (bits & self.grades)[()]
 
         @property
-        def grade(self) -> float:
-            grades = [self.is_grade(i) for i in range(np.max(grade_mask)+1)]
-            if not any(grades):
-                return 0  # I _think_ it makes sense that grade(0) = 0
-            elif sum(grades) > 1:
-                return np.nan  # mixed grade
-            else:
-                return grades.index(True)
+        def grade(self) -> Union[int, float, np.ndarray]:
+            """
+            The grade, as an int, or nan for mixed grades. Batches give a float array of them, so they can hold the nans.
+            """
+            # I _think_ it makes sense that grade(0) = 0, and mixed grade objects are nan
+            g = single_grade[self.present_grades()]
+            if np.ndim(g) == 0:
+                return np.nan if np.isnan(g) else int(g)
+            return g
+
+        def isclose(self, other: "Multivector", rtol: float = 1e-05, atol: float = 1e-08) -> np.ndarray:
+            """
+            Whether each multivector of the batch equals other (broadcast against it) to within the tolerances, i.e.
+            np.isclose holds for every coefficient: |self - other| <= atol + rtol * |other|.
+            """
+            if not isinstance(other, Multivector):
+                other = Multivector.make.scalar(other)
+            difference = np.abs(self._coefficients - other._coefficients)
+            return np.all(difference <= atol + rtol * np.abs(other._coefficients), -1)[()]
 
         @property
         def unit(self) -> "Multivector":
             g = self.grade
-            if np.isnan(g):
+            if np.any(np.isnan(g)):
                 raise ValueError(f"Cannot unit mixed grade object. [self={self!r}]")
-            a = self.coefficients
-            return Multivector(a / np.sqrt(np.sum(a*a)))
+            a = self._coefficients
+            return _new(a / np.sqrt(np.sum(a*a, -1, keepdims=True)), self.grades)
 
         @property
         def reverse(self) -> "Multivector":
-            return Multivector(*(basis_sign[0, :] * self.coefficients))
+            return _new(reverse_sign * self._coefficients, self.grades)
+
+        @property
+        def involute(self) -> "Multivector":
+            """
+            The grade involution, which negates the odd grades.
+            """
+            return _new(involute_sign * self._coefficients, self.grades)
+
+        @property
+        def conjugate(self) -> "Multivector":
+            """
+            The Clifford conjugate, the reverse of the grade involution.
+            """
+            return _new(conjugate_sign * self._coefficients, self.grades)
+
+        @property
+        def complement(self) -> "Multivector":
+            """
+            The right complement, the linear map with e ^ e.complement == I for each basis blade e. It needs no metric,
+            so unlike the dual it exists in degenerate algebras, and it turns the outer product into the regressive one.
+            """
+            return _permuted(cayley.complement, self)
+
+        @property
+        def hodge(self) -> "Multivector":
+            """
+            The Hodge star self.reverse * I, so a ^ b.hodge == (a * b.reverse).scalar * I for a and b of the same grade.
+            It is zero on the blades which square to zero in degenerate algebras.
+            """
+            return _permuted(cayley.hodge, self)
+
+        @property
+        def dual(self) -> "Multivector":
+            """
+            The dual self * I.inverse(), raises ValueError if the pseudoscalar is not invertible.
+            """
+            return _permuted(cayley.dual, self)
+
+        def apply(self, other: "Multivector") -> "Multivector":
+            """
+            The sandwich product self * other * self.reverse, e.g. applying the rotor self to other, as a single fused kernel.
+            """
+            kernel = kernels.sandwich(self.grades, other.grades)
+            return _new(kernel(self._coefficients, other._coefficients), kernel.grades)
+
+        def to_matrix(self) -> np.ndarray:
+            """
+            The (..., ndims, ndims) matrix M of the linear map x -> self * x * self.reverse on vectors,
+            so that for a rotor R and an (N, ndims) array of points p, `p @ R.to_matrix().T` rotates all the points.
+            """
+            kernel = kernels.sandwich(self.grades, grade_bits([1]))
+            basis = np.zeros((ndims, nblades), dtype=self._coefficients.dtype)
+            basis[:, grade_selectors[1]] = np.eye(ndims)
+            columns = kernel(self._coefficients[..., np.newaxis, :], basis)[..., grade_selectors[1]]
+            return np.swapaxes(columns, -1, -2)
 
         def rotate_rad(self, angle: float, plane: "Multivector") -> "Multivector":
-            Rl = Multivector.make.rotor(angle, plane)
-            Rr = Rl.reverse
-            return Rl*self*Rr
+            return Multivector.make.rotor(angle, plane).apply(self)
 
         def rotate_deg(self, angle: float, plane: "Multivector") -> "Multivector":
-            return self.rotate_rad(angle * (np.pi/180.), plane)
+            return self.rotate_rad(np.multiply(angle, np.pi/180.), plane)
+
+        @staticmethod
+        def wrap(coefficients: np.ndarray, grades: int = None) -> "Multivector":
+            """
+            Wrap an existing (..., n_blades) array as a Multivector or Multivector.Array without copying it, so the two
+            share memory. Pass the bitmask of grades which are non-zero in it, if known, so products can skip the rest.
+            """
+            coefficients = np.asarray(coefficients)
+            assert coefficients.shape[-1:] == grade_mask.shape, f"[{coefficients.shape!r} != (..., {grade_mask.shape[0]!r})]"
+            return _new(coefficients, all_grades if grades is None else grades)
 
         class make:
             """
             A helper type to construct Multivectors from a subset of the basis elements.
+            Passing arrays rather than floats gives a Multivector.Array with the broadcast shape of the arguments.
             """
-            
+
+            @staticmethod
+            def grade(grade: int, values: np.ndarray) -> "Multivector":
+                """
+                The multivectors of a single grade with the (..., n) array of coefficients for the n blades of that grade,
+                e.g. `make.grade(1, points)` for an (N, ndims) array of points, in one vectorised copy.
+                """
+                values = np.asarray(values)
+                assert values.shape[-1:] == (len(grade_blades[grade]),), f"[{values.shape!r} != (..., {len(grade_blades[grade])!r})]"
+                coefficients = np.zeros(values.shape[:-1] + (nblades,), dtype=_coefficient_dtype((values,), Multivector.default_dtype))
+                coefficients[..., grade_selectors[grade]] = values
+                return _new(coefficients, 1 << grade)
+
             @staticmethod
             def scalar(a: float) -> "Multivector":
-                return Multivector(a, *([0] * (len(grade_mask)-1)))
+                return _from_blades(grade_selectors[0], 1, a)
 
             @staticmethod
             def vector(*args: float) -> "Multivector":
                 assert len(args) == ndims
-                return Multivector(0, *args, *[0]*(len(grade_mask) - ndims - 1))
+                return _from_blades(grade_selectors[1], 1 << 1, *args)
+
+            @staticmethod
+            def bivector(*args: float) -> "Multivector":
+                assert len(args) == len(grade_blades[2])
+                return _from_blades(grade_selectors[2], 1 << 2, *args)
 
             @staticmethod
             def pseudoscalar(a: float) -> "Multivector":
-                return Multivector(*([0] * (len(grade_mask)-1)), a)
+                return _from_blades(grade_selectors[max_grade], 1 << max_grade, a)
 
             @staticmethod
             def rotor(angle_radians: float, plane: "Multivector") -> "Multivector":
                 """
                 Returns the (left) Rotor for rotation by the specified angle in the specified plane.
                 """
-                assert plane.grade == 2, f"Expected bivector! [plane={plane!r}, grade={plane.grade!r}]"
-                angle_radians /= 2
-                Rl = Multivector.make.scalar(np.cos(angle_radians)) - np.sin(angle_radians) * plane.unit
+                assert np.all(plane.present_grades() == 1 << 2), f"Expected bivector! [plane={plane!r}, grade={plane.grade!r}]"
+                # the angles set the precision, unless they are python numbers
+                dtype = _coefficient_dtype((angle_radians,), _coefficient_dtype((plane._coefficients,), Multivector.default_dtype))
+                half_angle = np.divide(angle_radians, 2, dtype=dtype)
+                plane = plane.astype(dtype, copy=False)
+                Rl = Multivector.make.scalar(np.cos(half_angle)) - np.sin(half_angle) * plane.unit.project(2)
                 return Rl
 
+    class MultivectorArray(Multivector, metaclass=_named(f"{name}Array")):
+        """
+        A batch of Multivectors stored as one contiguous array of shape (..., n_blades).
+        Indexing and iteration act on the batch dimensions and yield single Multivectors when no batch dimensions remain.
+        """
+
+        __slots__ = ()
+
+        def __init__(self, coefficients: np.ndarray):
+            coefficients = np.asarray(coefficients)
+            coefficients = coefficients.astype(_coefficient_dtype((coefficients,), Multivector.default_dtype), copy=False)
+            assert coefficients.shape[-1:] == grade_mask.shape, f"[{coefficients.shape!r} != (..., {grade_mask.shape[0]!r})]"
+            self._coefficients = coefficients
+            self.grades = all_grades
+
+        def __repr__(self) -> str:
+            return f"{name}.Array({self._coefficients!r})"
+
+        @property
+        def shape(self) -> Tuple[int]:
+            return self._coefficients.shape[:-1]
+
+        def __len__(self) -> int:
+            return self._coefficients.shape[0]
+
+        def __getitem__(self, key) -> "Multivector":
+            key = key if isinstance(key, tuple) else (key,)
+            return _new(self._coefficients[key + (slice(None),)], self.grades)
+
+        def __setitem__(self, key, value: "Multivector"):
+            key = key if isinstance(key, tuple) else (key,)
+            self._coefficients[key + (slice(None),)] = value._coefficients
+            self.grades |= value.grades
+
+        def __iter__(self):
+            for i in range(len(self)):
+                yield self[i]
+
+    Multivector.Array = MultivectorArray
+    Multivector._new = staticmethod(_new)
+    Multivector.cayley = cayley
+    Multivector.kernels = kernels
+    Multivector.tables = (name, basis_idx, basis_sign, grade_mask)
+    Multivector.signature = None  # (p, q, r), when known
+    Multivector.default_dtype = np.dtype(dtype)
 
     return Multivector
+
+
+def _coefficients(a) -> np.ndarray:
+    return a._coefficients if isinstance(a, GenericMultivector) else np.asarray(a)[..., np.newaxis]
+
+
+def _can_write(a: GenericMultivector, b) -> bool:
+    """
+    Whether the result of an operation on a and b can be written into a's coefficients, i.e. they are writeable and
+    doing so would not need a to change shape or be cast to a wider dtype. In-place operators fall back to allocating
+    a new result otherwise.
+    """
+    if not a._coefficients.flags.writeable:
+        return False
+    b = _coefficients(b)
+    result_type = np.result_type(a._coefficients, b)
+    return np.can_cast(result_type, a._coefficients.dtype, "same_kind") and \
+        np.broadcast_shapes(a._coefficients.shape, b.shape) == a._coefficients.shape
+
+
+def gp(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The geometric product a*b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    if out is None:
+        return a * b
+    kernel = type(a).kernels.gp(a.grades, b.grades)
+    kernel(a._coefficients, b._coefficients, out=out._coefficients)
+    out.grades = kernel.grades
+    return out
+
+
+def sandwich(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The sandwich product a*b*a.reverse, written into the coefficients of out if it is given (out may be a or b).
+    """
+    if out is None:
+        return a.apply(b)
+    kernel = type(a).kernels.sandwich(a.grades, b.grades)
+    kernel(a._coefficients, b._coefficients, out=out._coefficients)
+    out.grades = kernel.grades
+    return out
+
+
+def _product(kind: str, a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    One of the bilinear products of the kernels, with numbers (or arrays of them) for b acting as scalars.
+    """
+    M = type(a)
+    b = b if isinstance(b, GenericMultivector) else M.make.scalar(np.asarray(b, dtype=np.result_type(a._coefficients, b)))
+    kernel = getattr(M.kernels, kind)(a.grades, b.grades)
+    if out is None:
+        return M._new(kernel(a._coefficients, b._coefficients), kernel.grades)
+    kernel(a._coefficients, b._coefficients, out=out._coefficients)
+    out.grades = kernel.grades
+    return out
+
+
+def outer(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The outer product a^b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("outer", a, b, out)
+
+
+def inner(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The inner product a|b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("inner", a, b, out)
+
+
+def left_contraction(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The left contraction a<<b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("left_contraction", a, b, out)
+
+
+def right_contraction(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The right contraction a>>b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("right_contraction", a, b, out)
+
+
+def scalar_product(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The scalar part of a*b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("scalar_product", a, b, out)
+
+
+def commutator(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The commutator product (a*b - b*a)/2, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("commutator", a, b, out)
+
+
+def regressive(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The regressive product a&b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    return _product("regressive", a, b, out)
+
+
+def add(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The sum a+b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    if out is None:
+        return a + b
+    np.add(a._coefficients, b._coefficients, out=out._coefficients)
+    out.grades = a.grades | b.grades
+    return out
+
+
+def sub(a: GenericMultivector, b: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The difference a-b, written into the coefficients of out if it is given (out may be a or b).
+    """
+    if out is None:
+        return a - b
+    np.subtract(a._coefficients, b._coefficients, out=out._coefficients)
+    out.grades = a.grades | b.grades
+    return out
+
+
+def neg(a: GenericMultivector, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The negation -a, written into the coefficients of out if it is given (out may be a).
+    """
+    if out is None:
+        return -a
+    np.negative(a._coefficients, out=out._coefficients)
+    out.grades = a.grades
+    return out
+
+
+def scale(a: GenericMultivector, s: float, out: GenericMultivector = None) -> GenericMultivector:
+    """
+    The product of a with the scalar (or array of scalars, one per multivector) s, written into the coefficients of out if it is given.
+    """
+    if out is None:
+        return a * s
+    np.multiply(a._coefficients, _coefficients(s), out=out._coefficients)
+    out.grades = a.grades
+    return out
+
+
+def _reorder_sign(a: int, b: int) -> int:
+    """
+    The sign from reordering the product of the blades with bitmasks a and b into canonical (increasing) order,
+    i.e. -1 to the number of pairs of basis vectors (one from each blade) which are out of order.
+    """
+    a >>= 1
+    swaps = 0
+    while a:
+        swaps += bin(a & b).count("1")
+        a >>= 1
+    return -1 if swaps % 2 else 1
+
+
+def algebra_tables(p: int, q: int = 0, r: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The basis_idx, basis_sign and grade_mask arrays for the algebra Cl(p, q, r), as expected by `multivector_type`.
+
+    The basis vectors e1...en square to +1 for the first p, -1 for the next q and 0 for the last r.
+    Blades are ordered by grade and then lexicographically, e.g. {1, e1, e2, e3, e12, e13, e23, e123}, so the
+    vectors come straight after the scalar and the pseudoscalar is last.
+    """
+    n = p + q + r
+    metric = [1] * p + [-1] * q + [0] * r
+    bitmasks = sorted(range(1 << n), key=lambda m: (bin(m).count("1"), [i for i in range(n) if (m >> i) & 1]))
+    index = {m: i for (i, m) in enumerate(bitmasks)}
+
+    nblades = len(bitmasks)
+    basis_idx = np.zeros((nblades, nblades), dtype=int)
+    basis_sign = np.zeros((nblades, nblades), dtype=int)
+    for (row, out) in enumerate(bitmasks):
+        for (col, left) in enumerate(bitmasks):
+            right = out ^ left  # e_left * e_right is proportional to e_out
+            sign = _reorder_sign(left, right)
+            for i in range(n):
+                if (left & right) >> i & 1:
+                    sign *= metric[i]
+            basis_idx[row, col] = index[right]
+            basis_sign[row, col] = sign
+
+    grade_mask = np.array([bin(m).count("1") for m in bitmasks])
+    return basis_idx, basis_sign, grade_mask
+
+
+def algebra(p: int, q: int = 0, r: int = 0, dtype: np.dtype = np.float64) -> Type[GenericMultivector]:
+    """
+    The Multivector type for the algebra Cl(p, q, r), see `algebra_tables` for the conventions used.
+    Types are cached so each signature is only constructed once, e.g. PGA is `algebra(3, 0, 1)` and CGA `algebra(4, 1)`.
+    The dtype is the default dtype of the type's coefficients, e.g. `algebra(3, dtype=np.float32)`.
+    """
+    return _algebra(p, q, r, np.dtype(dtype))
+
+
+@lru_cache(maxsize=None)
+def _algebra(p: int, q: int, r: int, dtype: np.dtype) -> Type[GenericMultivector]:
+    basis_idx, basis_sign, grade_mask = algebra_tables(p, q, r)
+    M = multivector_type(f"Multivector_{p}_{q}_{r}", basis_idx, basis_sign, grade_mask, dtype)
+    M.signature = (p, q, r)
+    return M
@@ -0,0 +1,301 @@
+"""
+Elementary functions (exp, log, sqrt and inverse) of multivectors, evaluated for whole batches at once.
+
+For algebras with at most three basis vectors these use closed forms: every multivector splits into a part in the
+centre of the algebra (the scalars, plus the pseudoscalar in 3D) and a part F whose square F*F lies in the centre.
+When the pseudoscalar squares to -1 the centre behaves like the complex numbers, so e.g. exp(F) = cosh(f) + sinh(f)/f F
+with f the (complex) square root of F*F. Larger algebras fall back to numerically sound general methods: scaling and
+squaring for exp, Denman-Beavers iteration for sqrt, inverse scaling and squaring for log and a linear solve for inverse.
+"""
+
+import warnings
+import numpy as np
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from gapy.cayley import CayleyTable, grade_bits
+
+
+__all__ = ("exp", "log", "sqrt", "inverse",)
+
+
+@lru_cache(maxsize=None)
+def _structure(table: CayleyTable) -> Tuple[int, float]:
+    """
+    The number of basis vectors of the algebra and the square of its pseudoscalar.
+    """
+    return int(np.max(table.grade_mask)), table.pseudoscalar_square
+
+
+def _even(M) -> int:
+    return grade_bits(range(0, int(np.max(M.cayley.grade_mask)) + 1, 2))
+
+
+def _select(a, grades: int):
+    """
+    The parts of a in the given grades.
+    """
+    M = type(a)
+    keep = ((grades >> M.cayley.grade_mask) & 1) == 1
+    return M._new(a._coefficients * keep, a.grades & grades)
+
+
+def _scalars(M, s: np.ndarray):
+    return M.make.scalar(s)
+
+
+def _float_dtype(a) -> np.dtype:
+    """
+    The floating point (or complex) dtype of the results for a, which keeps the precision of a's coefficients.
+    """
+    return np.result_type(a._coefficients, np.float32)
+
+
+def _real_dtype(a) -> np.dtype:
+    return np.finfo(_float_dtype(a)).dtype
+
+
+def _is_complex(a) -> bool:
+    """
+    Whether a has complex coefficients, which the closed forms (using complex numbers for the pseudoscalar) do not allow.
+    """
+    return a._coefficients.dtype.kind == "c"
+
+
+def _only_grades(a, grades: int) -> bool:
+    """
+    Whether a is (numerically, if its metadata does not already say so) only non-zero in the given grades.
+    """
+    others = a.grades & ~grades
+    return all(not np.any(a.is_grade(g)) for g in range(others.bit_length()) if (others >> g) & 1)
+
+
+def inverse(a):
+    """
+    The multiplicative inverse of a, so that a * inverse(a) == 1.
+    Multivectors with no inverse give infinite or nan coefficients in the closed forms and raise LinAlgError otherwise.
+    """
+    M = type(a)
+    n, _ = _structure(M.cayley)
+    if n <= 2:
+        abar = a.conjugate
+        return abar * (1 / (a * abar).scalar)
+    elif n == 3:
+        abar = a.conjugate
+        m = a * abar  # only has scalar and pseudoscalar parts
+        mhat = _select(m, grade_bits([0, 3])).involute
+        return (abar * mhat) * (1 / (m * mhat).scalar)
+    else:
+        return _inverse_general(a)
+
+
+def _inverse_general(a, singular_nan: bool = False):
+    """
+    The inverse by solving the linear system of left multiplication by a, with nan for the multivectors which have no
+    inverse if singular_nan is True rather than a LinAlgError.
+    """
+    M = type(a)
+    dtype = _float_dtype(a)
+    L = np.einsum("...i,ijk->...kj", a._coefficients, M.cayley.dense(dtype))
+    one = np.zeros(a._coefficients.shape, dtype=dtype)
+    one[..., 0] = 1
+    try:
+        x = np.linalg.solve(L, one[..., np.newaxis])[..., 0]
+    except np.linalg.LinAlgError:
+        if not singular_nan:
+            raise
+        singular = np.linalg.det(L) == 0  # the same LU factorisation which found the zero pivot
+        L = np.where(singular[..., np.newaxis, np.newaxis], np.eye(L.shape[-1], dtype=dtype), L)
+        x = np.where(singular[..., np.newaxis], np.nan, np.linalg.solve(L, one[..., np.newaxis])[..., 0])
+    return M._new(x, grade_bits(M.cayley.grade_mask))
+
+
+def _inverse_or_nan(a):
+    """
+    The inverse of a, with nan rather than a LinAlgError for the multivectors which have none.
+    """
+    n, _ = _structure(type(a).cayley)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return inverse(a) if n <= 3 else _inverse_general(a, singular_nan=True)
+
+
+def _nan_rows(a, failed: np.ndarray, message: str):
+    """
+    a with nan coefficients for the failed multivectors, with a RuntimeWarning saying how many there are.
+    """
+    if not np.any(failed):
+        return a
+    warnings.warn(f"{message} for {np.count_nonzero(failed)} multivectors, their results are nan.", RuntimeWarning, stacklevel=4)
+    return type(a)._new(np.where(failed[..., np.newaxis], np.nan, a._coefficients), a.grades)
+
+
+def exp(a):
+    """
+    The exponential of a, for any multivector.
+    """
+    M = type(a)
+    n, I2 = _structure(M.cayley)
+    if (n <= 2 or (n == 3 and I2 == -1)) and not _is_complex(a):
+        return _exp_closed(a, n)
+    else:
+        return _exp_series(a)
+
+
+def _exp_closed(a, n: int):
+    M = type(a)
+    centre = grade_bits([0, 3]) if n == 3 else grade_bits([0])
+    F = _select(a, ~centre)
+    F2 = F * F
+    alpha = F2.scalar
+    beta = F2.pseudoscalar if n == 3 and (F2.grades >> 3) & 1 else np.zeros_like(alpha)
+
+    f = np.sqrt((alpha + 1j * beta).astype(np.result_type(_real_dtype(a), np.complex64)))
+    sinhc = np.sinh(f) / np.where(f == 0, 1, f)
+    sinhc = np.where(f == 0, 1, sinhc)
+    c = np.exp(a.scalar + 1j * (a.pseudoscalar if n == 3 else 0))
+    k1 = c * np.cosh(f)
+    k2 = c * sinhc
+
+    result = _scalars(M, k1.real) + k2.real * F
+    if n == 3 and ((a.grades | F2.grades) >> 3) & 1:
+        I = M.make.pseudoscalar(_real_dtype(a).type(1))
+        result = result + k1.imag * I + k2.imag * (I * F)
+    return result
+
+
+def _exp_series(a, terms: int = 18):
+    """
+    Scaling and squaring: exp(a) = exp(a / 2^k)^(2^k) with k chosen per multivector so the series converges quickly.
+    The coefficient 1-norm is submultiplicative (every term in the product table has magnitude at most one).
+    """
+    M = type(a)
+    norm = np.sum(np.abs(a._coefficients), -1)
+    k = np.maximum(0, np.ceil(np.log2(np.where(norm > 0, norm, 1))) + 1).astype(int)
+    x = a * np.ldexp(1.0, -k).astype(norm.dtype)
+
+    result = _scalars(M, np.ones(norm.shape, dtype=_float_dtype(a)))
+    for j in range(terms, 0, -1):
+        result = 1 + (x * result) * (1 / j)
+
+    for i in range(int(np.max(k))):
+        squared = result * result
+        result = M._new(np.where((k > i)[..., np.newaxis], squared._coefficients, result._coefficients), squared.grades | result.grades)
+    return result
+
+
+def log(a):
+    """
+    The logarithm of a, the inverse of exp. For rotors this is the bivector generating them, log(exp(B)) == B
+    for bivectors B with |B| < pi. Multivectors with no real logarithm (such as negative scalars, except in 2D where
+    log(-1) is pi times the unit bivector, like the complex logarithm) give nan, with a RuntimeWarning.
+    """
+    M = type(a)
+    n, _ = _structure(M.cayley)
+    even = _even(M)
+    if n <= 3 and not _is_complex(a) and _only_grades(a, even):
+        result, failed = _log_closed(_select(a, even))
+        return _nan_rows(result, failed, "log has no real value")
+    else:
+        return _log_general(a)
+
+
+def _log_closed(a):
+    """
+    For a = c + B (scalar plus bivector) where B*B = b2 is a scalar:
+        log(a) = log|a| + atan2(|B|, c) B/|B|    (b2 < 0, e.g. Euclidean rotors)
+        log(a) = log|a| + atanh(|B|/c) B/|B|     (b2 > 0, boosts)
+        log(a) = log|a| + B/c                    (b2 = 0, e.g. translators)
+    with which multivectors have no real logarithm: those with b2 >= 0 and c <= |B|, e.g. the negative scalars, whose
+    logarithm would be pi times a unit bivector of no particular plane. In 2D there is only one plane, so
+    log(c) = log|c| + pi I for c < 0.
+    """
+    M = type(a)
+    n, I2 = _structure(M.cayley)
+    c = a.scalar
+    B = _select(a, grade_bits([2]))
+    b2 = (B * B).scalar
+    r = np.sqrt(np.abs(b2))
+    with np.errstate(divide="ignore", invalid="ignore"):  # the branches not taken may divide by zero
+        elliptic = np.arctan2(r, c) / r
+        hyperbolic = np.arctanh(r / c) / r
+        null = 1 / c
+        factor = np.where(r == 0, null, np.where(b2 < 0, elliptic, hyperbolic))
+        failed = (b2 >= 0) & (c <= r)
+        result = _scalars(M, 0.5 * np.log(c * c - b2)) + np.where(failed, 0, factor) * B
+    if n == 2 and I2 == -1:
+        negative = (r == 0) & (c < 0)
+        result = result + np.where(negative, np.pi, 0) * M.make.pseudoscalar(_real_dtype(a).type(1))
+        failed = failed & ~negative
+    return result, failed
+
+
+def _log_general(a, terms: int = 20):
+    """
+    Inverse scaling and squaring: take square roots until close to one, then use the series
+    log(y) = 2 atanh(z) = 2 (z + z^3/3 + z^5/5 + ...) with z = (y - 1) / (y + 1).
+    Multivectors with no real logarithm, whose square roots do not exist or do not converge, give nan.
+    """
+    M = type(a)
+    k = 0
+    y = a
+    one = _scalars(M, np.ones(a._coefficients.shape[:-1], dtype=_float_dtype(a)))
+    distance = lambda y: np.sum(np.abs((y - one)._coefficients), -1)
+    while np.any(distance(y) > 0.25) and k < 64:  # nan rows (no square root) compare False
+        y = _sqrt_general(y, message="log has no real value")
+        k += 1
+    y = _nan_rows(y, distance(y) > 0.25, "log did not converge")
+
+    z = (y - one) * _inverse_or_nan(y + one)
+    z2 = z * z
+    series = _scalars(M, np.full(a._coefficients.shape[:-1], 1.0 / (2 * terms + 1), dtype=_float_dtype(a)))
+    for j in range(terms - 1, -1, -1):
+        series = (1.0 / (2 * j + 1)) + z2 * series
+    return (z * series) * float(2 ** (k + 1))
+
+
+def sqrt(a):
+    """
+    The principal square root of a, so that sqrt(a) * sqrt(a) == a. Multivectors with no real square root (such as
+    negative scalars, except in 2D) give nan, with a RuntimeWarning.
+    """
+    M = type(a)
+    n, _ = _structure(M.cayley)
+    even = _even(M)
+    zero = np.all(a._coefficients == 0, -1)
+    if np.any(zero):  # zero is its own square root, but has no logarithm or inverse to find it with
+        a = M._new(np.where(zero[..., np.newaxis], M.make.scalar(1)._coefficients.astype(a._coefficients.dtype), a._coefficients), a.grades | 1)
+    if n <= 3 and not _is_complex(a) and _only_grades(a, even):
+        log_a, failed = _log_closed(_select(a, even))
+        root = _nan_rows(exp(0.5 * log_a), failed, "sqrt has no real value")
+    else:
+        root = _sqrt_general(a)
+    return M._new(np.where(zero[..., np.newaxis], 0, root._coefficients), root.grades)
+
+
+def _sqrt_general(a, iterations: int = 64, tol: Optional[float] = None, message: str = "sqrt has no real value"):
+    """
+    Denman-Beavers iteration, Y -> sqrt(a) and Z -> inverse(sqrt(a)) quadratically.
+    The default tolerance is a small multiple of the machine epsilon of a's precision. Multivectors with no real
+    square root (for which the iteration wanders rather than converges, or meets a multivector with no inverse) give
+    nan, with a RuntimeWarning.
+    """
+    M = type(a)
+    tol = 64 * np.finfo(_real_dtype(a)).eps if tol is None else tol
+    y = a
+    z = _scalars(M, np.ones(a._coefficients.shape[:-1], dtype=_float_dtype(a)))
+    for _ in range(iterations):
+        y_next = 0.5 * (y + _inverse_or_nan(z))
+        z = 0.5 * (z + _inverse_or_nan(y))
+        with np.errstate(invalid="ignore"):
+            step = np.abs((y_next - y)._coefficients)
+        size = np.abs(y_next._coefficients)
+        converged = np.max(step, initial=0, where=np.isfinite(step)) <= tol * max(1.0, np.max(size, initial=0, where=np.isfinite(size)))
+        y = y_next
+        if converged:
+            break
+
+    residual = np.max(np.abs((y * y - a)._coefficients), -1)
+    scale = np.maximum(1.0, np.max(np.abs(a._coefficients), -1))
+    failed = ~(residual <= np.sqrt(tol) * scale) & ~np.any(np.isnan(a._coefficients), -1)  # nan in, nan out quietly
+    return _nan_rows(y, failed, message)
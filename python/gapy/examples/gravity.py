@@ -5,6 +5,7 @@ Following section 3.3 of Geometric Algebra for Physicists
 import numpy as np
 import matplotlib.pyplot as plt
 
+from gapy import sweep
 from gapy.ga3d import *
 
 
@@ -13,16 +14,16 @@ b = vec(1, 1, 0)
 a = vec(0.25, 1, -0.5)
 
 # get the unit bivector representing this plane
-L = (a*b).project(2).unit
+L = (a ^ b).unit
 e = a.unit
 
 # these are the two scalar parameters of the general solution
 A = 1
 B = 2
 
-# calculate the analytical solution
+# calculate the analytical solution for all s at once, sweep.exp(L, s) is (s*L).exp() with L decomposed only once
 s = np.linspace(0, 2*np.pi, 1001)
-U = A*np.exp(s*L) + B*np.exp(-s*L)
+U = A*sweep.exp(L, s) + B*sweep.exp(L, -s)
 x = U*U*e
 
 # x makes two orbits for one in U, so to visualize this we slightly offset the orbit over time
@@ -30,10 +31,10 @@ p = I*L
 x = x + (np.linspace(0, 1, len(s))*p)
 
 # unwrap the vectors and put them in raw numpy arrays for plotting
-xx = np.array([xx.vector for xx in x]) 
+xx = x.vector
 
 # U is an ellipse in the 2d space of "scalar x unit bivector"
-UU = np.array([[UU.scalar, (L*e*UU*e).scalar] for UU in U])
+UU = np.stack([U.scalar, (L*e*U*e).scalar], -1)
 
 # plot it
 fig = plt.figure(figsize=(12, 6))
@@ -1,5 +1,7 @@
 import numpy as np
-import matplotlib as plt
+
+from functools import lru_cache
+from typing import Dict
 
 from gapy.core import multivector_type
 
@@ -26,13 +28,33 @@ basis_sign = np.sign(basis_sign_idx)
 basis_sign = np.where(basis_sign == 0, 1, basis_sign)  # all b_0 terms are additions
 basis_idx  = np.abs(basis_sign_idx)
 
-Multivector2D = multivector_type("Multivector2D", basis_idx, basis_sign, grade_mask)
+@lru_cache(maxsize=None)
+def _algebra() -> Dict[str, object]:
+    """
+    The type, built on first use (see __getattr__) so importing this module stays cheap.
+    """
+    M = multivector_type("Multivector2D", basis_idx, basis_sign, grade_mask)
+    M.signature = (2, 0, 0)
+    return {"Multivector2D": M}
+
+
+def __getattr__(name: str):
+    """
+    Module attributes which are not defined yet: the type, see _algebra.
+    """
+    try:
+        value = _algebra()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
 
-def scalar(a: float) -> Multivector2D:
-    return Multivector2D(a, 0, 0, 0)
+def scalar(a: float) -> "Multivector2D":
+    return _algebra()["Multivector2D"].make.scalar(a)
 
-def vec(x: float, y: float) -> Multivector2D:
-    return Multivector2D(0, x, y, 0)
+def vec(x: float, y: float) -> "Multivector2D":
+    return _algebra()["Multivector2D"].make.vector(x, y)
 
-def bivec(b: float) -> Multivector2D:
-    return Multivector2D(0, 0, 0, b)
+def bivec(b: float) -> "Multivector2D":
+    return _algebra()["Multivector2D"].make.bivector(b)
@@ -1,5 +1,7 @@
 import numpy as np
-import matplotlib as plt
+
+from functools import lru_cache
+from typing import Dict
 
 from gapy.core import multivector_type
 
@@ -37,19 +39,43 @@ basis_sign = np.sign(basis_sign_idx)
 basis_sign = np.where(basis_sign == 0, 1, basis_sign)  # all b_0 terms are additions
 basis_idx  = np.abs(basis_sign_idx)
 
-Multivector3D = multivector_type("Multivector3D", basis_idx, basis_sign, grade_mask)
 
-def vec(x: float, y: float, z: float) -> Multivector3D:
-    return Multivector3D(0, x, y, z, 0, 0, 0, 0)
+@lru_cache(maxsize=None)
+def _algebra() -> Dict[str, object]:
+    """
+    The type and its constants, built on first use (see __getattr__) so importing this module stays cheap.
+    """
+    M = multivector_type("Multivector3D", basis_idx, basis_sign, grade_mask)
+    M.signature = (3, 0, 0)
+    constants = {
+        # basis vectors & bivectors:
+        "ex": M.make.vector(1, 0, 0),
+        "ey": M.make.vector(0, 1, 0),
+        "ez": M.make.vector(0, 0, 1),
+        "Bxy": M.make.bivector(1, 0, 0),
+        "Byz": M.make.bivector(0, 1, 0),
+        "Bzx": M.make.bivector(0, 0, 1),
+        "I": M.make.pseudoscalar(1),
+    }
+    for x in constants.values():
+        x._coefficients.flags.writeable = False  # so in-place operators on them (x = ex; x += ey) make a new result
+    return {"Multivector3D": M, **constants}
+
+
+def __getattr__(name: str):
+    """
+    Module attributes which are not defined yet: the type and the constants, see _algebra.
+    """
+    try:
+        value = _algebra()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
 
-def bivec(z: float, y: float, x: float) -> Multivector3D:
-    return Multivector3D(0, 0, 0, 0, z, y, x, 0)
+def vec(x: float, y: float, z: float) -> "Multivector3D":
+    return _algebra()["Multivector3D"].make.vector(x, y, z)
 
-# basis vectors & bivectors:
-ex = vec(1, 0, 0)
-ey = vec(0, 1, 0)
-ez = vec(0, 0, 1)
-Bxy = bivec(1, 0, 0)
-Byz = bivec(0, 1, 0)
-Bzx = bivec(0, 0, 1)
-I = Multivector3D.make.pseudoscalar(1)
\ No newline at end of file
+def bivec(z: float, y: float, x: float) -> "Multivector3D":
+    return _algebra()["Multivector3D"].make.bivector(z, y, x)
@@ -0,0 +1,166 @@
+"""
+Opt-in counters for the operations of the multivector types: the number of calls, of multivectors processed and the
+time spent in each operation, per algebra.
+
+    with instrument.Counters() as counters:
+        run_simulation()
+    print(counters.report())
+    rows = counters.rows()      # the flat report, one dict per (type, operation), e.g. for csv.DictWriter
+
+While any Counters is collecting, the methods, properties and `make` constructors of the multivector types are
+replaced by timing wrappers, and the originals are put back when the last one stops, so there is no overhead at all
+when nothing is collecting. Only the types which exist when collection starts are instrumented (the ga3d types, for
+example, are built on first use), pass the types to Counters to make sure they are included.
+
+Times are inclusive, so an operation implemented with others (e.g. rotate_rad, which makes a rotor and applies it)
+is counted along with each of them. The elements are the number of multivectors in the batch of the result (or of
+self, for operations which return arrays or nothing).
+"""
+
+import math
+import time
+
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from gapy.core import GenericMultivector
+
+
+__all__ = ("Counters",)
+
+
+# Methods which are too cheap or too internal to be worth counting, __array_ufunc__ dispatches to the operators.
+_skip = frozenset(("__repr__", "__str__", "__array__", "__array_ufunc__", "__len__", "__iter__", "shape", "dtype"))
+
+# The Counters collecting, and the original attributes of the instrumented classes keyed by (class, name).
+_active: List["Counters"] = []
+_originals: Dict[Tuple[type, str], object] = {}
+
+
+def _base_type(cls: type) -> type:
+    """
+    The Multivector type of cls, rather than its Array type.
+    """
+    return cls.__bases__[0] if cls.Array is cls else cls
+
+
+def _elements(result, args: Tuple) -> int:
+    for x in (result,) + args:
+        if isinstance(x, GenericMultivector):
+            return math.prod(x._coefficients.shape[:-1])
+    return 1
+
+
+def _timed(fn: Callable, key: Tuple[type, str]) -> Callable:
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        elements = _elements(result, args)
+        for counters in _active:
+            counters._record(key, elements, seconds)
+        return result
+
+    timed.__name__, timed.__doc__, timed.__wrapped__ = fn.__name__, fn.__doc__, fn
+    return timed
+
+
+def _install(cls: type):
+    """
+    Replace the operations defined by cls (and by its make namespace) with timed wrappers.
+    """
+    M = _base_type(cls)
+    namespaces = [(cls, "")] + ([(cls.make, "make.")] if "make" in vars(cls) else [])
+    for (namespace, prefix) in namespaces:
+        for (name, attr) in list(vars(namespace).items()):
+            if (namespace, name) in _originals or name in _skip or (name.startswith("_") and not name.endswith("__")):
+                continue
+            key = (M, prefix + name)
+            if isinstance(attr, staticmethod):
+                wrapped = staticmethod(_timed(attr.__func__, key))
+            elif isinstance(attr, property):
+                wrapped = property(_timed(attr.fget, key), attr.fset, attr.fdel, attr.__doc__)
+            elif callable(attr) and not isinstance(attr, type) and getattr(attr, "__module__", None) == "gapy.core":
+                wrapped = _timed(attr, key)
+            else:
+                continue
+            _originals[(namespace, name)] = attr
+            setattr(namespace, name, wrapped)
+
+
+def _uninstall():
+    for ((namespace, name), attr) in _originals.items():
+        setattr(namespace, name, attr)
+    _originals.clear()
+
+
+def _all_types(cls: type = GenericMultivector) -> List[type]:
+    types = []
+    for sub in cls.__subclasses__():
+        types += [sub] + _all_types(sub)
+    return types
+
+
+class Counters:
+    """
+    Collects the calls, elements and seconds of each operation of the given multivector types (all the types which
+    exist when collection starts, by default) between start and stop, or within a with block.
+    """
+
+    def __init__(self, *types: Type[GenericMultivector]):
+        self.types = tuple(_base_type(M) for M in types)
+        self.calls: Dict[Tuple[type, str], int] = {}
+        self.elements: Dict[Tuple[type, str], int] = {}
+        self.seconds: Dict[Tuple[type, str], float] = {}
+
+    def _record(self, key: Tuple[type, str], elements: int, seconds: float):
+        if self.types and key[0] not in self.types:
+            return
+        self.calls[key] = self.calls.get(key, 0) + 1
+        self.elements[key] = self.elements.get(key, 0) + elements
+        self.seconds[key] = self.seconds.get(key, 0.0) + seconds
+
+    def start(self) -> "Counters":
+        if self in _active:
+            raise ValueError("These counters are already collecting.")
+        types = self.types or [M for M in _all_types() if hasattr(M, "Array") and M is _base_type(M)]
+        for M in types:
+            _install(M)
+            _install(M.Array)
+        _active.append(self)
+        return self
+
+    def stop(self):
+        _active.remove(self)
+        if not _active:
+            _uninstall()
+
+    def __enter__(self) -> "Counters":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        self.calls.clear()
+        self.elements.clear()
+        self.seconds.clear()
+
+    def rows(self, sort: Optional[str] = "seconds") -> List[Dict]:
+        """
+        The flat report, a dict of the type, dtype, operation, calls, elements and seconds for each operation used,
+        sorted by the given column (largest first) or in the order first used if sort is None.
+        """
+        rows = [{"type": M.__name__, "dtype": str(M.default_dtype), "operation": operation, "calls": self.calls[(M, operation)],
+                 "elements": self.elements[(M, operation)], "seconds": self.seconds[(M, operation)]}
+                for (M, operation) in self.calls]
+        return rows if sort is None else sorted(rows, key=lambda row: row[sort], reverse=True)
+
+    def report(self, sort: Optional[str] = "seconds") -> str:
+        """
+        The rows as a text table.
+        """
+        lines = [f"{'type':<24} {'dtype':<10} {'operation':<20} {'calls':>10} {'elements':>12} {'seconds':>10}"]
+        for row in self.rows(sort):
+            lines.append(f"{row['type']:<24} {row['dtype']:<10} {row['operation']:<20} {row['calls']:>10} "
+                         f"{row['elements']:>12} {row['seconds']:>10.6f}")
+        return "\n".join(lines)
@@ -0,0 +1,172 @@
+"""
+Time integrators and force evaluation for simulations of many bodies, stored as Multivector.Array batches.
+
+Positions and velocities are batches of vectors, orientations are batches of rotors and angular velocities and
+momenta are batches of bivectors. Every step works on the whole batch at once using the usual Multivector operations.
+
+Orientations are advanced by multiplying by the exponential of a bivector, which is exactly a rotor, so they stay on
+the rotor manifold (up to rounding) without being renormalised. With the rotor convention of `make.rotor`,
+R = exp(-theta B / 2), a body with body-frame angular velocity Omega evolves as dR/dt = -R Omega / 2.
+"""
+
+import itertools
+import numpy as np
+
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+from gapy.core import GenericMultivector
+
+
+__all__ = ("leapfrog", "rk4", "rotor_step", "rigid_body_step", "direct_accelerations", "cell_list_accelerations",)
+
+
+def leapfrog(x: GenericMultivector, v: GenericMultivector, acceleration: Callable[[GenericMultivector], GenericMultivector],
+             dt: float, a: Optional[GenericMultivector] = None) -> Tuple[GenericMultivector, GenericMultivector, GenericMultivector]:
+    """
+    One kick-drift-kick (velocity Verlet) step, which is symplectic and second order.
+    Returns the new positions, velocities and accelerations, pass the accelerations back in as `a` so the next step
+    only evaluates the forces once.
+    """
+    a = acceleration(x) if a is None else a
+    v_half = v + a * (0.5 * dt)
+    x = x + v_half * dt
+    a = acceleration(x)
+    return x, v_half + a * (0.5 * dt), a
+
+
+def rk4(y: Union[GenericMultivector, Sequence[GenericMultivector]], derivative: Callable, dt: float):
+    """
+    One classical fourth order Runge-Kutta step for dy/dt = derivative(y), where y is a multivector or a tuple of them.
+    """
+    if isinstance(y, GenericMultivector):
+        return rk4((y,), lambda y: (derivative(y[0]),), dt)[0]
+
+    def shift(k, h):
+        return tuple(yi + ki * h for (yi, ki) in zip(y, k))
+
+    k1 = derivative(y)
+    k2 = derivative(shift(k1, 0.5 * dt))
+    k3 = derivative(shift(k2, 0.5 * dt))
+    k4 = derivative(shift(k3, dt))
+    return tuple(yi + (k1i + 2 * k2i + 2 * k3i + k4i) * (dt / 6) for (yi, k1i, k2i, k3i, k4i) in zip(y, k1, k2, k3, k4))
+
+
+def rotor_step(R: GenericMultivector, omega: GenericMultivector, dt: float, frame: str = "space") -> GenericMultivector:
+    """
+    Advance the rotors R by dt with the constant angular velocity bivectors omega, given in the space or the body frame.
+    """
+    step = (omega * (-0.5 * dt)).exp()
+    if frame == "space":
+        return step * R
+    elif frame == "body":
+        return R * step
+    raise ValueError(f"Unknown frame. [frame={frame!r}]")
+
+
+def _inertia_map(inertia: np.ndarray, nblades: int) -> np.ndarray:
+    """
+    The (..., nblades) multipliers applying the principal moments (about the body x, y and z axes) to 3D bivector
+    coefficients, whose blades are ordered e12, e31, e23, i.e. the planes normal to z, y and x.
+    """
+    inertia = np.asarray(inertia, dtype=float)
+    m = np.ones(inertia.shape[:-1] + (nblades,))
+    m[..., 4:7] = inertia[..., ::-1]
+    return m
+
+
+def rigid_body_step(R: GenericMultivector, L: GenericMultivector, inertia: np.ndarray, dt: float,
+                    torque: Optional[Callable[[GenericMultivector, GenericMultivector], GenericMultivector]] = None
+                    ) -> Tuple[GenericMultivector, GenericMultivector]:
+    """
+    One step of the rigid body equations for 3D bodies with orientations R and body-frame angular momenta L (bivectors),
+    where inertia holds the (..., 3) principal moments about the body x, y and z axes and torque(R, L), if given,
+    returns the body-frame torques. Euler's equations dL/dt = Omega x L + torque, with x the commutator product and
+    Omega the body-frame angular velocity, are advanced with RK4 and the orientations with the exponential of the
+    angular velocity at the half step, so R stays a rotor. Second order in the orientation.
+    """
+    M = type(L)
+    m = _inertia_map(inertia, L._coefficients.shape[-1])
+
+    def omega(L):
+        return M._new(L._coefficients / m, L.grades)
+
+    def euler(L):
+        W = omega(L)
+        dL = (W * L - L * W) * 0.5
+        return dL if torque is None else dL + torque(R, L)
+
+    L_half = rk4(L, euler, 0.5 * dt)
+    R = rotor_step(R, omega(L_half).project(2), dt, frame="body")
+    return R, rk4(L, euler, dt).project(2)
+
+
+def _from_vectors(M, a: np.ndarray) -> GenericMultivector:
+    return M.make.vector(*np.moveaxis(a, -1, 0))
+
+
+def _pair_accelerations(p: np.ndarray, masses: np.ndarray, i: np.ndarray, j: np.ndarray, G: float, softening: float,
+                        cutoff: Optional[float]) -> np.ndarray:
+    """
+    The accelerations of the bodies i due to the bodies j, summed per body.
+    """
+    d = p[j] - p[i]
+    r2 = np.sum(d * d, -1)
+    keep = i != j if cutoff is None else (i != j) & (r2 < cutoff * cutoff)
+    d, r2, i, j = d[keep], r2[keep], i[keep], j[keep]
+    w = G * masses[j] / (r2 + softening * softening) ** 1.5
+    return np.stack([np.bincount(i, weights=w * d[:, k], minlength=len(p)) for k in range(p.shape[1])], -1)
+
+
+def direct_accelerations(x: GenericMultivector, masses: Union[float, np.ndarray], G: float = 1.0, softening: float = 0.0,
+                         block: int = 1024) -> GenericMultivector:
+    """
+    The (softened) Newtonian gravitational accelerations of the N bodies at the vectors x, a (N,) Multivector.Array,
+    summing over all O(N^2) pairs. Pairs are evaluated `block` bodies at a time to bound the memory used.
+    """
+    p = x.vector
+    n = len(p)
+    masses = np.broadcast_to(np.asarray(masses, dtype=float), (n,))
+    acc = np.zeros(p.shape)
+    for start in range(0, n, block):
+        rows = np.arange(start, min(start + block, n))
+        i = np.repeat(rows, n)
+        j = np.tile(np.arange(n), len(rows))
+        acc += _pair_accelerations(p, masses, i, j, G, softening, None)
+    return _from_vectors(type(x), acc)
+
+
+def _cell_keys(cells: np.ndarray) -> np.ndarray:
+    """
+    The (N,) keys of the (N, ndims) integer cell coordinates: the bytes of each row, so cells sort and compare by their
+    coordinates however far apart they are, with no dense grid index to overflow.
+    """
+    cells = np.ascontiguousarray(cells, dtype=np.int64)
+    return cells.view(np.dtype((np.void, cells.itemsize * cells.shape[-1])))[:, 0]
+
+
+def cell_list_accelerations(x: GenericMultivector, masses: Union[float, np.ndarray], cutoff: float, G: float = 1.0,
+                            softening: float = 0.0) -> GenericMultivector:
+    """
+    The (softened) Newtonian gravitational accelerations of the N bodies at the vectors x, counting only the pairs closer
+    than the cutoff. The bodies are binned into cells the size of the cutoff so only neighbouring cells are searched,
+    which is O(N) for bounded densities.
+    """
+    p = x.vector
+    n, ndims = p.shape
+    masses = np.broadcast_to(np.asarray(masses, dtype=float), (n,))
+    cell = np.floor((p - np.min(p, 0)) / cutoff).astype(np.int64)
+    key = _cell_keys(cell)
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+
+    acc = np.zeros(p.shape)
+    bodies = np.arange(n)
+    for offset in itertools.product((-1, 0, 1), repeat=ndims):
+        nkey = _cell_keys(cell + offset)
+        start = np.searchsorted(sorted_key, nkey, "left")
+        counts = np.searchsorted(sorted_key, nkey, "right") - start
+        i = np.repeat(bodies, counts)
+        first = np.repeat(start - (np.cumsum(counts) - counts), counts)
+        j = order[first + np.arange(len(i))]
+        acc += _pair_accelerations(p, masses, i, j, G, softening, cutoff)
+    return _from_vectors(type(x), acc)
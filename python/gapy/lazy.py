@@ -0,0 +1,346 @@
+"""
+Lazily evaluated multivector expressions, compiled into a single fused kernel.
+
+Operations on an `Expr` (see `Multivector.lazy`, or the `fuse` decorator) build an expression graph instead of
+computing anything. Evaluating it
+
+    * merges repeated subexpressions (the same input used twice, or the same product formed twice),
+    * recognises sandwich products x * y * x.reverse, so terms which cancel are never computed,
+    * propagates the blades which can be non-zero through every node, so zero terms are never computed,
+
+and then generates one straight-line function (see gapy.codegen) computing the result blade by blade. The intermediate
+multivectors are never packed into coefficient arrays, so for long formulas over large batches this saves both the
+allocations and the repeated work. Generated kernels are cached by the structure of the expression, not its values
+(only small integers are compiled in, other numbers are passed in like arrays), and only the most recently used are kept.
+
+    @lazy.fuse
+    def orbit(U, e):
+        return U*U*e
+
+    x = orbit(U, e)  # one kernel, evaluated over the whole batch
+"""
+
+import functools
+import hashlib
+import numpy as np
+
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gapy.cayley import grade_bits
+from gapy.codegen import Kernel, Symbolic, _expression, _prune, _symbolic_product
+
+
+__all__ = ("Expr", "lift", "fuse",)
+
+
+# Compiled kernels, keyed by the algebra and the structure of the expression, the most recently used last.
+_compiled: "OrderedDict[Tuple, Kernel]" = OrderedDict()
+_max_compiled = 256
+
+# The integers which are compiled into kernels, all other numbers are kernel inputs so they do not change the kernel.
+_max_constant = 16
+
+
+class Expr:
+    """
+    A node of a lazily evaluated expression. Leaves are multivectors ("value"), scalar arrays ("scalar") and
+    python numbers ("constant"). `grades` is the bitmask of grades the node may have, as for Multivector.
+    """
+
+    __slots__ = ("M", "op", "args", "grades")
+
+    # Stop numpy from turning `ndarray * Expr` into an object array, we handle it in __rmul__ instead.
+    __array_ufunc__ = None
+
+    def __init__(self, M: Optional[type], op: str, args: Tuple, grades: int):
+        self.M = M
+        self.op = op
+        self.args = args
+        self.grades = grades
+
+    def __repr__(self) -> str:
+        if self.op in ("value", "scalar", "constant"):
+            return f"{self.op}#{id(self.args[0]):x}" if self.op != "constant" else repr(self.args[0])
+        args = ", ".join(repr(a) for a in self.args)
+        return f"{self.op}({args})"
+
+    def _binary(self, op: str, a: "Expr", b: "Expr") -> "Expr":
+        M = a.M or b.M
+        if op == "mul":
+            grades = M.cayley.restrict(a.grades, b.grades).grades if M is not None else a.grades & b.grades
+        elif op == "sandwich":
+            ab = M.cayley.restrict(a.grades, b.grades).grades
+            grades = M.cayley.restrict(ab, a.grades).grades
+        else:
+            grades = a.grades | b.grades
+        return Expr(M, op, (a, b), grades)
+
+    def __mul__(self, other) -> "Expr":
+        return self._binary("mul", self, lift(other))
+
+    def __rmul__(self, other) -> "Expr":
+        return self._binary("mul", lift(other), self)
+
+    def __add__(self, other) -> "Expr":
+        return self._binary("add", self, lift(other))
+
+    def __radd__(self, other) -> "Expr":
+        return self._binary("add", lift(other), self)
+
+    def __sub__(self, other) -> "Expr":
+        return self._binary("sub", self, lift(other))
+
+    def __rsub__(self, other) -> "Expr":
+        return self._binary("sub", lift(other), self)
+
+    def __neg__(self) -> "Expr":
+        return Expr(self.M, "neg", (self,), self.grades)
+
+    @property
+    def reverse(self) -> "Expr":
+        return Expr(self.M, "reverse", (self,), self.grades)
+
+    @property
+    def involute(self) -> "Expr":
+        return Expr(self.M, "involute", (self,), self.grades)
+
+    @property
+    def conjugate(self) -> "Expr":
+        return Expr(self.M, "conjugate", (self,), self.grades)
+
+    def project(self, grade: int) -> "Expr":
+        return Expr(self.M, "project", (self, int(grade)), self.grades & (1 << grade) if grade >= 0 else 0)
+
+    def apply(self, other) -> "Expr":
+        """
+        The sandwich product self * other * self.reverse.
+        """
+        return self._binary("sandwich", self, lift(other))
+
+    def kernel(self) -> Tuple[Kernel, List]:
+        """
+        The fused kernel computing this expression, and the arguments to call it with.
+        """
+        if self.M is None:
+            raise ValueError(f"Cannot evaluate an expression with no multivectors in it. [self={self!r}]")
+        nodes, inputs, output = _graph(self)
+        key = (self.M, tuple(nodes), output)
+        if key in _compiled:
+            _compiled.move_to_end(key)
+        else:
+            fname = f"fused_{hashlib.sha1(repr(key[1:]).encode()).hexdigest()[:12]}"
+            source, grades = _fused_source(self.M, nodes, output, fname)
+            _compiled[key] = Kernel(source, fname, grades)
+            if len(_compiled) > _max_compiled:
+                _compiled.popitem(last=False)
+        return _compiled[key], inputs
+
+    @property
+    def source(self) -> str:
+        """
+        The generated source of the fused kernel.
+        """
+        return self.kernel()[0].source
+
+    def evaluate(self, out=None):
+        """
+        Evaluate the expression, optionally writing the result into the Multivector (or Multivector.Array) out.
+        """
+        kernel, inputs = self.kernel()
+        dtype = np.result_type(*(v._coefficients for (op, v) in inputs if op == "value"))
+        args = [v._coefficients if op == "value" else _scalar_input(v, dtype) for (op, v) in inputs]
+        if out is None:
+            return self.M._new(kernel(*args), kernel.grades)
+        kernel(*args, out=out._coefficients)
+        out.grades = kernel.grades
+        return out
+
+
+def _scalar_input(x, dtype: np.dtype) -> np.ndarray:
+    """
+    The (..., 1) array for a scalar input, python numbers taking the dtype of the multivectors as they would in numpy.
+    """
+    if isinstance(x, (int, float, complex)):
+        return np.asarray(x, dtype=np.result_type(dtype, x))[np.newaxis]
+    return np.asarray(x)[..., np.newaxis]
+
+
+def lift(x) -> Expr:
+    """
+    The expression for x: an Expr is returned as is, small integers become constants which are compiled into the
+    kernel, multivectors and (arrays of) scalars, including all other numbers, become inputs which are passed to the
+    kernel when it is evaluated, so e.g. a time step which changes every call does not generate a kernel per value.
+    """
+    if isinstance(x, Expr):
+        return x
+    elif isinstance(x, (int, float)) and float(x).is_integer() and abs(x) <= _max_constant:
+        return Expr(None, "constant", (float(x),), 1 if x != 0 else 0)
+    elif hasattr(x, "_coefficients"):
+        return Expr(type(x), "value", (x,), x.grades)
+    else:
+        return Expr(None, "scalar", (x,), 1)
+
+
+def fuse(fn: Callable) -> Callable:
+    """
+    Decorate fn so it is evaluated lazily: the multivector and array arguments are replaced by Exprs and
+    the expression fn returns is compiled into one kernel and evaluated.
+    """
+
+    @functools.wraps(fn)
+    def fused(*args, **kwargs):
+        args = [a if isinstance(a, (int, float)) else lift(a) for a in args]
+        result = fn(*args, **kwargs)
+        return result.evaluate() if isinstance(result, Expr) else result
+
+    return fused
+
+
+# A node in the simplified graph is (op, params, children), with the children given by their position in the graph.
+Node = Tuple[str, Tuple, Tuple[int, ...]]
+
+
+def _graph(expr: Expr) -> Tuple[List[Node], List[Tuple[str, object]], int]:
+    """
+    The graph of expr with repeated subexpressions merged, sandwich products recognised and unused nodes removed,
+    in topological order. Returns the nodes, the (op, value) inputs in the order the kernel takes them, and the position of the output.
+    """
+    nodes: List[Node] = []
+    index: Dict[Tuple, int] = {}
+    inputs: List[Tuple[str, object]] = []
+    seen: Dict[int, int] = {}
+
+    def add(key: Tuple, node: Node) -> int:
+        if key not in index:
+            index[key] = len(nodes)
+            nodes.append(node)
+        return index[key]
+
+    def visit(e: Expr) -> int:
+        if id(e) in seen:
+            return seen[id(e)]
+        if e.op in ("value", "scalar"):
+            value = e.args[0]
+            key = (e.op, id(value))
+            if key not in index:
+                inputs.append((e.op, value))
+            pos = add(key, (e.op, (e.grades if e.op == "value" else 1, len(inputs) - 1), ()))
+        elif e.op == "constant":
+            pos = add(("constant", e.args[0]), ("constant", e.args, ()))
+        else:
+            children = tuple(visit(a) for a in e.args if isinstance(a, Expr))
+            params = tuple(a for a in e.args if not isinstance(a, Expr))
+            op = e.op
+            if op == "mul":
+                children, op = _sandwich(nodes, children)
+            pos = add((op, params, children), (op, params, children))
+        seen[id(e)] = pos
+        return pos
+
+    output = visit(expr)
+
+    # drop the nodes only used by a sandwich product which replaced them, renumbering the rest
+    used = {output}
+    for pos in range(output, -1, -1):
+        if pos in used:
+            used.update(nodes[pos][2])
+    renumber = {old: new for (new, old) in enumerate(sorted(used))}
+    nodes = [(op, params, tuple(renumber[c] for c in children)) for (i, (op, params, children)) in enumerate(nodes) if i in used]
+    return nodes, inputs, renumber[output]
+
+
+def _sandwich(nodes: List[Node], children: Tuple[int, int]) -> Tuple[Tuple[int, ...], str]:
+    """
+    Recognise x * y * x.reverse, bracketed either way, as the sandwich product of x and y.
+    """
+    a, b = children
+    if nodes[b][0] == "reverse" and nodes[a][0] == "mul" and nodes[a][2][0] == nodes[b][2][0]:
+        return (nodes[a][2][0], nodes[a][2][1]), "sandwich"
+    if nodes[b][0] == "mul" and nodes[nodes[b][2][1]][0] == "reverse" and nodes[nodes[b][2][1]][2][0] == a:
+        return (a, nodes[b][2][0]), "sandwich"
+    return children, "mul"
+
+
+def _fused_source(M, nodes: List[Node], output: int, fname: str) -> Tuple[str, int]:
+    """
+    Source for the kernel evaluating the graph, and the bitmask of grades it can return.
+    Each node's blades are computed as expressions in the variables of its children, products are always assigned to
+    variables (so the expansion stays linear in the size of the graph) and identical expressions are only computed once.
+    """
+    table = M.cayley
+    grade_mask = table.grade_mask
+    reverse_sign = M.kernels.reverse_sign
+    signs = {
+        "neg": -np.ones(len(grade_mask), dtype=int),
+        "reverse": reverse_sign,
+        "involute": np.where(grade_mask % 2 == 0, 1, -1),
+        "conjugate": reverse_sign * np.where(grade_mask % 2 == 0, 1, -1),
+    }
+
+    ninputs = sum(1 for (op, _, _) in nodes if op in ("value", "scalar"))
+    args = [f"x{i}" for i in range(ninputs)]
+    lines = [f"def {fname}({', '.join(args)}, out=None):", '    """Generated fused expression."""']
+    assigned: Dict[str, str] = {}
+    values: List[Symbolic] = []
+
+    def grades_of(a: Symbolic) -> int:
+        return grade_bits(grade_mask[list(a)]) if a else 0
+
+    def combine(a: Symbolic, b: Symbolic, sign: int) -> Symbolic:
+        result = defaultdict(lambda: defaultdict(int))
+        for (x, s) in ((a, 1), (b, sign)):
+            for (k, p) in x.items():
+                for (m, c) in p.items():
+                    result[k][m] += s * c
+        return _prune(result)
+
+    def assign(pos: int, a: Symbolic) -> Symbolic:
+        """
+        Assign the blades of a which are more than a multiple of one variable to new variables.
+        """
+        result = {}
+        for (k, p) in a.items():
+            if len(p) == 1 and len(next(iter(p))) <= 1:
+                result[k] = p
+                continue
+            expr = _expression(p)
+            if expr not in assigned:
+                assigned[expr] = f"t{pos}_{k}"
+                lines.append(f"    {assigned[expr]} = {expr}")
+            result[k] = {(assigned[expr],): 1}
+        return result
+
+    for (pos, (op, params, children)) in enumerate(nodes):
+        if op in ("value", "scalar"):
+            grades, i = params
+            blades = [int(k) for k in np.flatnonzero((grades >> grade_mask) & 1)] if op == "value" else [0]
+            if blades:
+                lines.append(f"    {', '.join(f'x{i}_{k}' for k in blades)}, = _split(x{i}, {blades!r})")
+            value = {k: {(f"x{i}_{k}",): 1} for k in blades}
+        elif op == "constant":
+            value = {0: {(): params[0]}} if params[0] != 0 else {}
+        elif op in ("mul", "sandwich"):
+            a, b = (values[c] for c in children)
+            value = _symbolic_product(table.restrict(grades_of(a), grades_of(b)), a, b)
+            if op == "sandwich":
+                a_reverse = {k: {m: c * int(reverse_sign[k]) for (m, c) in p.items()} for (k, p) in a.items()}
+                value = _symbolic_product(table.restrict(grades_of(value), grades_of(a)), value, a_reverse)
+            value = assign(pos, value)
+        elif op in ("add", "sub"):
+            value = assign(pos, combine(values[children[0]], values[children[1]], 1 if op == "add" else -1))
+        elif op in signs:
+            value = {k: {m: c * int(signs[op][k]) for (m, c) in p.items()} for (k, p) in values[children[0]].items()}
+        elif op == "project":
+            value = {k: p for (k, p) in values[children[0]].items() if grade_mask[k] == params[0]}
+        else:
+            raise ValueError(f"Unknown operation in expression graph. [op={op!r}]")
+        values.append(value)
+
+    result = values[output]
+    for (k, p) in result.items():
+        lines.append(f"    r{k} = {_expression(p)}")
+    packed = "".join(f"r{k}, " for k in result)
+    lines.append(f"    return _assemble(({', '.join(args)},), {list(result)!r}, ({packed}), out, {len(grade_mask)})")
+    return "\n".join(lines) + "\n", grades_of(result)
+
@@ -0,0 +1,223 @@
+"""
+Multi-core evaluation of products, sandwiches, exp and projections over large batches of multivectors.
+
+The batch is split into chunks along its first dimension and the chunks are evaluated concurrently, either by a pool
+of threads (the generated kernels spend their time in numpy arithmetic, which releases the GIL) or by a pool of
+processes which read their operands from, and write their results to, shared memory. Each chunk runs exactly the
+code the serial path runs on the same rows, so the results are bit-identical to it.
+
+    parallel.configure(workers=8, chunk_size=1 << 16, executor="thread")
+    x = parallel.sandwich(R, points)   # the same as R.apply(points)
+
+Operands without the batch dimension (single multivectors, or a leading dimension of one) are broadcast to every chunk.
+Batches of at most one chunk are evaluated serially.
+"""
+
+import atexit
+import os
+import sys
+import numpy as np
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from gapy.core import GenericMultivector, multivector_type
+
+
+__all__ = ("configure", "settings", "gp", "sandwich", "exp", "project",)
+
+
+_settings = {"workers": os.cpu_count() or 1, "chunk_size": 1 << 16, "executor": "thread"}
+_pools: Dict[Tuple[str, int], Executor] = {}
+
+
+def settings() -> Dict[str, object]:
+    """
+    The current worker count, chunk size and executor ("thread" or "process").
+    """
+    return dict(_settings)
+
+
+def configure(workers: Optional[int] = None, chunk_size: Optional[int] = None, executor: Optional[str] = None):
+    """
+    Change the number of workers, the number of multivectors per chunk or the kind of executor used.
+    """
+    if workers is not None:
+        assert workers >= 1, f"Need at least one worker. [workers={workers!r}]"
+        _settings["workers"] = int(workers)
+    if chunk_size is not None:
+        assert chunk_size >= 1, f"Chunks must not be empty. [chunk_size={chunk_size!r}]"
+        _settings["chunk_size"] = int(chunk_size)
+    if executor is not None:
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor. [executor={executor!r}]")
+        _settings["executor"] = executor
+    current = (_settings["executor"], _settings["workers"])
+    for key in [key for key in _pools if key != current]:
+        _pools.pop(key).shutdown()
+
+
+def _pool() -> Executor:
+    key = (_settings["executor"], _settings["workers"])
+    if key not in _pools:
+        kind = ThreadPoolExecutor if key[0] == "thread" else ProcessPoolExecutor
+        _pools[key] = kind(max_workers=key[1])
+    return _pools[key]
+
+
+@atexit.register
+def _shutdown():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
+
+
+def _evaluate(M, op: str, grades: Sequence[int], param: Optional[int], arrays: Sequence[np.ndarray], out: np.ndarray) -> int:
+    """
+    Evaluate op for one chunk, exactly as the serial path does, writing the result into out and returning its grades.
+    """
+    if op in ("gp", "sandwich"):
+        kernel = getattr(M.kernels, op)(*grades)
+        kernel(*arrays, out=out)
+        return kernel.grades
+    elif op == "exp":
+        result = M._new(arrays[0], grades[0]).exp()
+        out[...] = result._coefficients
+        return result.grades
+    elif op == "project":
+        result = M._new(arrays[0], grades[0]).project(param)
+        out[...] = result._coefficients
+        return result.grades
+    raise ValueError(f"Unknown operation. [op={op!r}]")
+
+
+def _take(x: np.ndarray, chunk: slice, ndim: int) -> np.ndarray:
+    """
+    The rows of x in the chunk, or all of x if it is broadcast along the batch dimension.
+    """
+    return x[chunk] if x.ndim == ndim and x.shape[0] != 1 else x
+
+
+@lru_cache(maxsize=None)
+def _worker_type(name: str, basis_idx: bytes, basis_sign: bytes, grade_mask: bytes, n: int):
+    """
+    The Multivector type in a worker process, rebuilt from its tables since dynamically created types do not pickle.
+    """
+    idx = np.frombuffer(basis_idx, dtype=int).reshape(n, n)
+    sign = np.frombuffer(basis_sign, dtype=int).reshape(n, n)
+    return multivector_type(name, idx, sign, np.frombuffer(grade_mask, dtype=int))
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Open the parent's shared memory block. Workers (however they are started) talk to the parent's resource tracker,
+    so before 3.13, where attaching registers the block again, the registration must be left for the parent's unlink
+    to remove: unregistering here would drop the parent's own.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+# A shared array is described by its shared memory block's name, its shape and its dtype.
+Shared = Tuple[str, Tuple[int, ...], str]
+
+
+def _process_chunk(tables: Tuple, op: str, grades: Sequence[int], param: Optional[int], shared: List[Shared], out: Shared, chunk: slice) -> int:
+    name, basis_idx, basis_sign, grade_mask = tables
+    M = _worker_type(name, basis_idx.astype(int).tobytes(), basis_sign.astype(int).tobytes(), grade_mask.astype(int).tobytes(), len(grade_mask))
+    blocks = [_attach(s[0]) for s in shared + [out]]
+    arrays = [np.ndarray(s[1], dtype=s[2], buffer=b.buf) for (s, b) in zip(shared + [out], blocks)]
+    ndim = len(out[1])
+    result_grades = _evaluate(M, op, grades, param, [_take(x, chunk, ndim) for x in arrays[:-1]], arrays[-1][chunk])
+    del arrays  # the buffers cannot be closed while arrays still use them
+    for b in blocks:
+        b.close()
+    return result_grades
+
+
+def _share(shape: Tuple[int, ...], dtype: np.dtype, blocks: List[SharedMemory]) -> Shared:
+    """
+    A new shared memory block big enough for the array, added to blocks so the caller can free it.
+    """
+    shm = SharedMemory(create=True, size=max(1, int(np.prod(shape, dtype=int)) * np.dtype(dtype).itemsize))
+    blocks.append(shm)
+    return shm.name, shape, np.dtype(dtype).str
+
+
+def _view(shared: Shared, shm: SharedMemory) -> np.ndarray:
+    return np.ndarray(shared[1], dtype=shared[2], buffer=shm.buf)
+
+
+def _run(M, op: str, operands: Sequence[GenericMultivector], param: Optional[int], out: Optional[GenericMultivector]) -> GenericMultivector:
+    arrays = [x._coefficients for x in operands]
+    grades = [x.grades for x in operands]
+    shape = np.broadcast_shapes(*(x.shape for x in arrays))
+    dtype = np.result_type(*arrays, np.float32) if op == "exp" else np.result_type(*arrays)
+    result = np.empty(shape, dtype=dtype) if out is None else out._coefficients
+    assert result.shape == shape, f"The output has the wrong shape. [out={result.shape!r}, expected={shape!r}]"
+
+    n = shape[0] if len(shape) > 1 else 0
+    step = _settings["chunk_size"]
+    if n <= step or _settings["workers"] == 1:
+        result_grades = _evaluate(M, op, grades, param, arrays, result)
+    elif _settings["executor"] == "thread":
+        pool = _pool()
+        chunks = [slice(i, min(i + step, n)) for i in range(0, n, step)]
+        futures = [pool.submit(_evaluate, M, op, grades, param, [_take(x, c, len(shape)) for x in arrays], result[c]) for c in chunks]
+        result_grades = 0
+        for f in futures:
+            result_grades |= f.result()
+    else:
+        blocks: List[SharedMemory] = []
+        try:
+            shared = [_share(x.shape, x.dtype, blocks) for x in arrays]
+            for (x, s, shm) in zip(arrays, shared, blocks):
+                _view(s, shm)[...] = x
+            shared_out = _share(shape, dtype, blocks)
+            pool = _pool()
+            chunks = [slice(i, min(i + step, n)) for i in range(0, n, step)]
+            futures = [pool.submit(_process_chunk, M.tables, op, grades, param, shared, shared_out, c) for c in chunks]
+            result_grades = 0
+            for f in futures:
+                result_grades |= f.result()
+            result[...] = _view(shared_out, blocks[-1])
+        finally:
+            for b in blocks:
+                b.close()
+                b.unlink()
+
+    if out is None:
+        return M._new(result, result_grades)
+    out.grades = result_grades
+    return out
+
+
+def gp(a: GenericMultivector, b: GenericMultivector, out: Optional[GenericMultivector] = None) -> GenericMultivector:
+    """
+    The geometric product a*b, evaluated in parallel chunks.
+    """
+    return _run(type(a), "gp", (a, b), None, out)
+
+
+def sandwich(a: GenericMultivector, b: GenericMultivector, out: Optional[GenericMultivector] = None) -> GenericMultivector:
+    """
+    The sandwich product a*b*a.reverse (see Multivector.apply), evaluated in parallel chunks.
+    """
+    return _run(type(a), "sandwich", (a, b), None, out)
+
+
+def exp(a: GenericMultivector, out: Optional[GenericMultivector] = None) -> GenericMultivector:
+    """
+    The exponential of a, evaluated in parallel chunks.
+    """
+    return _run(type(a), "exp", (a,), None, out)
+
+
+def project(a: GenericMultivector, grade: int, out: Optional[GenericMultivector] = None) -> GenericMultivector:
+    """
+    The projection of a onto the grade, evaluated in parallel chunks.
+    """
+    return _run(type(a), "project", (a,), grade, out)
@@ -0,0 +1,247 @@
+"""
+Rotors estimated from data and interpolated between keyframes, for many independent problems (or samples) at once.
+
+`estimate_rotor` finds the rotor R (and optionally the translation t) which best aligns pairs of 3D vectors,
+y ~ R x R.reverse + t, minimising the weighted sum of squared distances. The problems are the leading (batch)
+dimensions of the vectors and the pairs of each problem are their last batch dimension, so
+
+    R = rotors.estimate_rotor(x, y)   # x, y: (P, N) Multivector3D.Array of vectors, R: (P,) rotors
+    R.apply(x)                        # ~ y
+
+No singular value decomposition is needed. The optimal rotation matrix is the orthogonal (polar) factor of the
+weighted covariance matrix of the pairs, which the scaled Newton iteration Q -> (zQ + Q^-T / z) / 2 converges to
+quadratically. The rotor follows from the rotation matrix through its characteristic multivector: with f the
+rotation and e_k the basis vectors, Y + sum_k f(e_k) Y e_k = 4 <R.reverse Y>_0 R for Y any of 1, e12, e23 and e31.
+The candidate with the largest norm is used, so rotations by angles close to pi are as accurate as small ones.
+
+`slerp`, `squad` and `resample` interpolate rotors (of any algebra) along the geodesics R0 exp(t log(R0.reverse R1)).
+When the bivector part B of the log squares to a scalar, as it does for rotations, boosts and translations, the
+exponential is c + s B with c and s the cos and sin (or cosh and sinh) of t |B|, so R0 exp(t log(...)) is c R0 + s R0 B
+and each sample costs a few multiplications. Resampling a track of keyframes takes the logs (and the products R0 B) of
+its segments once and only looks them up for each sample, so million sample tracks are resampled in one pass.
+
+    R = rotors.resample(keyframes, times, np.linspace(times[0], times[-1], 10**6), method="squad")
+"""
+
+import numpy as np
+
+from typing import Optional, Tuple, Union
+
+from gapy.cayley import grade_bits
+from gapy.core import GenericMultivector
+from gapy.elementary import _only_grades
+
+
+__all__ = ("estimate_rotor", "rotor_from_matrix", "slerp", "squad", "squad_controls", "resample",)
+
+
+def _basis(M) -> Tuple[GenericMultivector, ...]:
+    """
+    The basis vectors of M, which must be a Euclidean algebra of three dimensions.
+    """
+    if np.sum(M.cayley.grade_mask == 1) != 3:
+        raise ValueError(f"Rotors can only be estimated in Euclidean 3D algebras. [type={M.__name__!r}]")
+    e = tuple(M.make.vector(*row) for row in np.eye(3))
+    if any((ek * ek).scalar != 1 for ek in e):
+        raise ValueError(f"Rotors can only be estimated in Euclidean 3D algebras. [type={M.__name__!r}]")
+    return e
+
+
+def _cofactor(F: np.ndarray) -> np.ndarray:
+    """
+    The cofactor matrices of the (..., 3, 3) matrices F, which are det(F) F^-T when F is invertible.
+    """
+    r0, r1, r2 = F[..., 0, :], F[..., 1, :], F[..., 2, :]
+    return np.stack([np.cross(r1, r2), np.cross(r2, r0), np.cross(r0, r1)], -2)
+
+
+def _largest_eigenvalue(A: np.ndarray) -> np.ndarray:
+    """
+    The largest eigenvalues of the symmetric (..., 3, 3) matrices A, from the trigonometric solution of the cubic.
+    """
+    q = np.trace(A, axis1=-2, axis2=-1) / 3
+    off = A[..., 0, 1] ** 2 + A[..., 0, 2] ** 2 + A[..., 1, 2] ** 2
+    p = np.sqrt((np.sum((np.diagonal(A, axis1=-2, axis2=-1) - q[..., np.newaxis]) ** 2, -1) + 2 * off) / 6)
+    B = (A - q[..., np.newaxis, np.newaxis] * np.eye(3)) / np.where(p > 0, p, 1)[..., np.newaxis, np.newaxis]
+    r = np.clip(np.sum(B[..., 0, :] * _cofactor(B)[..., 0, :], -1) / 2, -1, 1)
+    return q + 2 * p * np.cos(np.arccos(r) / 3)
+
+
+def _polar(F: np.ndarray, iterations: int = 32) -> np.ndarray:
+    """
+    The rotation matrices Q maximising trace(Q^T F), for (..., 3, 3) matrices F of rank two or more.
+
+    With singular values s1 >= s2 >= s3, F + cof(F) / s1 has the same singular vectors as F. When det(F) > 0 its
+    singular values are all larger, so it has the same orthogonal factor. When F has rank two, or det(F) < 0 because
+    of noise, its singular values are s1 - s2 s3 / s1, s2 - s3 and s3 - s2, so the smallest changes sign and the
+    orthogonal factor is the best rotation (as in the Kabsch algorithm, which would need the singular vectors).
+    """
+    s1 = np.sqrt(_largest_eigenvalue(np.swapaxes(F, -1, -2) @ F))
+    Q = F + _cofactor(F) / np.where(s1 > 0, s1, np.inf)[..., np.newaxis, np.newaxis]
+    tol = 16 * np.finfo(Q.dtype).eps
+    with np.errstate(divide="ignore", invalid="ignore"):  # rank one problems have no solution, and give nan
+        for _ in range(iterations):
+            C = _cofactor(Q)
+            det = np.sum(Q[..., 0, :] * C[..., 0, :], -1)
+            z = np.abs(det) ** (-1 / 3)
+            Q_next = 0.5 * (z[..., np.newaxis, np.newaxis] * Q + C / (z * det)[..., np.newaxis, np.newaxis])
+            converged = not np.any(np.abs(Q_next - Q) > tol)
+            Q = Q_next
+            if converged:
+                break
+    return Q
+
+
+def rotor_from_matrix(M, matrices: np.ndarray) -> GenericMultivector:
+    """
+    The rotors R of the type M with R * x * R.reverse == matrices @ x, for (..., 3, 3) rotation matrices, i.e. the
+    inverse of Multivector.to_matrix. The sign of R is chosen to make its scalar part non-negative.
+    """
+    matrices = np.asarray(matrices)
+    e = _basis(M)
+    f = [M.make.vector(*np.moveaxis(matrices[..., :, k], -1, 0)) for k in range(3)]
+    candidates = []
+    for Y in (M.make.scalar(1.0), e[0] * e[1], e[1] * e[2], e[2] * e[0]):
+        psi = Y
+        for k in range(3):
+            psi = psi + f[k] * (Y * e[k])
+        candidates.append(np.broadcast_to(psi._coefficients, f[0]._coefficients.shape))
+    candidates = np.stack(candidates)
+    norms = np.sum(candidates * candidates, -1)
+    best = np.take_along_axis(candidates, np.argmax(norms, 0)[np.newaxis, ..., np.newaxis], 0)[0]
+    best = best / np.sqrt(np.max(norms, 0))[..., np.newaxis]
+    best = best * np.where(best[..., :1] < 0, -1, 1)
+    return M._new(best.astype(np.result_type(matrices, np.float32), copy=False), grade_bits([0, 2]))
+
+
+def estimate_rotor(x: GenericMultivector, y: GenericMultivector, weights: Optional[np.ndarray] = None,
+                   translation: bool = False) -> Union[GenericMultivector, Tuple[GenericMultivector, GenericMultivector]]:
+    """
+    The rotors R minimising sum_n weights[n] |y[n] - R x[n] R.reverse|^2 over the last batch dimension of the vectors x
+    and y, for every problem in the leading batch dimensions at once. With translation, returns the rotors and
+    translation vectors t minimising sum_n weights[n] |y[n] - R x[n] R.reverse - t|^2 instead.
+    The pairs of a problem must not all lie on one line through the origin (or the centroid, with translation),
+    otherwise the rotation is not unique and the rotor is nan.
+    """
+    M = type(x)
+    p, q = np.broadcast_arrays(x.vector, y.vector)
+    assert p.ndim >= 2, f"Expected a batch of vectors for each problem. [shape={p.shape[:-1]!r}]"
+    w = np.ones(p.shape[:-1]) if weights is None else np.broadcast_to(weights, p.shape[:-1])
+    if translation:
+        total = np.sum(w, -1)[..., np.newaxis]
+        p_mean = np.sum(w[..., np.newaxis] * p, -2) / total
+        q_mean = np.sum(w[..., np.newaxis] * q, -2) / total
+        p, q = p - p_mean[..., np.newaxis, :], q - q_mean[..., np.newaxis, :]
+
+    F = np.einsum("...n,...ni,...nj->...ij", w, q, p)
+    R = rotor_from_matrix(M, _polar(F)).astype(np.result_type(x._coefficients, y._coefficients, np.float32), copy=False)
+    if not translation:
+        return R
+    t = M.make.vector(*np.moveaxis(q_mean, -1, 0)) - R.apply(M.make.vector(*np.moveaxis(p_mean, -1, 0)))
+    return R, t
+
+
+def _flip(R: GenericMultivector, negate: np.ndarray) -> GenericMultivector:
+    return type(R)._new(R._coefficients * np.where(negate, -1, 1)[..., np.newaxis], R.grades)
+
+
+def _geodesic(R: GenericMultivector, L: GenericMultivector, t: np.ndarray, index: Optional[np.ndarray] = None) -> GenericMultivector:
+    """
+    R exp(t L), for rotors R and generators L broadcast with t. When index is given, R and L hold a value per segment
+    and sample k uses segment index[k], so everything but the final combination is done once per segment.
+    """
+    M = type(L)
+    take = (lambda a: a) if index is None else (lambda a: M._new(a._coefficients[index], a.grades))
+    l = L.scalar
+    B = L - M.make.scalar(l)
+    B2 = B * B
+    if not _only_grades(B2, grade_bits([0])):
+        return take(R) * (take(L) * t).exp()
+
+    RB, b2 = take(R * B), B2.scalar if index is None else B2.scalar[index]
+    R, l = take(R), l if index is None else l[index]
+    r = np.sqrt(np.abs(b2))
+    tr = np.multiply(t, r)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):  # the branches not taken may overflow or divide by zero
+        if np.all(b2 <= 0):  # only rotations (the usual case), so only one branch is evaluated
+            c, s = np.cos(tr), np.sin(tr)
+        elif np.all(b2 >= 0):
+            c, s = np.cosh(tr), np.sinh(tr)
+        else:
+            c, s = np.where(b2 < 0, np.cos(tr), np.cosh(tr)), np.where(b2 < 0, np.sin(tr), np.sinh(tr))
+        s = np.where(r == 0, t, s / r)
+    scale = np.exp(np.multiply(t, l))
+    coefficients = (scale * c)[..., np.newaxis] * R._coefficients + (scale * s)[..., np.newaxis] * RB._coefficients
+    return M._new(coefficients, R.grades | RB.grades)
+
+
+def slerp(R0: GenericMultivector, R1: GenericMultivector, t: np.ndarray, shortest: bool = True) -> GenericMultivector:
+    """
+    The rotors R0 (R0.reverse R1)^t, moving from R0 at t = 0 to R1 at t = 1 at a constant angular velocity.
+    R0, R1 and t broadcast together. Since R and -R are the same rotation, R1 is negated when that gives the
+    shorter path, unless shortest is False.
+    """
+    D = R0.reverse * R1
+    if shortest:
+        D = _flip(D, D.scalar < 0)
+    return _geodesic(R0, D.log(), t)
+
+
+def squad(R0: GenericMultivector, R1: GenericMultivector, S0: GenericMultivector, S1: GenericMultivector,
+          t: np.ndarray) -> GenericMultivector:
+    """
+    Spherical quadrangle interpolation from R0 to R1 with the control rotors S0 and S1 (see squad_controls), which
+    joins consecutive segments of a track with a continuous angular velocity (to first order in the segments' angles).
+    """
+    return slerp(slerp(R0, R1, t), slerp(S0, S1, t), 2 * np.multiply(t, np.subtract(1, t)), shortest=False)
+
+
+def _consistent(keyframes: GenericMultivector) -> GenericMultivector:
+    """
+    The keyframes negated where needed so each is on the same side as the one before, and interpolation takes the
+    shorter path along every segment.
+    """
+    M = type(keyframes)
+    dots = keyframes[:-1].reverse.scalar_product(keyframes[1:]).scalar
+    negate = np.concatenate([[False], np.cumsum(dots < 0) % 2 == 1])
+    return M._new(keyframes._coefficients * np.where(negate, -1, 1)[:, np.newaxis], keyframes.grades)
+
+
+def squad_controls(keyframes: GenericMultivector, times: Optional[np.ndarray] = None) -> GenericMultivector:
+    """
+    The control rotors S[i] = R[i] exp(-(log(R[i].reverse R[i+1]) + log(R[i].reverse R[i-1])) / 4) for the (K,) track
+    of keyframes R, with the end keyframes as their own controls. If the keyframes are at unevenly spaced times, the
+    two logs are weighted by the durations of the segments on the other side (w+ = 2 dt[i-1] / (dt[i-1] + dt[i]),
+    w- = 2 dt[i] / (dt[i-1] + dt[i])), so the angular velocity, rather than the rate of change in each segment's
+    parameter, is continuous through the keyframes.
+    """
+    R = _consistent(keyframes)
+    if len(R) < 3:
+        return R
+    inner = R[1:-1]
+    dt = np.ones(len(R) - 1) if times is None else np.diff(times)
+    before, after = dt[:-1], dt[1:]
+    L = (inner.reverse * R[2:]).log() * (before / (before + after)) + (inner.reverse * R[:-2]).log() * (after / (before + after))
+    S = inner * (L * -0.5).exp()
+    return type(R)._new(np.concatenate([R._coefficients[:1], S._coefficients, R._coefficients[-1:]]), R.grades | S.grades)
+
+
+def resample(keyframes: GenericMultivector, times: np.ndarray, at: np.ndarray, method: str = "slerp") -> GenericMultivector:
+    """
+    The track of (K,) keyframes, at the increasing times, interpolated at the times `at` (of any shape) with slerp or
+    squad. Times before the first keyframe or after the last give the first or last keyframe.
+    """
+    times = np.asarray(times)
+    assert len(keyframes) == len(times) >= 2, f"Expected two or more keyframes, one per time. [keyframes={len(keyframes)!r}, times={len(times)!r}]"
+    R = _consistent(keyframes)
+    i = np.clip(np.searchsorted(times, at, side="right") - 1, 0, len(times) - 2)
+    u = np.clip((at - times[i]) / (times[i + 1] - times[i]), 0, 1)
+
+    def along(R: GenericMultivector) -> GenericMultivector:
+        return _geodesic(R[:-1], (R[:-1].reverse * R[1:]).log(), u, i)
+
+    if method == "slerp":
+        return along(R)
+    elif method == "squad":
+        return slerp(along(R), along(squad_controls(R, times)), 2 * u * (1 - u), shortest=False)
+    raise ValueError(f"Unknown interpolation method. [method={method!r}]")
@@ -0,0 +1,227 @@
+"""
+A binary file format for batches of multivectors which is memory mapped when loaded, so loading is instant and
+the coefficients are never copied.
+
+A file is the 8 byte magic string, the length of the header as a little-endian uint32, a JSON header padded with
+spaces so the data starts on a 64 byte boundary, then the raw rows of coefficients in C order. The header records:
+
+    algebra     the type's name and its signature (p, q, r), when known
+    tables      a hash of the multiplication tables, which identifies the blade ordering and signs exactly,
+                along with the tables themselves so files can be read without knowing their type
+    blades      the indices of the blades stored, only the blades of the stored grades are written (e.g. 3 of
+                the 8 coefficients for vectors in 3D), or the scalar blade if no grades are stored
+    grades      the bitmask of the stored grades
+    dtype       the numpy dtype string of the coefficients
+    shape       the batch shape of one row, so files store (N, *shape, len(blades)) arrays
+
+The number of rows is not in the header, it follows from the size of the file, so appending rows is just writing
+them at the end.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+
+from typing import Dict, Optional, Tuple, Type
+
+from gapy.cayley import grade_bits
+from gapy.core import GenericMultivector, algebra, multivector_type
+
+
+__all__ = ("MappedArray", "save", "load", "append",)
+
+
+_MAGIC = b"GAPYMV01"
+_ALIGN = 64
+
+# Types seen by save and load, by the hash of their tables, so loading gives back the same type.
+_types: Dict[str, Type[GenericMultivector]] = {}
+
+
+def _base_type(a: GenericMultivector) -> Type[GenericMultivector]:
+    """
+    The Multivector type of a, rather than its Array type.
+    """
+    M = type(a)
+    return M.__bases__[0] if M.Array is M else M
+
+
+def _tables_hash(M) -> str:
+    _, basis_idx, basis_sign, grade_mask = M.tables
+    key = hashlib.sha1()
+    for array in (basis_idx, basis_sign, grade_mask):
+        key.update(np.ascontiguousarray(array, dtype="<i8").tobytes())
+    return key.hexdigest()
+
+
+def _register(M) -> str:
+    h = _tables_hash(M)
+    _types.setdefault(h, M)
+    return h
+
+
+def _resolve(header: Dict) -> Type[GenericMultivector]:
+    """
+    The type the file was written with: one seen before, the algebra of its signature or one built from its tables.
+    """
+    h = header["tables"]["hash"]
+    if h not in _types:
+        from gapy import ga2d, ga3d
+        for M in (ga2d.Multivector2D, ga3d.Multivector3D):
+            _register(M)
+        if header["algebra"]["signature"] is not None:
+            _register(algebra(*header["algebra"]["signature"]))
+    if h not in _types:
+        t = header["tables"]
+        n = len(t["grade_mask"])
+        M = multivector_type(header["algebra"]["name"], np.reshape(t["basis_idx"], (n, n)), np.reshape(t["basis_sign"], (n, n)), np.array(t["grade_mask"]))
+        _types[h] = M
+    return _types[h]
+
+
+def _header(M, blades: np.ndarray, dtype: np.dtype, shape: Tuple[int, ...]) -> Dict:
+    name, basis_idx, basis_sign, grade_mask = M.tables
+    return {
+        "algebra": {"name": name, "signature": list(M.signature) if M.signature is not None else None},
+        "tables": {"hash": _register(M), "grade_mask": np.asarray(grade_mask).tolist(),
+                   "basis_idx": np.asarray(basis_idx).ravel().tolist(), "basis_sign": np.asarray(basis_sign).ravel().tolist()},
+        "blades": [int(b) for b in blades],
+        "grades": grade_bits(np.asarray(grade_mask)[blades]),
+        "dtype": np.dtype(dtype).str,
+        "shape": list(shape),
+    }
+
+
+def _read_header(path: str) -> Tuple[Dict, int]:
+    with open(path, "rb") as f:
+        magic = f.read(len(_MAGIC))
+        if magic != _MAGIC:
+            raise ValueError(f"Not a gapy multivector file. [path={path!r}, magic={magic!r}]")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length).decode())
+    return header, len(_MAGIC) + 4 + length
+
+
+def _stored_blades(a: GenericMultivector, grades: Optional[int]) -> np.ndarray:
+    """
+    The blades of the grades, or just the scalar blade if there are none, so every row takes up some of the file
+    and the number of rows can be worked out from its size.
+    """
+    grade_mask = type(a).cayley.grade_mask
+    grades = a.grades if grades is None else grades
+    return np.flatnonzero((grades >> grade_mask) & 1) if grades else np.flatnonzero(grade_mask == 0)
+
+
+def _check_stored(a: GenericMultivector, grades: int):
+    """
+    Make sure a has nothing in the grades which are not stored, rather than silently dropping it.
+    """
+    others = a.grades & ~grades
+    for g in range(others.bit_length()):
+        if (others >> g) & 1 and np.any(a.is_grade(g)):
+            raise ValueError(f"Cannot store a multivector with grade {g} in a file storing grades {grades:#b}.")
+
+
+def save(path: str, a: GenericMultivector, grades: Optional[int] = None):
+    """
+    Write the batch of multivectors a to path. Only the blades of the grades in the bitmask `grades` are written,
+    by default those in a.grades, so a batch of vectors only stores its vector coefficients.
+    """
+    M = _base_type(a)
+    blades = _stored_blades(a, grades)
+    header = _header(M, blades, a._coefficients.dtype, a._coefficients.shape[1:-1])
+    _check_stored(a, header["grades"])
+    data = json.dumps(header).encode()
+    padding = -(len(_MAGIC) + 4 + len(data)) % _ALIGN
+    data += b" " * padding
+    rows = a._coefficients if a._coefficients.ndim > 1 else a._coefficients[np.newaxis]
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(data)))
+        f.write(data)
+        f.write(np.ascontiguousarray(rows[..., blades]).tobytes())
+
+
+def append(path: str, a: GenericMultivector) -> int:
+    """
+    Append the rows of a to the file at path, which must store the same type, dtype and row shape.
+    Returns the number of rows in the file afterwards.
+    """
+    header, offset = _read_header(path)
+    M = _base_type(a)
+    if _tables_hash(M) != header["tables"]["hash"]:
+        raise ValueError(f"Cannot append to a file of a different algebra. [type={M.__name__!r}, file={header['algebra']['name']!r}]")
+    rows = a._coefficients if a._coefficients.ndim > 1 else a._coefficients[np.newaxis]
+    if list(rows.shape[1:-1]) != header["shape"]:
+        raise ValueError(f"Rows have the wrong shape. [shape={rows.shape[1:-1]!r}, file={tuple(header['shape'])!r}]")
+    if rows.dtype != np.dtype(header["dtype"]):
+        raise ValueError(f"Rows have the wrong dtype. [dtype={rows.dtype.str!r}, file={header['dtype']!r}]")
+    _check_stored(a, header["grades"])
+    with open(path, "ab") as f:
+        f.write(np.ascontiguousarray(rows[..., header["blades"]]).tobytes())
+    row_bytes = np.dtype(header["dtype"]).itemsize * int(np.prod(header["shape"], dtype=int)) * len(header["blades"])
+    return (os.path.getsize(path) - offset) // row_bytes
+
+
+class MappedArray:
+    """
+    A file of multivectors, memory mapped. `data` is the (N, ..., len(blades)) array of the stored coefficients,
+    indexing gives (Multivector.Array) batches with the full set of blades.
+    """
+
+    def __init__(self, path: str, mode: str = "r"):
+        header, offset = _read_header(path)
+        self.path = path
+        self.header = header
+        self.type = _resolve(header)
+        self.blades = np.array(header["blades"], dtype=int)
+        self.grades = header["grades"]
+        dtype = np.dtype(header["dtype"])
+        row = tuple(header["shape"]) + (len(self.blades),)
+        row_bytes = dtype.itemsize * int(np.prod(row, dtype=int))
+        n = (os.path.getsize(path) - offset) // row_bytes if row_bytes else 0
+        if n == 0:
+            self.data = np.zeros((0,) + row, dtype=dtype)
+        else:
+            self.data = np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(n,) + row)
+        self.dense = len(self.blades) == len(self.type.cayley.grade_mask)
+
+    def __repr__(self) -> str:
+        return f"MappedArray({self.path!r}, type={self.type.__name__}, shape={self.shape!r}, grades={self.grades:#b})"
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.data.shape[:-1]
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def _expand(self, data: np.ndarray) -> GenericMultivector:
+        if self.dense:
+            return self.type._new(data, self.grades)
+        coefficients = np.zeros(data.shape[:-1] + (len(self.type.cayley.grade_mask),), dtype=data.dtype)
+        coefficients[..., self.blades] = data
+        return self.type._new(coefficients, self.grades)
+
+    def __getitem__(self, key) -> GenericMultivector:
+        """
+        The selected rows as multivectors. Dense files give views of the file, grade-sparse files copy just the selected rows.
+        """
+        key = key if isinstance(key, tuple) else (key,)
+        return self._expand(self.data[key + (slice(None),)])
+
+    @property
+    def array(self) -> GenericMultivector:
+        """
+        The whole file as a Multivector.Array, a view of the file if every blade is stored and a copy otherwise.
+        """
+        return self._expand(self.data)
+
+
+def load(path: str, mode: str = "r") -> MappedArray:
+    """
+    Memory map the file at path, see MappedArray. Use mode "r+" to modify the file through the map.
+    """
+    return MappedArray(path, mode)
@@ -0,0 +1,132 @@
+"""
+Streaming evaluation of multivector formulas in fixed-size chunks, so arbitrarily long trajectories can be produced
+(and written out) while only ever holding one chunk in memory.
+
+    s = np.linspace(0, 2*np.pi, 10**8)                    # too big? then instead:
+    s = stream.linspace(0, 2*np.pi, 10**8, chunk_size=1 << 16)
+    U = s.map(lambda s: A*(s*L).exp() + B*(-s*L).exp())
+    x = U.map(lambda U: U*U*e)
+    x.vector.to(np.lib.format.open_memmap("x.npy", "w+", shape=(10**8, 3)))
+
+Each chunk is a numpy array or a Multivector.Array, so formulas (including gapy.lazy fused functions) and the
+extraction helpers (`vector`, `scalar`, `project`, ...) work on whole chunks at once. Streams are lazy and can be
+iterated more than once, each iteration re-evaluating the chunks.
+"""
+
+import numpy as np
+
+from typing import Callable, Iterator, Optional
+
+from gapy.core import GenericMultivector
+
+
+__all__ = ("Stream", "linspace", "arange", "chunked",)
+
+
+class Stream:
+    """
+    A lazily evaluated sequence of chunks.
+    """
+
+    def __init__(self, chunks: Callable[[], Iterator]):
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator:
+        return iter(self._chunks())
+
+    def map(self, fn: Callable) -> "Stream":
+        """
+        The stream of fn applied to each chunk.
+        """
+        return Stream(lambda: (fn(c) for c in self))
+
+    @property
+    def coefficients(self) -> "Stream":
+        return self.map(lambda c: c.coefficients)
+
+    @property
+    def scalar(self) -> "Stream":
+        return self.map(lambda c: c.scalar)
+
+    @property
+    def vector(self) -> "Stream":
+        return self.map(lambda c: c.vector)
+
+    @property
+    def pseudoscalar(self) -> "Stream":
+        return self.map(lambda c: c.pseudoscalar)
+
+    def project(self, grade: int) -> "Stream":
+        return self.map(lambda c: c.project(grade))
+
+    def to(self, sink, offset: int = 0) -> int:
+        """
+        Write every chunk to the sink, returning the number of rows written. The sink may be an array (e.g. a np.memmap)
+        which is filled along its first axis from offset, a binary file (each chunk's raw bytes are written in turn)
+        or a function which is called with each chunk. Multivector chunks are written as their coefficients.
+        """
+        n = 0
+        for chunk in self:
+            block = chunk._coefficients if isinstance(chunk, GenericMultivector) else np.asarray(chunk)
+            rows = block.shape[0] if block.ndim > 0 else 1
+            if callable(sink):
+                sink(block)
+            elif hasattr(sink, "write"):
+                sink.write(np.ascontiguousarray(block).tobytes())
+            else:
+                sink[offset + n:offset + n + rows] = block
+            n += rows
+        return n
+
+    def collect(self, out: Optional[np.ndarray] = None):
+        """
+        All the chunks joined into one array (or Multivector.Array), which defeats the point for long streams but
+        is handy for short ones. If out is given the chunks are written into it instead.
+        """
+        if out is not None:
+            self.to(out)
+            return out
+        chunks = list(self)
+        if chunks and isinstance(chunks[0], GenericMultivector):
+            grades = 0
+            for c in chunks:
+                grades |= c.grades
+            return type(chunks[0])._new(np.concatenate([c._coefficients for c in chunks]), grades)
+        return np.concatenate(chunks)
+
+
+def _blocks(num: int, chunk_size: int) -> Iterator[slice]:
+    assert chunk_size >= 1, f"Chunks must not be empty. [chunk_size={chunk_size!r}]"
+    for start in range(0, num, chunk_size):
+        yield slice(start, min(start + chunk_size, num))
+
+
+def linspace(start: float, stop: float, num: int, chunk_size: int = 1 << 16) -> Stream:
+    """
+    The values of np.linspace(start, stop, num) in chunks, computed a chunk at a time.
+    """
+    step = (stop - start) / (num - 1) if num > 1 else 0.0
+
+    def chunks():
+        for s in _blocks(num, chunk_size):
+            values = start + np.arange(s.start, s.stop) * step
+            if s.stop == num and num > 1:
+                values[-1] = stop  # as np.linspace does, so the end point is exact
+            yield values
+
+    return Stream(chunks)
+
+
+def arange(num: int, chunk_size: int = 1 << 16) -> Stream:
+    """
+    The indices 0, 1, ..., num - 1 in chunks.
+    """
+    return Stream(lambda: (np.arange(s.start, s.stop) for s in _blocks(num, chunk_size)))
+
+
+def chunked(a, chunk_size: int = 1 << 16) -> Stream:
+    """
+    An existing array or Multivector.Array (e.g. memory mapped from disk) in chunks along its first dimension.
+    """
+    n = len(a)
+    return Stream(lambda: (a[s] for s in _blocks(n, chunk_size)))
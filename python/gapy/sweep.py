@@ -0,0 +1,101 @@
+"""
+Exponentials exp(s B) (and the rotations R(s) x R(s).reverse they generate) over a grid of parameters s.
+
+    s = np.linspace(0, 2*np.pi, 1001)
+    U = sweep.exp(L, s)            # the same as (s*L).exp(), with L decomposed once
+    x = sweep.apply(L, s, e)       # exp(s L) e exp(s L).reverse
+
+Two methods avoid evaluating exp for every sample:
+
+    "trig"          when the non-scalar part of B squares to a scalar (bivectors of 3D, rotations, boosts and
+                    translations), exp(s B) = exp(s b) (c(s) + s(s) B') with c and s the cos and sin (or cosh and
+                    sinh) of s |B'|, so B is decomposed once and the samples only cost vectorised trig.
+    "recurrence"    for evenly spaced s, exp(s_k B) = exp(s_0 B) exp(h B)^k, evaluated by doubling: the first n
+                    samples times exp(h B)^n give the next n, so a sweep takes log2(len(s)) (vectorised) products.
+                    Rotors (the exponentials of bivectors) are renormalised after every doubling, so rounding errors
+                    do not grow with the length of the sweep.
+
+The default, "auto", uses trig when it applies, then the recurrence for evenly spaced s and exp for everything else.
+"""
+
+import numpy as np
+
+from typing import Optional
+
+from gapy.cayley import grade_bits
+from gapy.core import GenericMultivector, sandwich
+from gapy.elementary import _only_grades
+from gapy.rotors import _geodesic
+
+
+__all__ = ("exp", "apply",)
+
+
+def _trig_applies(B: GenericMultivector) -> bool:
+    M = type(B)
+    rest = B - M.make.scalar(B.scalar)
+    return _only_grades(rest * rest, grade_bits([0]))
+
+
+def _uniform(s: np.ndarray) -> bool:
+    steps = np.diff(s)
+    return len(s) > 1 and np.allclose(steps, steps[0], rtol=1e-9, atol=0)
+
+
+def _renormalise(R: GenericMultivector) -> GenericMultivector:
+    """
+    R scaled so R * R.reverse == 1, for exponentials of bivectors.
+    """
+    norm = np.sqrt(R.scalar_product(R.reverse).scalar)
+    return type(R)._new(R._coefficients / norm[..., np.newaxis], R.grades)
+
+
+def _recurrence(B: GenericMultivector, s: np.ndarray) -> GenericMultivector:
+    M = type(B)
+    renormalise = _renormalise if _only_grades(B, grade_bits([2])) else (lambda R: R)
+    first = (B * s[0]).exp()
+    step = (B * (s[1] - s[0])).exp()
+    out = np.empty((len(s),) + first._coefficients.shape, dtype=np.result_type(first._coefficients, step._coefficients))
+    out[0] = first._coefficients
+    grades, done = first.grades, 1
+    while done < len(s):
+        n = min(done, len(s) - done)
+        block = renormalise(M._new(out[:n], grades) * step)
+        out[done:done + n] = block._coefficients
+        grades |= block.grades
+        done += n
+        step = renormalise(step * step)
+    return M._new(out, grades)
+
+
+def exp(B: GenericMultivector, s: np.ndarray, method: str = "auto") -> GenericMultivector:
+    """
+    exp(s[k] B) for each of the (N,) parameters s, giving an (N, ...) Multivector.Array (B may be a batch itself).
+    See the module documentation for the methods.
+    """
+    s = np.asarray(s)
+    assert s.ndim == 1, f"Expected a one dimensional grid of parameters. [shape={s.shape!r}]"
+    if method == "auto":
+        method = "trig" if _trig_applies(B) else "recurrence" if _uniform(s) else "exp"
+
+    t = s.reshape(s.shape + (1,) * (B._coefficients.ndim - 1))
+    if method == "trig":
+        if not _trig_applies(B):
+            raise ValueError("The trig method needs the non-scalar part of B to square to a scalar.")
+        return _geodesic(type(B).make.scalar(B._coefficients.dtype.type(1)), B, t)
+    elif method == "recurrence":
+        if not _uniform(s):
+            raise ValueError("The recurrence method needs evenly spaced parameters.")
+        return _recurrence(B, s)
+    elif method == "exp":
+        return (B * t).exp()
+    raise ValueError(f"Unknown method. [method={method!r}]")
+
+
+def apply(B: GenericMultivector, s: np.ndarray, x: GenericMultivector, method: str = "auto",
+          out: Optional[GenericMultivector] = None) -> GenericMultivector:
+    """
+    exp(s[k] B) x exp(s[k] B).reverse for each of the (N,) parameters s, e.g. a vector x swept around the rotation
+    generated by the bivector B. x broadcasts with the (N, ...) rotors, so use x[np.newaxis] for a batch of them.
+    """
+    return sandwich(exp(B, s, method), x, out=out)
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+
+from gapy import ga2d, ga3d
+from gapy.core import algebra, algebra_tables
+
+class TestAlgebra(unittest.TestCase):
+    """
+    Check the algebras generated from their signature.
+    """
+
+    signatures = [(2, 0, 0), (3, 0, 0), (1, 1, 0), (0, 3, 0), (2, 0, 1), (3, 0, 1), (4, 1, 0)]
+
+    def basis_vectors(self, M):
+        n = len(M.cayley.grade_mask)
+        ndims = np.sum(M.cayley.grade_mask == 1)
+        return [M(*np.eye(n)[1 + i]) for i in range(ndims)]
+
+    def test_ga2d_tables(self):
+        basis_idx, basis_sign, grade_mask = algebra_tables(2)
+        np.testing.assert_array_equal(basis_idx, ga2d.basis_idx)
+        np.testing.assert_array_equal(basis_sign, ga2d.basis_sign)
+        np.testing.assert_array_equal(grade_mask, ga2d.grade_mask)
+
+    def test_ga3d_tables(self):
+        # gapy.ga3d uses e3e1 where the generated algebra uses e1e3, otherwise they agree
+        basis_idx, basis_sign, grade_mask = algebra_tables(3)
+        flip = np.where(np.arange(8) == 5, -1, 1)
+        np.testing.assert_array_equal(basis_idx, ga3d.basis_idx)
+        np.testing.assert_array_equal(flip[:, np.newaxis] * basis_sign * flip[np.newaxis, :] * flip[ga3d.basis_idx], ga3d.basis_sign)
+        np.testing.assert_array_equal(grade_mask, ga3d.grade_mask)
+
+    def test_metric(self):
+        for (p, q, r) in self.signatures:
+            M = algebra(p, q, r)
+            metric = [1] * p + [-1] * q + [0] * r
+            for (e, m) in zip(self.basis_vectors(M), metric):
+                self.assertEqual(e*e, M.make.scalar(m))
+
+    def test_anticommutation(self):
+        for (p, q, r) in self.signatures:
+            M = algebra(p, q, r)
+            e = self.basis_vectors(M)
+            for i in range(len(e)):
+                for j in range(i + 1, len(e)):
+                    self.assertEqual(e[i]*e[j], -(e[j]*e[i]))
+
+    def test_associativity(self):
+        rng = np.random.default_rng(11)
+        for (p, q, r) in self.signatures:
+            M = algebra(p, q, r)
+            a, b, c = (M.Array(rng.normal(size=(3, 1 << (p + q + r)))) for _ in range(3))
+            self.assertEqual((a*b)*c, a*(b*c))
+            self.assertEqual((a*b).reverse, b.reverse*a.reverse)
+
+    def test_cached(self):
+        self.assertIs(algebra(3, 0, 1), algebra(3, 0, 1))
+        self.assertEqual(len(algebra(4, 1).cayley.grade_mask), 32)
+        self.assertEqual(algebra(3, 0, 1).__name__, "Multivector_3_0_1")
+
+    def test_pga(self):
+        M = algebra(3, 0, 1)
+        e1, e2, e3, e0 = self.basis_vectors(M)
+        self.assertEqual(e0*e0, M.make.scalar(0))
+        # translators are exp of null bivectors, 1 + t e0e1 / 2 style and are their own reverse's inverse
+        T = 1 + 0.5 * e1*e0
+        self.assertEqual(T*T.reverse, M.make.scalar(1))
+        # sparse: the degenerate terms are dropped from the table
+        self.assertLess(M.cayley.nterms, 16 * 16)
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+
+from gapy.ga3d import *
+
+class TestArray(unittest.TestCase):
+    """
+    Check the batched Multivector3D.Array agrees with looping over single Multivector3D objects.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(1234)
+        self.a = Multivector3D.Array(rng.normal(size=(5, 8)))
+        self.b = Multivector3D.Array(rng.normal(size=(5, 8)))
+
+    def test_construction(self):
+        x = Multivector3D.make.vector(np.arange(4), 0, 1)
+        self.assertIsInstance(x, Multivector3D.Array)
+        self.assertEqual(x.shape, (4,))
+        self.assertEqual(len(x), 4)
+        self.assertEqual(x[2], vec(2, 0, 1))
+        self.assertEqual(Multivector3D.make.scalar(np.ones((2, 3))).shape, (2, 3))
+        self.assertEqual(Multivector3D.make.pseudoscalar([1, 2])[1], 2*I)
+
+    def test_arithmetic(self):
+        for i, (a, b) in enumerate(zip(self.a, self.b)):
+            self.assertEqual((self.a * self.b)[i], a * b)
+            self.assertEqual((self.a + self.b)[i], a + b)
+            self.assertEqual((self.a - self.b)[i], a - b)
+            self.assertEqual((-self.a)[i], -a)
+            self.assertEqual(self.a.reverse[i], a.reverse)
+            self.assertEqual(self.a.project(2)[i], a.project(2))
+
+    def test_broadcasting(self):
+        b = self.b[0]
+        for i, a in enumerate(self.a):
+            self.assertEqual((self.a * b)[i], a * b)
+            self.assertEqual((b * self.a)[i], b * a)
+        s = np.arange(5)
+        self.assertEqual((s * ex)[3], 3 * ex)
+        self.assertEqual((ex * s)[3], 3 * ex)
+        self.assertEqual((1 + s * ex)[3], 1 + 3 * ex)
+        self.assertEqual((self.a[:, np.newaxis] * self.b).shape, (5, 5))
+
+    def test_exp(self):
+        s = np.linspace(0, 2*np.pi, 7)
+        R = (s * Bxy).exp()
+        for i, si in enumerate(s):
+            self.assertEqual(R[i], (si * Bxy).exp())
+        v = (s * ex).exp()
+        np.testing.assert_allclose(v.scalar, np.cosh(s))
+        np.testing.assert_allclose(v.vector[:, 0], np.sinh(s))
+
+    def test_rotation(self):
+        angles = np.radians([0, 45, 90, 180])
+        a = vec(0.5, 0.5, 1)
+        r = a.rotate_rad(angles, Bxy)
+        for i, angle in enumerate(angles):
+            self.assertEqual(r[i], a.rotate_rad(angle, Bxy))
+        points = Multivector3D.make.vector(*np.eye(3))
+        self.assertEqual(points.rotate_deg(90, Bxy)[0], vec(0, 1, 0))
+
+    def test_setitem(self):
+        a = Multivector3D.Array(np.zeros((3, 8)))
+        a[1] = ex
+        self.assertEqual(a[1], ex)
+        self.assertEqual(a[0], Multivector3D.make.scalar(0))
+
+    def test_apply(self):
+        rng = np.random.default_rng(5)
+        R = Multivector3D.make.rotor(rng.uniform(0, np.pi, 4), Multivector3D.make.bivector(*rng.normal(size=(3, 4))))
+        points = Multivector3D.make.vector(*rng.normal(size=(3, 6)))
+        rotated = R[:, np.newaxis].apply(points)
+        self.assertEqual(rotated.shape, (4, 6))
+        for i in range(4):
+            for j in range(6):
+                self.assertEqual(rotated[i, j], R[i]*points[j]*R[i].reverse)
+
+        M = R.to_matrix()
+        self.assertEqual(M.shape, (4, 3, 3))
+        np.testing.assert_allclose(points.vector @ M[1].T, R[1].apply(points).vector)
+        np.testing.assert_allclose(np.einsum("rij,pj->rpi", M, points.vector), rotated.vector)
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+
+from gapy import backend, ga3d
+from gapy.cayley import grade_bits
+
+class TestBackend(unittest.TestCase):
+    """
+    Check selecting backends, and that the row kernels the JIT backend compiles agree with the numpy kernels.
+    """
+
+    def setUp(self):
+        self.backend = backend.get_backend()
+
+    def tearDown(self):
+        backend.set_backend(self.backend)
+
+    def test_select(self):
+        self.assertIn("numpy", backend.available_backends())
+        backend.set_backend("numpy")
+        self.assertEqual(backend.get_backend(), "numpy")
+        self.assertEqual(ga3d.vec(1, 0, 0) * ga3d.vec(0, 1, 0), ga3d.Bxy)
+        with self.assertRaises(ValueError):
+            backend.set_backend("fortran")
+
+    def test_row_source(self):
+        rng = np.random.default_rng(4)
+        kernels = ga3d.Multivector3D.kernels
+        rotor, vector = grade_bits([0, 2]), grade_bits([1])
+        for kernel in (kernels.gp(255, 255), kernels.gp(vector, vector), kernels.sandwich(rotor, vector), kernels.outer(vector, rotor)):
+            row = backend._row_function(kernel)
+            a, b = rng.normal(size=(2, 4, 8))
+            expected = kernel(a, b)
+            for i in range(len(a)):
+                r = np.full(8, np.nan)
+                row(a[i], b[i], r)
+                np.testing.assert_allclose(r, expected[i])
+                row(a[i], b[i], a[i])  # the output may alias an operand
+                np.testing.assert_allclose(a[i], expected[i])
+
+    @unittest.skipUnless("numba" in backend.available_backends(), "numba is not installed")
+    def test_numba(self):
+        rng = np.random.default_rng(6)
+        a = ga3d.Multivector3D.Array(rng.normal(size=(5, 8)))
+        b = ga3d.Multivector3D.Array(rng.normal(size=(5, 8)))
+        backend.set_backend("numpy")
+        expected = (a * b, a[0] * b[0], a.apply(b), a.exp())
+        backend.set_backend("numba")
+        self.assertEqual(backend.get_backend(), "numba")
+        for (x, y) in zip((a * b, a[0] * b[0], a.apply(b), a.exp()), expected):
+            np.testing.assert_allclose(x.coefficients, y.coefficients, atol=1e-12)
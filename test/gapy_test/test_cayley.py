@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+
+from gapy import ga2d, ga3d
+from gapy.cayley import CayleyTable, grade_bits
+
+class TestCayley(unittest.TestCase):
+    """
+    Check the Cayley tables reproduce the products defined by the basis_idx and basis_sign arrays.
+    """
+
+    def check_algebra(self, module):
+        rng = np.random.default_rng(42)
+        table = CayleyTable.from_basis(module.basis_idx, module.basis_sign, module.grade_mask)
+        n = len(module.grade_mask)
+        a = rng.normal(size=(6, n))
+        b = rng.normal(size=(6, n))
+
+        expected = np.array([(bb[module.basis_idx] * module.basis_sign) @ aa for (aa, bb) in zip(a, b)])
+        np.testing.assert_allclose(np.einsum("...i,...j,ijk->...k", a, b, table.tensor), expected)
+        np.testing.assert_allclose(np.einsum("...i,...j,ijk->...k", a, b, table.dense(np.float32)), expected, rtol=1e-5)
+        self.assertEqual(table.nterms, n * n)
+        self.assertEqual(table.pseudoscalar_square, -1)
+
+    def test_ga2d(self):
+        self.check_algebra(ga2d)
+
+    def test_ga3d(self):
+        self.check_algebra(ga3d)
+
+    def test_restricted(self):
+        table = ga3d.Multivector3D.cayley
+        vv = table.restrict(grade_bits([1]), grade_bits([1]))
+        rv = table.restrict(grade_bits([0, 2]), grade_bits([1]))
+        rr = table.restrict(grade_bits([0, 2]), grade_bits([0, 2]))
+        self.assertEqual(vv.nterms, 9)
+        self.assertEqual(rv.nterms, 12)
+        self.assertEqual(rr.nterms, 16)
+        self.assertEqual(vv.grades, grade_bits([0, 2]))
+        self.assertEqual(rv.grades, grade_bits([1, 3]))
+        self.assertEqual(rr.grades, grade_bits([0, 2]))
+        self.assertIs(table.restrict(grade_bits(range(4)), grade_bits(range(4))), table)
+
+        rng = np.random.default_rng(7)
+        a = rng.normal(size=(4, 8)) * (ga3d.grade_mask % 2 == 0)
+        b = rng.normal(size=(4, 8)) * (ga3d.grade_mask == 1)
+        np.testing.assert_allclose(np.einsum("...i,...j,ijk->...k", a, b, rv.tensor), np.einsum("...i,...j,ijk->...k", a, b, table.tensor))
+
+    def test_grade_propagation(self):
+        x = ga3d.vec(1, 2, 3)
+        R = ga3d.Multivector3D.make.rotor(0.3, ga3d.Bxy)
+        self.assertEqual(x.grades, grade_bits([1]))
+        self.assertEqual(R.grades, grade_bits([0, 2]))
+        self.assertEqual((x*x).grades, grade_bits([0, 2]))
+        self.assertEqual((R*x*R.reverse).grades, grade_bits([1, 3]))
+        self.assertEqual((x + R).grades, grade_bits([0, 1, 2]))
+        self.assertEqual(x.project(2).grades, 0)
+        self.assertEqual(ga3d.Multivector3D(1, 2, 3, 4, 5, 6, 7, 8).grades, grade_bits(range(4)))
+        self.assertEqual(R*x*R.reverse, x.rotate_rad(0.3, ga3d.Bxy))
@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+
+from gapy import classify
+from gapy.cayley import grade_bits
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestClassify(unittest.TestCase):
+    """
+    Check the batched grade classification and comparisons against the per-grade definitions.
+    """
+
+    def random(self, M, size, seed=0):
+        """
+        A batch of multivectors, each with a random subset of its grades (and some tiny coefficients) present.
+        """
+        rng = np.random.default_rng(seed)
+        g = M.cayley.grade_mask
+        keep = rng.integers(0, 2, size=(size, int(np.max(g)) + 1))
+        coefficients = rng.normal(size=(size, len(g))) * np.take_along_axis(keep, np.broadcast_to(g, (size, len(g))), 1)
+        coefficients[rng.uniform(size=coefficients.shape) < 0.1] = 1e-10
+        return M.Array(coefficients)
+
+    def test_present_grades(self):
+        for M in (Multivector3D, algebra(2), algebra(4, 1), algebra(3, 0, 1)):
+            a = self.random(M, 1000)
+            ngrades = int(np.max(M.cayley.grade_mask)) + 1
+            expected = sum(a.is_grade(g).astype(int) << g for g in range(ngrades))
+            np.testing.assert_array_equal(a.present_grades(), expected)
+            self.assertEqual(a[3].present_grades(), expected[3])
+
+            # grade is the single grade present, 0 for none and nan for mixed grades
+            count = sum(a.is_grade(g).astype(int) for g in range(ngrades))
+            single = np.argmax(np.stack([a.is_grade(g) for g in range(ngrades)], -1), -1)
+            np.testing.assert_array_equal(a.grade, np.where(count == 1, single, np.where(count == 0, 0, np.nan)))
+
+    def test_single(self):
+        self.assertIs(type(vec(1, 0, 0).grade), int)
+        self.assertEqual(vec(1, 0, 0).grade, 1)
+        self.assertEqual(Multivector3D.make.scalar(0.0).grade, 0)
+        self.assertTrue(np.isnan((1 + vec(1, 0, 0)).grade))
+        self.assertIn("grade=1]", str(vec(1, 0, 0)))
+
+    def test_tolerances(self):
+        a = Multivector3D.make.vector(1000, 0, 0) + Multivector3D.make.bivector(1e-3, 0, 0)
+        self.assertEqual(a.present_grades(), grade_bits([1, 2]))
+        self.assertEqual(a.present_grades(atol=1e-2), grade_bits([1]))
+        self.assertEqual(a.present_grades(rtol=1e-5), grade_bits([1]))
+        self.assertEqual(a.present_grades(rtol=1e-7), grade_bits([1, 2]))
+
+        b = self.random(Multivector3D, 100)
+        c = Multivector3D.Array(b.coefficients * (1 + 1e-7))
+        np.testing.assert_array_equal(b.isclose(c), np.all(np.isclose(b.coefficients, c.coefficients), -1))
+        np.testing.assert_array_equal(b.isclose(c, rtol=1e-9, atol=0), np.all(b.coefficients == 0, -1))
+        self.assertTrue(vec(1, 2, 3).isclose(vec(1, 2, 3 + 1e-9)))
+        np.testing.assert_array_equal(b.isclose(b[0]), np.all(np.isclose(b.coefficients, b[0].coefficients), -1))
+
+    def test_filter(self):
+        a = self.random(Multivector3D, 1000)
+        bits = a.present_grades()
+        self.assertEqual(classify.count_grades(a), {int(k): int(np.sum(bits == k)) for k in np.unique(bits)})
+
+        vectors = classify.filter_grades(a, grade_bits([1]))
+        self.assertEqual(len(vectors), np.sum(bits == 2))
+        self.assertEqual(vectors.grades, grade_bits([1]))
+        np.testing.assert_array_equal(vectors.present_grades(), 2)
+
+        even = classify.filter_grades(a, grade_bits([0, 2]), exact=False)
+        self.assertEqual(len(even), np.sum((bits & grade_bits([1, 3])) == 0))
+
+    def test_dedupe(self):
+        a = Multivector3D.Array(np.random.default_rng(1).normal(size=(50, 8)))
+        repeated = Multivector3D.Array(np.concatenate([a.coefficients, a.coefficients[::-1] * (1 + 1e-12)]))
+        self.assertEqual(len(classify.dedupe(repeated, atol=0)), 100)
+        distinct, index = classify.dedupe(repeated, return_index=True)
+        np.testing.assert_array_equal(index, np.arange(50))
+        np.testing.assert_array_equal(distinct.coefficients, a.coefficients)
+        self.assertEqual(len(classify.dedupe(Multivector3D.Array(np.array([[0.0] * 8, [-0.0] * 8])))), 1)
+
+        # values either side of a multiple of atol are still merged, and rtol scales with the values
+        b = Multivector3D.Array(np.array([[0.5e-9 - 1e-12] + [0.0] * 7, [0.5e-9 + 1e-12] + [0.0] * 7]))
+        self.assertEqual(len(classify.dedupe(b, atol=1e-9)), 1)
+        c = Multivector3D.Array(np.array([[1e6] + [0.0] * 7, [1e6 + 1] + [0.0] * 7]))
+        self.assertEqual(len(classify.dedupe(c)), 2)
+        self.assertEqual(len(classify.dedupe(c, rtol=1e-5)), 1)
+
+        # the same for (non-contiguous) complex coefficients
+        z = np.concatenate([a.coefficients, a.coefficients]) * (1 + 2j)
+        self.assertEqual(len(classify.dedupe(Multivector3D.Array(np.concatenate([z, z], -1)[:, :8]))), 50)
+        self.assertEqual(len(classify.dedupe(Multivector3D.Array(np.asfortranarray(z)))), 50)
+
+    def test_dedupe_repeated(self):
+        # many copies of a few rows, with noise well inside the tolerance, take time and memory linear in the rows
+        rng = np.random.default_rng(2)
+        a = rng.normal(size=(5, 8))
+        which = rng.integers(0, 5, size=200000)
+        repeated = Multivector3D.Array(a[which] + rng.uniform(-1e-12, 1e-12, size=(len(which), 8)))
+        distinct, index = classify.dedupe(repeated, atol=1e-9, return_index=True)
+        np.testing.assert_array_equal(index, np.sort([np.flatnonzero(which == k)[0] for k in range(5)]))
+        np.testing.assert_allclose(distinct.coefficients, a[which[index]], atol=1e-9)
+        self.assertEqual(len(distinct), 5)
@@ -0,0 +1,84 @@
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gapy import codegen, ga2d, ga3d
+from gapy.cayley import grade_bits
+
+class TestCodegen(unittest.TestCase):
+    """
+    Check the generated product functions agree with the Cayley tables they were generated from.
+    """
+
+    def product(self, table, a, b):
+        return np.einsum("...i,...j,ijk->...k", a, b, table.tensor)
+
+    def check_algebra(self, module, Multivector):
+        rng = np.random.default_rng(3)
+        table = Multivector.cayley
+        kernels = Multivector.kernels
+        ngrades = np.max(module.grade_mask) + 1
+        for ga in range(1, 1 << ngrades):
+            for gb in range(1, 1 << ngrades):
+                a = rng.normal(size=(3, len(module.grade_mask))) * ((ga >> module.grade_mask) & 1)
+                b = rng.normal(size=(3, len(module.grade_mask))) * ((gb >> module.grade_mask) & 1)
+                np.testing.assert_allclose(kernels.gp(ga, gb)(a, b), self.product(table, a, b))
+                np.testing.assert_allclose(kernels.gp(ga, gb)(a[0], b[0]), self.product(table, a[0], b[0]))
+                np.testing.assert_allclose(kernels.outer(ga, gb)(a, b), self.product(table.outer, a, b))
+                np.testing.assert_allclose(kernels.inner(ga, gb)(a[0], b), self.product(table.inner, a[0], b))
+                for kind in ("left_contraction", "right_contraction", "scalar_product", "commutator", "regressive"):
+                    np.testing.assert_allclose(getattr(kernels, kind)(ga, gb)(a, b), self.product(getattr(table, kind), a, b))
+                sandwich = self.product(table, self.product(table, a, b), module.basis_sign[0] * a)
+                np.testing.assert_allclose(kernels.sandwich(ga, gb)(a, b), sandwich, atol=1e-12)
+
+    def test_ga2d(self):
+        self.check_algebra(ga2d, ga2d.Multivector2D)
+
+    def test_ga3d(self):
+        self.check_algebra(ga3d, ga3d.Multivector3D)
+
+    def test_products(self):
+        x = ga3d.vec(1, 2, 3)
+        y = ga3d.vec(-1, 0.5, 2)
+        kernels = ga3d.Multivector3D.kernels
+        np.testing.assert_allclose(kernels.outer(x.grades, y.grades)(x.coefficients, y.coefficients), (x*y).project(2).coefficients)
+        np.testing.assert_allclose(kernels.inner(x.grades, y.grades)(x.coefficients, y.coefficients), (x*y).project(0).coefficients)
+
+    def test_sandwich_cancellation(self):
+        rotor = grade_bits([0, 2])
+        vector = grade_bits([1])
+        kernel = ga3d.Multivector3D.kernels.sandwich(rotor, vector)
+        self.assertEqual(kernel.grades, vector)
+        self.assertNotIn("r7", kernel.source)
+
+    def test_source(self):
+        kernels = ga3d.Multivector3D.kernels
+        source = kernels.source("gp", grade_bits([1]), grade_bits([1]))
+        self.assertIn("r0 = a1*b1 + a2*b2 + a3*b3", source)
+        f = io.StringIO()
+        kernels.dump(f)
+        self.assertIn("def sandwich_15_15(a, b, out=None):", f.getvalue())
+        self.assertIn("def outer_15_15(a, b, out=None):", f.getvalue())
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache:
+            codegen.set_cache_dir(cache)
+            try:
+                first = codegen.Kernels("Cached", ga2d.Multivector2D.cayley, ga2d.basis_sign[0]).gp(7, 7)
+                self.assertEqual(len(os.listdir(cache)), 1)
+                second = codegen.Kernels("Cached", ga2d.Multivector2D.cayley, ga2d.basis_sign[0]).gp(7, 7)
+
+                # a truncated or unparsable file is generated again, rather than an error
+                (name,) = os.listdir(cache)
+                for contents in ("# grad", first.source[:-20], "# grades=x\n" + first.source):
+                    with open(os.path.join(cache, name), "w") as f:
+                        f.write(contents)
+                    third = codegen.Kernels("Cached", ga2d.Multivector2D.cayley, ga2d.basis_sign[0]).gp(7, 7)
+                    self.assertEqual(third.source, first.source)
+                self.assertEqual(os.listdir(cache), [name])
+            finally:
+                codegen.set_cache_dir(None)
+            self.assertEqual(first.source, second.source)
+            self.assertEqual(first.grades, second.grades)
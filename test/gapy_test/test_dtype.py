@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestDtype(unittest.TestCase):
+    """
+    Check the coefficient dtype is chosen sensibly and kept through every operation.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(18)
+        self.x = rng.normal(size=(3, 20))
+        self.angles = rng.uniform(-3, 3, 20)
+
+    def test_default(self):
+        self.assertEqual(vec(1, 0, 0).dtype, np.float64)
+        self.assertEqual(Multivector3D.make.vector(np.arange(3), 0, 0).dtype, np.float64)
+        self.assertEqual(Multivector3D(1, 0, 0, 0, 0, 0, 0, 0).dtype, np.float64)
+        self.assertEqual(Multivector3D.make.scalar(1j).dtype, np.complex128)
+
+        M = algebra(3, dtype=np.float32)
+        self.assertIs(M, algebra(3, 0, 0, np.dtype("float32")))
+        self.assertIsNot(M, algebra(3))
+        self.assertEqual(M.default_dtype, np.float32)
+        self.assertEqual(M.make.vector(1, 2, 3).dtype, np.float32)
+        self.assertEqual(M.make.vector(np.ones(3, dtype=np.float64), 0, 0).dtype, np.float64)
+
+    def test_integers(self):
+        M = algebra(3, dtype=np.float32)
+        for N in (Multivector3D, M):
+            self.assertEqual(N.make.grade(1, np.arange(6).reshape(2, 3)).dtype, N.default_dtype)
+            a = N.Array(np.arange(16).reshape(2, 8))
+            self.assertEqual(a.dtype, N.default_dtype)
+            self.assertEqual((a * a).dtype, N.default_dtype)
+        # floating point arrays keep their precision, and are not copied
+        x = np.ones((2, 8), dtype=np.float32)
+        self.assertIs(Multivector3D.Array(x).coefficients, x)
+        self.assertEqual(M.make.grade(1, np.ones(3)).dtype, np.float64)
+
+    def test_float32(self):
+        a = Multivector3D.make.vector(*self.x.astype(np.float32))
+        R = Multivector3D.make.rotor(self.angles.astype(np.float32), Bxy)
+        B = Multivector3D.make.bivector(*self.x.astype(np.float32))
+        self.assertEqual(R.dtype, np.float32)
+        for result in (a * a, R.apply(a), a.reverse, a.involute, a.conjugate, B.exp(), a.exp(), R.log(), R.sqrt(),
+                       a.inverse(), a * 2.5, 2.5 * a, a / 2, 1 + a, 1 - a, a + a, -a, np.exp(a)):
+            self.assertEqual(result.dtype, np.float32)
+
+        # and agree with the float64 results to float32 precision
+        a64, R64 = a.astype(np.float64), R.astype(np.float64)
+        self.assertEqual(a64.dtype, np.float64)
+        np.testing.assert_allclose(R.apply(a).coefficients, R64.apply(a64).coefficients, atol=1e-5)
+        np.testing.assert_allclose(B.exp().coefficients, B.astype(np.float64).exp().coefficients, atol=1e-5)
+
+    def test_float32_general(self):
+        M = algebra(4, 1)
+        v = M.make.vector(*(0.3 * np.ones((5, 4), dtype=np.float32)))
+        for result in (v * v, v.exp(), v.inverse(), (1 + v).sqrt(), (1 + v).log()):
+            self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(((1 + v).sqrt() * (1 + v).sqrt()).coefficients, (1 + v).coefficients, atol=1e-5)
+
+    def test_complex(self):
+        a = Multivector3D.make.vector(*(1j * self.x))
+        self.assertEqual(a.dtype, np.complex128)
+        self.assertEqual((a * a).dtype, np.complex128)
+        np.testing.assert_allclose((a * a).scalar, -np.sum(self.x ** 2, 0))
+
+        # exp(i v) = cos|v| + i sin|v| v/|v| for vectors v squaring to a positive scalar
+        v = Multivector3D.make.vector(*self.x)
+        r = np.sqrt(np.sum(self.x ** 2, 0))
+        expected = Multivector3D.make.scalar(np.cos(r) + 0j) + (1j * np.sin(r) / r) * v
+        self.assertEqual(a.exp(), expected)
+
+        b = a + Multivector3D.make.bivector(0.3, 0.2, 0.1)
+        self.assertEqual(b.sqrt() * b.sqrt(), b)
+        self.assertEqual(b.log().exp(), b)
+        self.assertEqual(b * b.inverse(), Multivector3D.make.scalar(np.ones(20)))
+
+        c = Multivector3D.make.vector(*(1j * self.x).astype(np.complex64))
+        for result in (c * c, c.exp(), c.inverse(), c.reverse):
+            self.assertEqual(result.dtype, np.complex64)
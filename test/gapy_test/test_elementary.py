@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+
+from gapy import elementary, rotors
+from gapy.core import algebra
+from gapy.ga2d import Multivector2D
+from gapy.ga3d import *
+
+class TestElementary(unittest.TestCase):
+    """
+    Check exp, log, sqrt and inverse against each other and against the general numerical methods.
+    """
+
+    algebras = [Multivector2D, Multivector3D, algebra(1, 1), algebra(2, 0, 1), algebra(3, 0, 1), algebra(4, 1)]
+
+    def random(self, M, scale=0.7, size=(6,)):
+        rng = np.random.default_rng(21)
+        return M.Array(rng.normal(size=size + (len(M.cayley.grade_mask),)) * scale)
+
+    def assertClose(self, a, b, atol=1e-10):
+        np.testing.assert_allclose(a.coefficients, b.coefficients, atol=atol)
+
+    def test_inverse(self):
+        for M in self.algebras:
+            a = self.random(M)
+            one = M.make.scalar(np.ones(6))
+            self.assertClose(a * a.inverse(), one)
+            self.assertClose(a.inverse() * a, one)
+            self.assertClose(a / a, one)
+
+    def test_division(self):
+        a = vec(1, 2, 3)
+        b = vec(0, 1, 1) + bivec(1, 0, 0)  # mixed grade
+        self.assertEqual((a / b) * b, a)
+
+    def test_exp(self):
+        for M in self.algebras:
+            a = self.random(M)
+            self.assertClose(a.exp(), elementary._exp_series(a))
+            self.assertClose(a.exp() * (-a).exp(), M.make.scalar(np.ones(6)))
+            self.assertClose(a[2].exp(), a.exp()[2])
+
+    def test_log(self):
+        for M in self.algebras:
+            R = (self.random(M) * 0.3).exp()
+            self.assertClose(R.log().exp(), R)
+
+    def test_sqrt(self):
+        for M in self.algebras:
+            R = (self.random(M) * 0.3).exp()
+            self.assertClose(R.sqrt() * R.sqrt(), R)
+
+    def test_no_square_root(self):
+        # -1 + 0.1 e1 is a matrix with two negative eigenvalues, so has no real square root or logarithm
+        a = Multivector2D.Array(np.array([[-1, 0.1, 0, 0], [2, 0.3, 0.1, 0.2]]))
+        with self.assertWarns(RuntimeWarning):
+            r = a.sqrt()
+        self.assertTrue(np.all(np.isnan(r.coefficients[0])))
+        self.assertClose(r[1] * r[1], a[1])
+        with self.assertWarns(RuntimeWarning):
+            l = a.log()
+        self.assertTrue(np.all(np.isnan(l.coefficients[0])))
+        self.assertClose(l[1].exp(), a[1])
+
+    def test_negative_scalars(self):
+        for M in (Multivector3D, algebra(4)):
+            a = M.make.scalar(np.array([-4.0, 0.0, 4.0]))
+            with self.assertWarns(RuntimeWarning):
+                r = a.sqrt()
+            self.assertTrue(np.all(np.isnan(r.coefficients[0])))
+            self.assertClose(r[1:], M.make.scalar(np.array([0.0, 2.0])))
+            with self.assertWarns(RuntimeWarning):
+                l = a.log()
+            self.assertTrue(np.all(np.isnan(l.coefficients[:2])))
+            self.assertClose(l[2], M.make.scalar(np.log(4.0)))
+
+        # in 2D the unit bivector is the only square root of -1, as for the complex numbers
+        a = Multivector2D.make.scalar(np.array([-4.0, -1.0]))
+        self.assertClose(a.sqrt() * a.sqrt(), a)
+        self.assertClose(a.log(), Multivector2D.make.scalar(np.log([4.0, 1.0])) + Multivector2D.make.bivector(np.pi))
+
+    def test_rotor_minus_one(self):
+        # -1 is the rotation by 2 pi in every plane, so has no logarithm, and slerp to -R along the long way is nan
+        R = Multivector3D.make.rotor(0.3, Bxy)
+        with self.assertWarns(RuntimeWarning):
+            self.assertTrue(np.all(np.isnan(Multivector3D.make.scalar(-1.0).log().coefficients)))
+        with self.assertWarns(RuntimeWarning):
+            S = rotors.slerp(R, -R, np.array([0.0, 1.0]), shortest=False)
+        self.assertTrue(np.all(np.isnan(S.coefficients)))
+        self.assertClose(rotors.slerp(R, -R, np.array([0.0, 1.0])), Multivector3D.Array([R, R]))
+
+    def test_rotor_log(self):
+        angles = np.linspace(-3, 3, 13)
+        plane = (Bxy + 2*Byz).unit
+        R = Multivector3D.make.rotor(angles, plane)
+        B = R.log()
+        self.assertEqual(B.grades, R.grades)
+        self.assertClose(B, -0.5 * angles * plane)
+        self.assertClose(R.sqrt(), Multivector3D.make.rotor(angles / 2, plane))
+        self.assertEqual(R.sqrt().grades, R.grades)
+
+    def test_exp_grades(self):
+        self.assertEqual((0.5 * Bxy).exp().grades, Multivector3D.make.rotor(1, Bxy).grades)
+        self.assertEqual((Multivector2D.make.bivector(0.5)).exp(), Multivector2D.make.scalar(np.cos(0.5)) + Multivector2D.make.bivector(np.sin(0.5)))
@@ -107,3 +107,9 @@ class Test2D(unittest.TestCase):
         self.assertEqual(a.rotate_deg( 45, -B), vec(np.sqrt(0.5), 0))
         self.assertEqual(a.rotate_deg(-45,  B), vec(np.sqrt(0.5), 0))
 
+
+    def test_to_matrix(self):
+        B = bivec(1)
+        R = Multivector2D.make.rotor(np.pi/6, B)
+        np.testing.assert_allclose(R.to_matrix(), [[np.cos(np.pi/6), -np.sin(np.pi/6)], [np.sin(np.pi/6), np.cos(np.pi/6)]])
+        self.assertEqual(R.apply(vec(1, 2)), vec(1, 2).rotate_rad(np.pi/6, B))
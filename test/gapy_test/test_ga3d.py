@@ -118,3 +118,27 @@ class Test3D(unittest.TestCase):
         self.assertEqual(a.rotate_deg(-45,  B), vec(np.sqrt(0.5), 0, 1.0))
 
 
+
+    def test_apply(self):
+        R = Multivector3D.make.rotor(0.7, bivec(1, 2, 3))
+        a = vec(0.5, -1, 2)
+        B = bivec(1, 0, -1)
+        self.assertEqual(R.apply(a), R*a*R.reverse)
+        self.assertEqual(R.apply(B), R*B*R.reverse)
+        self.assertEqual(R.apply(a).grades, a.grades)
+
+    def test_to_matrix(self):
+        R = Multivector3D.make.rotor(0.7, bivec(1, 2, 3))
+        M = R.to_matrix()
+        np.testing.assert_allclose(M @ M.T, np.eye(3), atol=1e-12)
+        np.testing.assert_allclose(np.linalg.det(M), 1.0)
+        a = vec(0.5, -1, 2)
+        np.testing.assert_allclose(M @ a.vector, R.apply(a).vector)
+        np.testing.assert_allclose(Multivector3D.make.rotor(np.pi/2, Bxy).to_matrix(), [[0, -1, 0], [1, 0, 0], [0, 0, 1]], atol=1e-12)
+
+    def test_lightweight(self):
+        a = vec(1, 2, 3)
+        self.assertFalse(hasattr(a, "__dict__"))
+        self.assertFalse(hasattr(Multivector3D.make.vector(*np.eye(3)), "__dict__"))
+        self.assertTrue(np.shares_memory(a.vector, a.coefficients))
+        self.assertEqual(a.project(4), Multivector3D.make.scalar(0))
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import unittest
+
+class TestImport(unittest.TestCase):
+    """
+    Check importing gapy is quick: no optional dependencies are imported and the algebras are only built when used.
+    """
+
+    # The time spent in gapy's own modules (not numpy's or the standard library's) when imported in a new interpreter.
+    budget_seconds = 0.25
+
+    def run_python(self, code: str, *options: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True, env=os.environ, check=True)
+
+    def test_import_time(self):
+        result = self.run_python("import gapy.ga2d, gapy.ga3d", "-X", "importtime")
+        seconds = 0.0
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and fields[-1].strip().startswith("gapy"):
+                seconds += int(fields[0].split(":")[1]) * 1e-6  # the self time, in microseconds
+        self.assertGreater(seconds, 0)
+        self.assertLess(seconds, self.budget_seconds)
+
+    def test_lazy(self):
+        code = "\n".join([
+            "import sys, gapy.ga2d, gapy.ga3d",
+            "print(sorted(m for m in ('matplotlib', 'numba', 'numpy.ma') if m in sys.modules))",
+            "print('Multivector3D' in vars(gapy.ga3d), 'Multivector2D' in vars(gapy.ga2d))",
+            "from gapy.ga3d import *",
+            "print('Multivector3D' in vars(gapy.ga3d), ex * ey == Bxy, gapy.ga2d.vec(1, 2) == gapy.ga2d.Multivector2D.make.vector(1, 2))",
+        ])
+        lines = self.run_python(code).stdout.splitlines()
+        self.assertEqual(lines, ["[]", "False False", "True True True"])
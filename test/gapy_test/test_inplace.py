@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+
+from gapy.core import gp, sandwich, add, sub, neg, scale
+from gapy.ga3d import *
+
+class TestInPlace(unittest.TestCase):
+    """
+    Check the in-place operators and the out= functional forms agree with the allocating operators.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.a = Multivector3D.Array(rng.normal(size=(5, 8)))
+        self.b = Multivector3D.Array(rng.normal(size=(5, 8)))
+        self.R = Multivector3D.make.rotor(0.4, bivec(1.0, 2.0, 3.0))
+
+    def test_operators(self):
+        for (op, iop) in [(lambda x, y: x + y, "__iadd__"), (lambda x, y: x - y, "__isub__"), (lambda x, y: x * y, "__imul__")]:
+            a = Multivector3D.Array(self.a.coefficients.copy())
+            buffer = a.coefficients
+            expected = op(a, self.b)
+            result = getattr(a, iop)(self.b)
+            self.assertIs(result, a)
+            self.assertIs(result.coefficients, buffer)
+            self.assertEqual(result, expected)
+
+    def test_scalar_multiply(self):
+        a = vec(1.0, 2.0, 3.0)
+        a *= 2
+        self.assertEqual(a, vec(2, 4, 6))
+        b = Multivector3D.Array(self.a.coefficients.copy())
+        b *= np.arange(5)
+        self.assertEqual(b[3], 3 * self.a[3])
+
+    def test_fallback(self):
+        # integer coefficients cannot hold the float result, and a single multivector cannot hold a batch
+        a = vec(1, 0, 0)
+        a += vec(0.5, 0, 0)
+        self.assertEqual(a, vec(1.5, 0, 0))
+        x = vec(1.0, 0.0, 0.0)
+        x += self.a
+        self.assertIsInstance(x, Multivector3D.Array)
+
+        # the constants and read-only coefficients are never written, nor is whatever astype copied from
+        x = ex
+        x += ey
+        self.assertEqual(ex, vec(1, 0, 0))
+        self.assertEqual(x, vec(1, 1, 0))
+        b = self.a.astype(self.a.dtype)
+        b += self.b
+        self.assertEqual(b, self.a + self.b)
+        self.assertFalse(np.shares_memory(b.coefficients, self.a.coefficients))
+        c = Multivector3D.Array(self.a.coefficients.copy())
+        c.coefficients.flags.writeable = False
+        c += self.b
+        self.assertEqual(c, self.a + self.b)
+        with self.assertRaises(TypeError):
+            c += 1
+
+    def test_out(self):
+        out = Multivector3D.Array(np.empty((5, 8)))
+        self.assertIs(gp(self.a, self.b, out=out), out)
+        self.assertEqual(out, self.a * self.b)
+        self.assertEqual(add(self.a, self.b, out=out), self.a + self.b)
+        self.assertEqual(sub(self.a, self.b, out=out), self.a - self.b)
+        self.assertEqual(neg(self.a, out=out), -self.a)
+        self.assertEqual(scale(self.a, 3.0, out=out), 3 * self.a)
+        self.assertEqual(sandwich(self.R, self.a, out=out), self.R * self.a * self.R.reverse)
+        self.assertEqual(gp(self.a, self.b), self.a * self.b)
+
+    def test_aliasing(self):
+        x = vec(1.0, 2.0, 3.0)
+        expected = self.R * x * self.R.reverse
+        sandwich(self.R, x, out=x)
+        self.assertEqual(x, expected)
+        self.assertEqual(x.grades, vec(1, 0, 0).grades)
+
+        a = Multivector3D.Array(self.a.coefficients.copy())
+        expected = self.b * a
+        gp(self.b, a, out=a)
+        self.assertEqual(a, expected)
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+
+from gapy import instrument
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestInstrument(unittest.TestCase):
+    """
+    Check the operation counters count what was called, and leave the types untouched when not collecting.
+    """
+
+    def test_counts(self):
+        M = Multivector3D
+        a = M.make.vector(*np.ones((3, 100)))
+        with instrument.Counters(M) as counters:
+            for _ in range(2):
+                a * a
+                a[0].rotate_rad(0.3, Bxy)
+                a.grade
+                M(1, 0, 0, 0, 0, 0, 0, 0)
+
+        rows = {row["operation"]: row for row in counters.rows()}
+        self.assertEqual(rows["__mul__"]["calls"], 2 + 2)  # and a scaling in each make.rotor
+        self.assertEqual(rows["__mul__"]["elements"], 200 + 2)
+        self.assertEqual(rows["rotate_rad"]["calls"], 2)
+        self.assertEqual(rows["make.rotor"]["calls"], 2)
+        self.assertEqual(rows["grade"]["elements"], 200 + 2)  # plus the check in unit
+        self.assertEqual(rows["__init__"]["calls"], 2)
+        self.assertEqual(rows["__getitem__"]["calls"], 2)
+        self.assertTrue(all(row["type"] == "Multivector3D" and row["dtype"] == "float64" for row in rows.values()))
+        self.assertGreater(rows["rotate_rad"]["seconds"], rows["make.rotor"]["seconds"])
+        self.assertIn("rotate_rad", counters.report())
+
+        # nothing is counted once stopped
+        a * a
+        self.assertEqual({row["operation"]: row for row in counters.rows()}["__mul__"]["calls"], 4)
+
+    def test_restored(self):
+        M = algebra(2)
+        originals = {name: vars(M)[name] for name in ("__mul__", "grade", "exp")}
+        rotor = vars(M.make)["rotor"]
+        with instrument.Counters():
+            self.assertIsNot(vars(M)["__mul__"], originals["__mul__"])
+            self.assertIsNot(vars(M.make)["rotor"], rotor)
+        for (name, attr) in originals.items():
+            self.assertIs(vars(M)[name], attr)
+        self.assertIs(vars(M.make)["rotor"], rotor)
+
+    def test_nested(self):
+        M, N = algebra(3), algebra(2)
+        with instrument.Counters(M) as outer:
+            with instrument.Counters() as inner:
+                M.make.scalar(1.0) * M.make.scalar(2.0)
+                N.make.scalar(1.0) * N.make.scalar(2.0)
+            self.assertIsNot(vars(M)["__mul__"].__wrapped__, None)
+            M.make.scalar(1.0) * M.make.scalar(2.0)
+        self.assertEqual(sorted(row["type"] for row in inner.rows() if row["operation"] == "__mul__"), sorted([M.__name__, N.__name__]))
+        self.assertEqual([row["calls"] for row in outer.rows() if row["operation"] == "__mul__"], [2])
+        self.assertFalse(hasattr(vars(M)["__mul__"], "__wrapped__"))
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+
+from gapy import integrators
+from gapy.ga3d import *
+
+class TestIntegrators(unittest.TestCase):
+    """
+    Check the integrators conserve what they should and the force evaluations agree with each other.
+    """
+
+    def test_forces(self):
+        rng = np.random.default_rng(0)
+        x = Multivector3D.make.vector(*rng.uniform(0, 10, (3, 300)))
+        m = rng.uniform(1, 2, 300)
+        direct = integrators.direct_accelerations(x, m, softening=0.1, block=64)
+        self.assertEqual(direct.grades, 1 << 1)
+        cells = integrators.cell_list_accelerations(x, m, cutoff=50, softening=0.1)
+        np.testing.assert_allclose(cells.vector, direct.vector, atol=1e-12)
+
+        # the cutoff only counts the close pairs
+        p = x.vector
+        d = p[np.newaxis] - p[:, np.newaxis]
+        r2 = np.sum(d * d, -1)
+        close = (r2 < 4) & (r2 > 0)
+        expected = np.sum(m[np.newaxis, :, np.newaxis] * d / ((r2 + 0.01) ** 1.5)[..., np.newaxis] * close[..., np.newaxis], 1)
+        np.testing.assert_allclose(integrators.cell_list_accelerations(x, m, cutoff=2, softening=0.1).vector, expected, atol=1e-12)
+
+    def test_sparse_cells(self):
+        # bodies spread over a domain far bigger than a dense grid of cells could index, in close pairs
+        rng = np.random.default_rng(1)
+        centres = rng.uniform(0, 1e7, (5, 3))
+        p = np.concatenate([centres, centres + 0.5])
+        m = np.ones(10)
+        x = Multivector3D.make.vector(*p.T)
+        cells = integrators.cell_list_accelerations(x, m, cutoff=1, softening=0.1)
+        d = p[5:] - p[:5]
+        pair = d / (np.sum(d * d, -1) + 0.01)[:, np.newaxis] ** 1.5
+        np.testing.assert_allclose(cells.vector, np.concatenate([pair, -pair]), rtol=1e-9)
+
+    def test_leapfrog(self):
+        # a batch of Kepler orbits, energy is conserved to second order and does not drift
+        e = np.linspace(0, 0.5, 4)
+        x = Multivector3D.make.vector(1 - e, 0, 0)
+        v = Multivector3D.make.vector(0, np.sqrt((1 + e) / (1 - e)), 0)
+        accel = lambda x: x * -(np.sum(x.vector ** 2, -1) ** -1.5)
+        energy = lambda x, v: 0.5 * np.sum(v.vector ** 2, -1) - 1 / np.sqrt(np.sum(x.vector ** 2, -1))
+        E0 = energy(x, v)
+        a = None
+        for _ in range(2000):
+            x, v, a = integrators.leapfrog(x, v, accel, 1e-3, a)
+        np.testing.assert_allclose(energy(x, v), E0, atol=1e-5)
+
+    def test_rk4(self):
+        # harmonic oscillator, x'' = -x
+        x, v = vec(1, 0, 0), vec(0, 1, 0)
+        for _ in range(100):
+            x, v = integrators.rk4((x, v), lambda y: (y[1], -y[0]), 0.01)
+        self.assertEqual(x, vec(np.cos(1), np.sin(1), 0))
+        self.assertEqual(integrators.rk4(vec(1, 0, 0), lambda y: y, 0.01), vec(np.exp(0.01), 0, 0))
+
+    def test_rotor_step(self):
+        R = Multivector3D.make.rotor(np.zeros(3), Bxy)
+        omega = Multivector3D.make.bivector([0.5, 1, 2], 0, 0)
+        for _ in range(1000):
+            R = integrators.rotor_step(R, omega, 0.01)
+        self.assertEqual(R, Multivector3D.make.rotor(10 * np.array([0.5, 1, 2]), Bxy))
+        np.testing.assert_allclose((R * R.reverse).scalar, 1, atol=1e-13)
+
+    def test_rigid_body(self):
+        # torque free: the space frame angular momentum and the kinetic energy are conserved
+        rng = np.random.default_rng(1)
+        R = Multivector3D.make.rotor(np.zeros(5), Bxy)
+        L = Multivector3D.make.bivector(*rng.normal(size=(3, 5)))
+        inertia = np.array([1.0, 2.0, 3.0])
+        kinetic = lambda L: np.sum(L.coefficients[:, 4:7] ** 2 / inertia[::-1], -1)
+        L_space, T = R * L * R.reverse, kinetic(L)
+        for _ in range(1000):
+            R, L = integrators.rigid_body_step(R, L, inertia, 0.01)
+        np.testing.assert_allclose((R * L * R.reverse).coefficients, L_space.coefficients, atol=1e-4)
+        np.testing.assert_allclose(kinetic(L), T, rtol=1e-6)
+        np.testing.assert_allclose((R * R.reverse).scalar, 1, atol=1e-13)
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+
+from gapy.ga3d import *
+
+class TestInterop(unittest.TestCase):
+    """
+    Check multivectors share memory with numpy arrays where they should and numpy ufuncs act on them sensibly.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(17)
+        self.coefficients = rng.normal(size=(10, 8))
+        self.a = Multivector3D.wrap(self.coefficients)
+
+    def test_wrap(self):
+        self.assertIsInstance(self.a, Multivector3D.Array)
+        self.assertIs(self.a.coefficients, self.coefficients)
+        self.assertIs(np.asarray(self.a), self.coefficients)
+        self.assertEqual(np.asarray(self.a, dtype=np.float32).dtype, np.float32)
+        self.assertFalse(np.shares_memory(np.array(self.a), self.coefficients))
+        self.assertEqual(Multivector3D.wrap(np.zeros(8), grades=1 << 1).grades, 1 << 1)
+
+    def test_grade_view(self):
+        v = Multivector3D.wrap(np.zeros((10, 8)), grades=0)
+        points = np.random.default_rng(2).normal(size=(10, 3))
+        v.grade_view(1)[...] = points
+        self.assertEqual(v.grades, 1 << 1)
+        self.assertTrue(np.shares_memory(v.grade_view(1), v.coefficients))
+        self.assertEqual(v, Multivector3D.make.grade(1, points))
+        M = Multivector3D.make.rotor(np.pi / 2, Bxy).to_matrix()
+        np.testing.assert_allclose(v.rotate_deg(90, Bxy).vector, points @ M.T)
+        np.testing.assert_array_equal(self.a.grade_view(2), self.coefficients[:, 4:7])
+
+    def test_writable_views(self):
+        # writes through np.asarray and .vector are seen by later products
+        p = Multivector3D.make.grade(1, np.ones((5, 3)))
+        np.asarray(p)[:, 1:4] = 0
+        np.asarray(p)[:, 4] = 1
+        self.assertEqual(p * p, Multivector3D.make.scalar(-np.ones(5)))
+
+        R = Multivector3D.make.rotor(np.zeros(5), Bxy)
+        R.vector[...] = [0, 0, 1]
+        self.assertEqual(R * R, Multivector3D.make.scalar(2 * np.ones(5)) + 2 * Multivector3D.make.vector(0, 0, 1))
+
+    def test_make_grade(self):
+        points = np.arange(12.0).reshape(4, 3)
+        self.assertEqual(Multivector3D.make.grade(1, points), Multivector3D.make.vector(*points.T))
+        self.assertEqual(Multivector3D.make.grade(2, [1, 2, 3]), bivec(1, 2, 3))
+
+    def test_ufuncs(self):
+        a, s = self.a, np.linspace(0, 1, 10)
+        self.assertEqual(s * a, a * s)
+        self.assertEqual(np.multiply(a, s), a * s)
+        self.assertEqual(np.multiply(a, a), a * a)
+        self.assertEqual(s + a, Multivector3D.make.scalar(s) + a)
+        self.assertEqual(a - s, a - Multivector3D.make.scalar(s))
+        self.assertEqual(-a, np.negative(a))
+        self.assertEqual(+a, a)
+        self.assertEqual(np.positive(a), a)
+        self.assertFalse(np.shares_memory((+a).coefficients, a.coefficients))
+        self.assertEqual(np.exp(0.5 * a), (0.5 * a).exp())
+        self.assertEqual(np.reciprocal(a), a.inverse())
+        self.assertEqual(1 / a, a.inverse())
+        self.assertEqual(np.float64(2) * a, 2 * a)
+        out = Multivector3D.wrap(np.zeros((10, 8)))
+        self.assertIs(np.add(a, a, out=out), out)
+        self.assertEqual(out, 2 * a)
+        with self.assertRaises(TypeError):
+            np.sin(a)
@@ -0,0 +1,101 @@
+import unittest
+import numpy as np
+
+from gapy import lazy
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestLazy(unittest.TestCase):
+    """
+    Check lazily evaluated expressions agree with evaluating them eagerly.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.a = Multivector3D.Array(rng.normal(size=(7, 8)))
+        self.b = Multivector3D.Array(rng.normal(size=(7, 8)))
+        self.t = rng.normal(size=7)
+
+    def test_expressions(self):
+        a, b, t = self.a, self.b, self.t
+        expressions = [
+            lambda a, b, t: a*b,
+            lambda a, b, t: 1 + a*b*a - 2*b,
+            lambda a, b, t: t*a + b*t - a,
+            lambda a, b, t: (a*b).project(2) * a.reverse,
+            lambda a, b, t: -(a.involute * b.conjugate),
+            lambda a, b, t: a.apply(b) + b.apply(a),
+        ]
+        for f in expressions:
+            self.assertEqual(lazy.fuse(f)(a, b, t), f(a, b, t))
+            self.assertEqual(lazy.fuse(f)(a[0], b[0], 0.5), f(a[0], b[0], 0.5))
+
+    def test_mixed(self):
+        a, b = self.a, self.b
+        self.assertEqual((a * b.lazy).evaluate(), a * b)
+        self.assertEqual((a.lazy + b).evaluate(), a + b)
+        self.assertEqual((b - a.lazy).evaluate(), b - a)
+        self.assertEqual((self.t * a.lazy).evaluate(), self.t * a)
+
+    def test_sandwich(self):
+        R = Multivector3D.make.rotor(self.t, Bxy + Byz)
+        v = vec(1, 2, 3)
+        x = R.lazy * v * R.lazy.reverse
+        self.assertEqual(x.evaluate(), R.apply(v))
+        self.assertEqual(x.evaluate().grades, R.apply(v).grades)
+        self.assertEqual(x.kernel()[0].grades, 1 << 1)
+
+    def test_cse(self):
+        a, b = self.a.lazy, self.b.lazy
+        source = ((a*b) * (a*b) + (a*b)).source
+        self.assertEqual(source.count("t2_0 ="), 1)
+        self.assertEqual(len([line for line in source.splitlines() if "_split(" in line]), 2)
+
+    def test_grades(self):
+        x = vec(1, 2, 3).lazy * vec(3, 2, 1)
+        self.assertEqual(x.grades, 0b101)
+        self.assertEqual(x.project(1).grades, 0)
+        self.assertEqual(x.project(1).evaluate(), Multivector3D.make.scalar(0))
+
+    def test_cached(self):
+        f = lazy.fuse(lambda a, b: a*b + b)
+        f(self.a, self.b)
+        kernel, _ = (self.a.lazy * self.b + self.b).kernel()
+        kernel2, _ = (self.b.lazy * self.a + self.a).kernel()
+        self.assertIs(kernel, kernel2)
+
+    def test_numbers(self):
+        step = lazy.fuse(lambda a, b, dt: a + dt * a * b)
+        kernels = set()
+        for dt in np.linspace(0.1, 0.9, 9):
+            self.assertEqual(step(self.a, self.b, float(dt)), self.a + float(dt) * self.a * self.b)
+            kernels.add((self.a.lazy + float(dt) * self.a.lazy * self.b).kernel()[0])
+        self.assertEqual(len(kernels), 1)
+        a32 = self.a.astype(np.float32)
+        self.assertEqual(step(a32, a32, 0.5).dtype, np.float32)
+
+    def test_cache_size(self):
+        previous = lazy._max_compiled
+        lazy._max_compiled = 4
+        try:
+            for n in range(10):
+                e = self.a.lazy
+                for _ in range(n):
+                    e = e * self.b
+                e.kernel()
+            self.assertEqual(len(lazy._compiled), 4)
+        finally:
+            lazy._max_compiled = previous
+
+    def test_out(self):
+        a, b = self.a, self.b
+        expected = a*b + a
+        result = (a.lazy*b + a).evaluate(out=a)
+        self.assertIs(result, a)
+        self.assertEqual(a, expected)
+
+    def test_algebra(self):
+        M = algebra(3, 0, 1)
+        rng = np.random.default_rng(9)
+        a, b = (M.Array(rng.normal(size=(4, 16))) for _ in range(2))
+        self.assertEqual(lazy.fuse(lambda a, b: a*b*a.reverse - b)(a, b), a*b*a.reverse - b)
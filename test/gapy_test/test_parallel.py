@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import unittest
+import numpy as np
+
+from gapy import parallel
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestParallel(unittest.TestCase):
+    """
+    Check the chunked parallel evaluation is bit-identical to the serial path, for both kinds of executor.
+    """
+
+    def setUp(self):
+        self.previous = parallel.settings()
+        rng = np.random.default_rng(8)
+        self.a = Multivector3D.Array(rng.normal(size=(1003, 8)))
+        self.b = Multivector3D.Array(rng.normal(size=(1003, 8)))
+        self.R = Multivector3D.make.rotor(rng.uniform(0, np.pi, 1003), Bxy + Byz)
+
+    def tearDown(self):
+        parallel.configure(**self.previous)
+
+    def check(self, executor):
+        parallel.configure(workers=3, chunk_size=100, executor=executor)
+        a, b, R = self.a, self.b, self.R
+        cases = [
+            (parallel.gp(a, b), a * b),
+            (parallel.gp(a, vec(1, 2, 3)), a * vec(1, 2, 3)),
+            (parallel.sandwich(R, b), R.apply(b)),
+            (parallel.exp(0.3 * a), (0.3 * a).exp()),
+            (parallel.project(a, 2), a.project(2)),
+        ]
+        for (result, expected) in cases:
+            np.testing.assert_array_equal(result.coefficients, expected.coefficients)
+            self.assertEqual(result.grades, expected.grades)
+
+    def test_threads(self):
+        self.check("thread")
+
+    def test_processes(self):
+        self.check("process")
+
+    def test_out(self):
+        parallel.configure(workers=2, chunk_size=64)
+        a = Multivector3D.Array(self.a.coefficients.copy())
+        expected = a * self.b
+        self.assertIs(parallel.gp(a, self.b, out=a), a)
+        np.testing.assert_array_equal(a.coefficients, expected.coefficients)
+
+    def test_algebra(self):
+        parallel.configure(workers=2, chunk_size=10, executor="process")
+        M = algebra(3, 0, 1)
+        a = M.Array(np.random.default_rng(2).normal(size=(45, 16)))
+        np.testing.assert_array_equal(parallel.exp(0.2 * a).coefficients, (0.2 * a).exp().coefficients)
+
+    def test_clean_exit(self):
+        # the workers must leave the parent's shared memory registrations alone, or the tracker complains at exit
+        code = "\n".join([
+            "import multiprocessing, sys, numpy as np",
+            "from gapy import parallel",
+            "from gapy.ga3d import Multivector3D",
+            "multiprocessing.set_start_method(sys.argv[1])",
+            "parallel.configure(workers=2, chunk_size=10, executor='process')",
+            "a = Multivector3D.Array(np.ones((100, 8)))",
+            "assert parallel.gp(a, a) == a * a",
+        ])
+        for method in ("fork", "spawn", "forkserver"):
+            if method in multiprocessing.get_all_start_methods():
+                result = subprocess.run([sys.executable, "-c", code, method], capture_output=True, text=True, env=os.environ)
+                self.assertEqual(result.returncode, 0, result.stderr)
+                self.assertEqual(result.stderr, "")
+
+    def test_pools(self):
+        parallel.configure(workers=2, executor="thread")
+        first = parallel._pool()
+        parallel.configure(workers=3)
+        self.assertIsNot(parallel._pool(), first)
+        self.assertEqual(list(parallel._pools), [("thread", 3)])
+        with self.assertRaises(RuntimeError):
+            first.submit(int)
+
+    def test_configure(self):
+        with self.assertRaises(ValueError):
+            parallel.configure(executor="gpu")
@@ -0,0 +1,131 @@
+import unittest
+import numpy as np
+
+from gapy import core
+from gapy.cayley import grade_bits
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestProducts(unittest.TestCase):
+    """
+    Check the outer, inner, contraction, scalar, commutator and regressive products and the duals against their
+    definitions in terms of the geometric product, for single and batched operands.
+    """
+
+    def random(self, M, size=None, grades=None, seed=0):
+        g = M.cayley.grade_mask
+        rng = np.random.default_rng(seed)
+        coefficients = rng.normal(size=(len(g),) if size is None else (size, len(g)))
+        if grades is None:
+            return M.wrap(coefficients)
+        return M._new(coefficients * np.isin(g, grades), grade_bits(grades))
+
+    def projected(self, a, b, grade):
+        """
+        The sum over the grades r, s of a and b of the grade(r, s) part of <a>_r * <b>_s.
+        """
+        M = type(a)
+        n = int(np.max(M.cayley.grade_mask))
+        result = M._new(np.zeros(np.broadcast_shapes(a.coefficients.shape, b.coefficients.shape)), 0)
+        for r in range(n + 1):
+            for s in range(n + 1):
+                result = result + (a.project(r) * b.project(s)).project(grade(r, s))
+        return result
+
+    def check_products(self, M, size):
+        a, b = self.random(M, size, seed=1), self.random(M, size, seed=2)
+        self.assertEqual(a ^ b, self.projected(a, b, lambda r, s: r + s))
+        self.assertEqual(a | b, self.projected(a, b, lambda r, s: abs(r - s)))
+        self.assertEqual(a << b, self.projected(a, b, lambda r, s: s - r))
+        self.assertEqual(a >> b, self.projected(a, b, lambda r, s: r - s))
+        self.assertEqual(a.scalar_product(b), (a * b).project(0))
+        self.assertEqual(a.commutator(b), 0.5 * (a * b - b * a))
+        self.assertEqual(a & b, self.uncomplement((a.complement ^ b.complement)))
+
+        # the functions, also writing into an existing multivector
+        for function, expected in ((core.outer, a ^ b), (core.left_contraction, a << b), (core.regressive, a & b),
+                                   (core.commutator, a.commutator(b)), (core.scalar_product, a.scalar_product(b))):
+            self.assertEqual(function(a, b), expected)
+            out = M.wrap(np.zeros_like(a.coefficients))
+            self.assertIs(function(a, b, out=out), out)
+            self.assertEqual(out, expected)
+
+    def uncomplement(self, a):
+        blades, signs = type(a).cayley.complement
+        coefficients = np.empty_like(a.coefficients)
+        coefficients[..., :] = a.coefficients[..., blades] * signs
+        return type(a).wrap(coefficients)
+
+    def test_products(self):
+        for M in (Multivector3D, algebra(2), algebra(3, 0, 1), algebra(4, 1)):
+            self.check_products(M, None)
+            self.check_products(M, 10)
+
+    def test_grades(self):
+        v = self.random(Multivector3D, 10, [1])
+        B = self.random(Multivector3D, 10, [2])
+        self.assertEqual((v ^ v).grades, 1 << 2)
+        self.assertEqual((v << B).grades, 1 << 1)
+        self.assertEqual((B & B).grades, 1 << 1)
+        self.assertEqual(v.dual.grades, 1 << 2)
+        self.assertEqual(B.scalar_product(B).grades, 1)
+
+    def test_written_coefficients(self):
+        # the coefficients may be written once handed out, so the grades become all the grades
+        B = Multivector3D.make.bivector(0, 1, 0)
+        B.coefficients[1] = 5
+        self.assertEqual(B * B, 5 * ex * 5 * ex + Byz * Byz + 5 * (ex * Byz + Byz * ex))
+        self.assertTrue(np.isnan(B.grade))
+        self.assertEqual(B.project(1), 5 * ex)
+
+        # unless they are read-only
+        self.assertEqual(ex.coefficients.flags.writeable, False)
+        self.assertEqual(ex.grades, 1 << 1)
+
+    def test_scalars(self):
+        v = vec(1, 2, 3)
+        self.assertEqual(2 ^ v, 2 * v)
+        self.assertEqual(v ^ 2, 2 * v)
+        self.assertEqual(2 << v, 2 * v)
+        self.assertEqual(v << 2, Multivector3D.make.scalar(0.0))
+        self.assertEqual(np.arange(3) ^ v, Multivector3D.make.vector(*(np.arange(3)[:, np.newaxis] * [1, 2, 3]).T))
+
+    def test_regressive(self):
+        e1, e2, e3 = ex, ey, ez
+        self.assertEqual((e1 ^ e2) & (e2 ^ e3), e2)
+        a = self.random(Multivector3D, 10, seed=3)
+        self.assertEqual(I & a, a)
+
+        # in PGA (e4 squares to zero) the point (x, y, z) is the meet of the planes x - X = 0, y - Y = 0 and z - Z = 0
+        P = algebra(3, 0, 1)
+        point = lambda x, y, z: P.make.vector(1, 0, 0, -x) ^ P.make.vector(0, 1, 0, -y) ^ P.make.vector(0, 0, 1, -z)
+        line = point(1, 2, 5) & point(1, 2, 7)  # the join of two points
+        self.assertEqual(line.grades, 1 << 2)
+        np.testing.assert_allclose((line & point(1, 2, -11)).coefficients, 0, atol=1e-12)
+        self.assertFalse(np.allclose((line & point(1, 3, -11)).coefficients, 0))
+
+    def test_duals(self):
+        a = self.random(Multivector3D, 10, seed=4)
+        self.assertEqual(a.dual, a * I.inverse())
+        self.assertEqual(a.hodge, a.reverse * I)
+        for M in (algebra(4, 1), algebra(2, 2)):
+            b = self.random(M, 10, seed=5)
+            pseudoscalar = M.make.pseudoscalar(1.0)
+            self.assertEqual(b.dual, b * pseudoscalar.inverse())
+            self.assertEqual(b.hodge, b.reverse * pseudoscalar)
+
+        # a ^ b.hodge == <a b~> I for a and b of the same grade
+        for g in range(4):
+            x = self.random(Multivector3D, 10, [g], seed=6)
+            y = self.random(Multivector3D, 10, [g], seed=7)
+            self.assertEqual(x ^ y.hodge, Multivector3D.make.pseudoscalar((x * y.reverse).scalar))
+
+    def test_degenerate(self):
+        P = algebra(3, 0, 1)
+        a = self.random(P, 10, seed=8)
+        with self.assertRaises(ValueError):
+            a.dual
+        self.assertEqual(a.hodge, a.reverse * P.make.pseudoscalar(1.0))
+        for i in range(16):
+            e = P._new(np.eye(16)[i], 1 << int(P.cayley.grade_mask[i]))
+            self.assertEqual(e ^ e.complement, P.make.pseudoscalar(1.0))
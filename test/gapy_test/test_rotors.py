@@ -0,0 +1,135 @@
+import unittest
+import numpy as np
+
+from gapy import rotors
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestRotors(unittest.TestCase):
+    """
+    Check rotors are recovered from point correspondences, and agree with the SVD (Kabsch) solution for noisy data.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        self.rng = rng
+        angles = rng.uniform(0, np.pi, 50)
+        angles[:3] = np.pi  # half turns, where the usual characteristic multivector vanishes
+        self.R = Multivector3D.make.rotor(angles, Multivector3D.make.bivector(*rng.normal(size=(3, 50))).unit)
+        self.x = Multivector3D.make.vector(*rng.normal(size=(3, 50, 12)))
+        self.y = self.R[:, np.newaxis].apply(self.x)
+
+    def kabsch(self, x: np.ndarray, y: np.ndarray, w: np.ndarray) -> np.ndarray:
+        U, _, Vt = np.linalg.svd(np.einsum("...n,...ni,...nj->...ij", w, y, x))
+        d = np.sign(np.linalg.det(U @ Vt))
+        U[..., :, 2] *= d[..., np.newaxis]
+        return U @ Vt
+
+    def test_exact(self):
+        R = rotors.estimate_rotor(self.x, self.y)
+        self.assertEqual(R.coefficients.shape, (50, 8))
+        np.testing.assert_allclose(R.to_matrix(), self.R.to_matrix(), atol=1e-12)
+        np.testing.assert_allclose(R.apply(self.x[:, 0]).vector, self.y[:, 0].vector, atol=1e-12)
+        self.assertTrue(np.all(R.scalar >= 0))
+
+        # points in a plane are enough
+        planar = Multivector3D.make.vector(*self.rng.normal(size=(2, 50, 12)), 0)
+        R = rotors.estimate_rotor(planar, self.R[:, np.newaxis].apply(planar))
+        np.testing.assert_allclose(R.to_matrix(), self.R.to_matrix(), atol=1e-12)
+
+        # a single problem gives a single rotor
+        self.assertIsInstance(rotors.estimate_rotor(self.x[0], self.y[0]), Multivector3D)
+
+    def test_translation(self):
+        t = Multivector3D.make.vector(*self.rng.normal(size=(3, 50, 1)))
+        R, t_estimate = rotors.estimate_rotor(self.x, self.y + t, translation=True)
+        np.testing.assert_allclose(R.to_matrix(), self.R.to_matrix(), atol=1e-12)
+        np.testing.assert_allclose(t_estimate.vector, t.vector[:, 0], atol=1e-12)
+
+    def test_noisy(self):
+        w = self.rng.uniform(0.1, 1, (50, 12))
+        for noise in (0.1, 3.0):  # the larger gives some covariance matrices a negative determinant
+            y = self.y.vector + noise * self.rng.normal(size=(50, 12, 3))
+            R = rotors.estimate_rotor(self.x, Multivector3D.make.grade(1, y), w)
+            np.testing.assert_allclose(R.to_matrix(), self.kabsch(self.x.vector, y, w), atol=1e-10)
+
+        # outliers with no weight are ignored
+        y = self.y.vector.copy()
+        y[:, :3] = self.rng.normal(size=(50, 3, 3))
+        w = np.ones(12)
+        w[:3] = 0
+        R = rotors.estimate_rotor(self.x, Multivector3D.make.grade(1, y), w)
+        np.testing.assert_allclose(R.to_matrix(), self.R.to_matrix(), atol=1e-12)
+
+    def test_from_matrix(self):
+        R = rotors.rotor_from_matrix(Multivector3D, self.R.to_matrix())
+        np.testing.assert_allclose(R.to_matrix(), self.R.to_matrix(), atol=1e-12)
+        np.testing.assert_allclose(R.coefficients[3:], self.R.coefficients[3:], atol=1e-12)  # the half turns' sign is arbitrary
+        M = algebra(3)
+        np.testing.assert_allclose(rotors.rotor_from_matrix(M, self.R.to_matrix()).to_matrix(), self.R.to_matrix(), atol=1e-12)
+        with self.assertRaises(ValueError):
+            rotors.rotor_from_matrix(algebra(2, 1), np.eye(3))
+
+
+class TestInterpolation(unittest.TestCase):
+    """
+    Check slerp, squad and resampling against the definitions, for rotations, boosts and PGA motors.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(21)
+        self.rng = rng
+        self.times = np.cumsum(rng.uniform(0.5, 1.5, 20))
+        self.keyframes = Multivector3D.make.rotor(rng.uniform(0, 3, 20), Multivector3D.make.bivector(*rng.normal(size=(3, 20))).unit)
+        self.keyframes.coefficients[::3] *= -1  # the same rotations, from the other side
+
+    def test_slerp(self):
+        R0, R1 = self.keyframes[:-1], self.keyframes[1:]
+        t = self.rng.uniform(size=19)
+        D = R0.reverse * R1
+        D = Multivector3D._new(D.coefficients * np.sign(D.scalar)[:, np.newaxis], D.grades)
+        self.assertEqual(rotors.slerp(R0, R1, t), R0 * (D.log() * t).exp())
+        np.testing.assert_allclose(rotors.slerp(R0, R1, 1.0).to_matrix(), R1.to_matrix(), atol=1e-12)
+        self.assertEqual(rotors.slerp(R0, -R1, t), rotors.slerp(R0, R1, t))
+
+        # about one plane, slerp is rotation by the interpolated angle
+        R = rotors.slerp(Multivector3D.make.rotor(0.0, Bxy), Multivector3D.make.rotor(2.0, Bxy), np.linspace(0, 1, 5))
+        self.assertEqual(R, Multivector3D.make.rotor(np.linspace(0, 2, 5), Bxy))
+
+    def test_other_algebras(self):
+        # boosts, whose bivectors square to +1, and PGA motors, whose bivectors do not square to scalars
+        for (M, scale) in ((algebra(3, 1), 0.5), (algebra(3, 0, 1), 0.5)):
+            nbivectors = np.sum(M.cayley.grade_mask == 2)
+            R0, R1 = ((M.make.bivector(*self.rng.normal(size=(nbivectors, 10))) * scale).exp() for _ in range(2))
+            t = self.rng.uniform(size=10)
+            D = R0.reverse * R1
+            D = M._new(D.coefficients * np.sign(D.scalar)[:, np.newaxis], D.grades)
+            np.testing.assert_allclose(rotors.slerp(R0, R1, t).coefficients, (R0 * (D.log() * t).exp()).coefficients, atol=1e-12)
+
+    def test_resample(self):
+        at = np.linspace(self.times[0] - 1, self.times[-1] + 1, 5000)
+        for method in ("slerp", "squad"):
+            R = rotors.resample(self.keyframes, self.times, at, method)
+            self.assertEqual(R.coefficients.shape, (5000, 8))
+            np.testing.assert_allclose((R * R.reverse).scalar, 1, atol=1e-12)
+            K = rotors.resample(self.keyframes, self.times, self.times, method)
+            np.testing.assert_allclose(K.to_matrix(), self.keyframes.to_matrix(), atol=1e-12)
+            np.testing.assert_allclose(R[0].to_matrix(), self.keyframes[0].to_matrix(), atol=1e-12)
+            np.testing.assert_allclose(R[-1].to_matrix(), self.keyframes[-1].to_matrix(), atol=1e-12)
+
+        # slerp resampling is slerp within each segment
+        i = 7
+        u = np.linspace(0, 1, 9)
+        R = rotors.resample(self.keyframes, self.times, self.times[i] + u * (self.times[i + 1] - self.times[i]))
+        expected = rotors.slerp(self.keyframes[i], self.keyframes[i + 1], u)
+        np.testing.assert_allclose(R.to_matrix(), expected.to_matrix(), atol=1e-12)
+
+        # squad is smooth through the keyframes, slerp is not
+        h = 1e-5
+        for (method, smooth) in (("squad", True), ("slerp", False)):
+            R = rotors.resample(self.keyframes, self.times, self.times[i] + np.array([-2 * h, -h, 0, h, 2 * h]), method).to_matrix()
+            left, right = (R[2] - R[0]) / (2 * h), (R[4] - R[2]) / (2 * h)
+            self.assertEqual(np.allclose(left, right, atol=1e-3), smooth)
+
+        with self.assertRaises(ValueError):
+            rotors.resample(self.keyframes, self.times, at, "linear")
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from gapy import storage, stream
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestStorage(unittest.TestCase):
+    """
+    Check multivectors round trip through files, dense and grade-sparse.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "field.gamv")
+        rng = np.random.default_rng(12)
+        self.a = Multivector3D.Array(rng.normal(size=(20, 8)))
+        self.v = Multivector3D.make.vector(*rng.normal(size=(3, 20)))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_dense(self):
+        storage.save(self.path, self.a)
+        f = storage.load(self.path)
+        self.assertIs(f.type, Multivector3D)
+        self.assertEqual(f.shape, (20,))
+        self.assertIsInstance(f.data, np.memmap)
+        self.assertEqual(f.array, self.a)
+        self.assertTrue(np.shares_memory(f.array.coefficients, f.data))
+        self.assertEqual(f[3], self.a[3])
+        self.assertEqual(f.header["algebra"]["signature"], [3, 0, 0])
+        self.assertEqual(os.path.getsize(self.path) % 64, 0)
+
+    def test_sparse(self):
+        storage.save(self.path, self.v)
+        f = storage.load(self.path)
+        self.assertEqual(f.data.shape, (20, 3))
+        np.testing.assert_array_equal(f.data, self.v.vector)
+        self.assertEqual(f.grades, 1 << 1)
+        self.assertEqual(f.array, self.v)
+        self.assertEqual(f[2:5], self.v[2:5])
+        with self.assertRaises(ValueError):
+            storage.append(self.path, self.a)
+
+    def test_written_coefficients(self):
+        self.v.coefficients[:, 4] = 1.0  # a bivector part, written through the coefficients
+        storage.save(self.path, self.v)
+        self.assertEqual(storage.load(self.path).array, self.v)
+
+    def test_append(self):
+        storage.save(self.path, self.v[:5])
+        self.assertEqual(storage.append(self.path, self.v[5:]), 20)
+        self.assertEqual(storage.append(self.path, self.v[0]), 21)
+        f = storage.load(self.path)
+        self.assertEqual(f[:20], self.v)
+        self.assertEqual(stream.chunked(f, 6).map(lambda c: c.vector).collect().shape, (21, 3))
+
+    def test_append_dtype(self):
+        storage.save(self.path, self.v[:5])
+        with self.assertRaises(ValueError):
+            storage.append(self.path, self.v[5:] * 1j)
+        with self.assertRaises(ValueError):
+            storage.append(self.path, self.v[5:].astype(np.float32))
+        self.assertEqual(len(storage.load(self.path)), 5)
+
+    def test_no_grades(self):
+        zero = Multivector3D.wrap(np.zeros((4, 8)), grades=0)
+        storage.save(self.path, zero)
+        f = storage.load(self.path)
+        self.assertEqual(f.shape, (4,))
+        self.assertEqual(f.array, zero)
+        self.assertEqual(storage.append(self.path, zero[:2]), 6)
+
+    def test_algebra(self):
+        M = algebra(3, 0, 1)
+        a = M.Array(np.random.default_rng(1).normal(size=(4, 2, 16)))
+        storage.save(self.path, a)
+        f = storage.load(self.path)
+        self.assertIs(f.type, M)
+        self.assertEqual(f.shape, (4, 2))
+        self.assertEqual(f.array, a)
+
+    def test_not_a_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"hello world")
+        with self.assertRaises(ValueError):
+            storage.load(self.path)
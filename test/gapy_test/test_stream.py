@@ -0,0 +1,54 @@
+import io
+import unittest
+import numpy as np
+
+from gapy import stream
+from gapy.ga3d import *
+
+class TestStream(unittest.TestCase):
+    """
+    Check streaming a formula in chunks gives the same result as evaluating it all at once.
+    """
+
+    def setUp(self):
+        b = vec(1, 1, 0)
+        a = vec(0.25, 1, -0.5)
+        self.L = (a*b).project(2).unit
+        self.e = a.unit
+
+    def orbit(self, s):
+        U = 1*(s*self.L).exp() + 2*(-s*self.L).exp()
+        return U*U*self.e
+
+    def test_linspace(self):
+        np.testing.assert_array_equal(stream.linspace(0, 2*np.pi, 1001, chunk_size=64).collect(), np.linspace(0, 2*np.pi, 1001))
+        self.assertEqual([len(c) for c in stream.arange(10, chunk_size=4)], [4, 4, 2])
+
+    def test_trajectory(self):
+        expected = self.orbit(np.linspace(0, 2*np.pi, 1001))
+        x = stream.linspace(0, 2*np.pi, 1001, chunk_size=100).map(self.orbit)
+        self.assertTrue(all(len(c) <= 100 for c in x))
+        self.assertEqual(x.collect(), expected)
+        np.testing.assert_allclose(x.vector.collect(), expected.vector)
+        np.testing.assert_allclose(x.scalar.collect(), expected.scalar)
+        self.assertEqual(x.project(3).collect(), expected.project(3))
+
+    def test_sinks(self):
+        x = stream.linspace(0, 1, 250, chunk_size=32).map(self.orbit).vector
+        expected = self.orbit(np.linspace(0, 1, 250)).vector
+
+        out = np.zeros((250, 3))
+        self.assertEqual(x.to(out), 250)
+        np.testing.assert_allclose(out, expected)
+
+        f = io.BytesIO()
+        x.to(f)
+        np.testing.assert_allclose(np.frombuffer(f.getvalue()).reshape(-1, 3), expected)
+
+        blocks = []
+        x.to(blocks.append)
+        self.assertEqual(len(blocks), 8)
+
+    def test_chunked(self):
+        a = Multivector3D.Array(np.random.default_rng(3).normal(size=(50, 8)))
+        self.assertEqual(stream.chunked(a, 7).map(lambda c: c * c).collect(), a * a)
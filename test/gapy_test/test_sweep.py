@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+
+from gapy import sweep
+from gapy.core import algebra
+from gapy.ga3d import *
+
+class TestSweep(unittest.TestCase):
+    """
+    Check every sweep method agrees with evaluating exp for each sample.
+    """
+
+    def setUp(self):
+        self.L = (vec(0.25, 1, -0.5) * vec(1, 1, 0)).project(2).unit
+        self.s = np.linspace(0, 2 * np.pi, 1001)
+
+    def test_methods(self):
+        expected = (self.s * self.L).exp()
+        for method in ("auto", "trig", "recurrence", "exp"):
+            U = sweep.exp(self.L, self.s, method)
+            self.assertEqual(U.coefficients.shape, (1001, 8))
+            np.testing.assert_allclose(U.coefficients, expected.coefficients, atol=1e-13)
+
+        # arbitrary grids and batches of generators
+        s = np.sort(np.random.default_rng(22).uniform(-5, 5, 100))
+        np.testing.assert_allclose(sweep.exp(self.L, s).coefficients, (s * self.L).exp().coefficients, atol=1e-13)
+        B = 0.5 + Multivector3D.make.bivector(*np.eye(3))
+        U = sweep.exp(B, self.s[:10], "recurrence")
+        self.assertEqual(U.coefficients.shape, (10, 3, 8))
+        np.testing.assert_allclose(U.coefficients, (B * self.s[:10, np.newaxis]).exp().coefficients, atol=1e-13)
+
+        with self.assertRaises(ValueError):
+            sweep.exp(self.L, s, "recurrence")
+        with self.assertRaises(ValueError):
+            sweep.exp(self.L, s, "series")
+
+    def test_general(self):
+        # a CGA bivector whose square is not a scalar, so the recurrence is used
+        M = algebra(4, 1)
+        B = M.make.bivector(*np.random.default_rng(23).normal(size=10)) * 0.3
+        s = np.linspace(0, 5, 2001)
+        U = sweep.exp(B, s)
+        expected = (B * s).exp()
+        np.testing.assert_allclose(U.coefficients, expected.coefficients, rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose((U * U.reverse).scalar, 1, atol=1e-10)
+        with self.assertRaises(ValueError):
+            sweep.exp(B, s, "trig")
+
+    def test_apply(self):
+        x = sweep.apply(self.L, self.s, ex)
+        self.assertEqual(x, (self.s * self.L).exp().apply(ex))
+        out = Multivector3D.Array(np.zeros((1001, 8)))
+        self.assertIs(sweep.apply(self.L, self.s, ex, out=out), out)
+        self.assertEqual(out, x)